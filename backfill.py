@@ -0,0 +1,157 @@
+"""
+Загрузка истории домашек в локальное хранилище состояния.
+API не умеет ограничивать выборку сверху: ответ на from_date содержит
+всё, что обновлено после этой даты. Поэтому для каждого получателя
+уходит один запрос from_date=since, ответ разбирается потоково, а
+параллельно запрашиваются разные получатели (не больше concurrency
+запросов сразу). Домашки, обновлённые позже until, отбрасываются,
+остальные объединяются по id домашки с сохранением самой свежей версии.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import homework
+from engine import Tenant, load_tenants
+from exceptions import TokenMissing
+from state_store import StateStore
+
+DEFAULT_CONCURRENCY = 8
+
+logger = logging.getLogger(__name__)
+
+
+def updated_at(item):
+    """Время обновления домашки в Unix-времени или None."""
+    date_updated = item.get('date_updated')
+    if not isinstance(date_updated, str):
+        return None
+    try:
+        return int(datetime.fromisoformat(
+            date_updated.replace('Z', '+00:00')
+        ).timestamp())
+    except ValueError:
+        return None
+
+
+def fetch_history(tenant, since, until):
+    """
+    Загружает домашки получателя, обновлённые в диапазоне [since, until).
+    Ответ разбирается потоково, каждая домашка проверяется parse_status.
+    Возвращает получателя, домашки из диапазона и число полученных домашек.
+    Домашки без корректной date_updated сохраняются.
+    """
+    items = []
+    fetched = 0
+    with homework.stream_homework_statuses(since, tenant.headers) as stream:
+        for item in stream:
+            homework.parse_status(item)
+            fetched += 1
+            timestamp = updated_at(item)
+            if timestamp is None or timestamp < until:
+                items.append(item)
+    return tenant, items, fetched
+
+
+def merge(items):
+    """
+    Объединяет домашки по id, оставляя самую свежую версию.
+    Домашки без id сохраняются по названию работы.
+    """
+    merged = {}
+    for item in items:
+        key = item.get('id', item.get('homework_name'))
+        current = merged.get(key)
+        if current is None or (updated_at(item) or 0) >= (
+                updated_at(current) or 0):
+            merged[key] = item
+    return merged
+
+
+class BackfillReport:
+    """Итоги загрузки истории."""
+
+    def __init__(self):
+        self.requests = 0
+        self.fetched = 0
+        self.stored = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def homeworks_per_second(self):
+        """Скорость загрузки: полученные домашки в секунду."""
+        if not self.elapsed:
+            return 0.0
+        return self.fetched / self.elapsed
+
+    def __str__(self):
+        return (f'Загрузка истории: запросов {self.requests}, ошибок '
+                f'{self.failed}, получено домашек {self.fetched}, '
+                f'сохранено {self.stored} за {self.elapsed:.2f} с '
+                f'({self.homeworks_per_second:.0f} домашек/с)')
+
+
+def run_backfill(tenants, store, since=0, until=None,
+                 concurrency=DEFAULT_CONCURRENCY):
+    """
+    Загружает историю домашек получателей и сохраняет её в хранилище.
+    Возвращает BackfillReport.
+    В качестве параметров функция принимает:
+    tenants - список получателей (engine.Tenant)
+    store - хранилище состояния (state_store.StateStore)
+    since, until - границы диапазона в Unix-времени
+    concurrency - максимальное число одновременных запросов
+    """
+    if until is None:
+        until = int(time.time())
+    report = BackfillReport()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(fetch_history, tenant, since, until)
+                   for tenant in tenants]
+        for future in futures:
+            report.requests += 1
+            try:
+                tenant, items, fetched = future.result()
+            except Exception as error:
+                report.failed += 1
+                logger.error('Ошибка загрузки истории: %s', error,
+                             exc_info=True)
+                continue
+            report.fetched += fetched
+            merged = merge(items)
+            store.save_homeworks(tenant.key, merged.values())
+            report.stored += len(merged)
+    report.elapsed = time.perf_counter() - started
+    logger.info('%s', report)
+    return report
+
+
+def run_backfill_command(tenants_path=None, since=0, until=None,
+                         concurrency=DEFAULT_CONCURRENCY):
+    """
+    Загружает историю в хранилище homework.STATE_DB.
+    Без файла получателей история загружается для единственного
+    получателя из переменных окружения: нужны PRACTICUM_TOKEN и
+    TELEGRAM_CHAT_ID, иначе историю не прочитают ни main(), ни /status.
+    В качестве параметров функция принимает:
+    tenants_path - путь к JSON-файлу со списком получателей или None
+    since, until - границы диапазона в Unix-времени
+    concurrency - максимальное число одновременных запросов
+    """
+    if tenants_path:
+        tenants = load_tenants(tenants_path)
+    else:
+        missing = [name for name in ('PRACTICUM_TOKEN', 'TELEGRAM_CHAT_ID')
+                   if not getattr(homework, name)]
+        if missing:
+            raise TokenMissing(', '.join(missing))
+        tenants = [Tenant(homework.PRACTICUM_TOKEN,
+                          homework.TELEGRAM_CHAT_ID)]
+    store = StateStore(homework.STATE_DB)
+    try:
+        return run_backfill(tenants, store, since, until, concurrency)
+    finally:
+        store.close()
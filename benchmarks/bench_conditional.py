@@ -0,0 +1,127 @@
+"""
+Бенчмарк условных запросов и сжатия при опросе API.
+Локальный сервер отвечает как API Практикума: умеет gzip и, если
+включено, ETag с ответом 304 на совпавший If-None-Match. Сравниваются
+прежний путь (http_session.get и разбор JSON на каждом опросе)
+и conditional_get. Считаются байты тела, полученные клиентом,
+и процессорное время потока клиента в пересчёте на 10 000 опросов.
+current_date в ответе стенда не меняется между опросами: так ведёт
+себя сервер, который отдаёт ETag только для неизменного содержимого.
+
+Запуск: python benchmarks/bench_conditional.py --polls 2000
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+import http_session  # noqa: E402
+
+PER_POLLS = 10_000
+
+
+class PracticumStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = b''
+    etag = None
+    sent_bytes = 0
+
+    def do_GET(self):
+        cls = type(self)
+        if cls.etag and self.headers.get('If-None-Match') == cls.etag:
+            self.send_response(304)
+            self.send_header('ETag', cls.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = cls.body
+        self.send_response(200)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        if cls.etag:
+            self.send_header('ETag', cls.etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        cls.sent_bytes += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_body(homeworks_count):
+    return json.dumps({
+        'homeworks': [
+            {'id': number, 'homework_name': f'hw{number}.zip',
+             'status': 'approved', 'reviewer_comment': 'Принято!',
+             'date_updated': '2021-04-11T10:31:09Z',
+             'lesson_name': 'Проект спринта'}
+            for number in range(homeworks_count)
+        ],
+        'current_date': 1000198991
+    }, ensure_ascii=False).encode()
+
+
+def plain_poll():
+    response = http_session.get(homework.ENDPOINT,
+                                headers=homework.HEADERS,
+                                params={'from_date': 0})
+    return homework.check_response(response.json())
+
+
+def conditional_poll():
+    return homework.check_response(homework.get_api_answer(0))
+
+
+def measure(poll, polls):
+    PracticumStandIn.sent_bytes = 0
+    http_session.conditional_cache = http_session.ConditionalCache()
+    started = time.thread_time()
+    for _ in range(polls):
+        poll()
+    cpu = time.thread_time() - started
+    scale = PER_POLLS / polls
+    return PracticumStandIn.sent_bytes * scale, cpu * scale
+
+
+def run(homeworks_count, polls, with_etag):
+    PracticumStandIn.body = make_body(homeworks_count)
+    PracticumStandIn.etag = None
+    before_bytes, before_cpu = measure(plain_poll, polls)
+    if with_etag:
+        PracticumStandIn.etag = (
+            '"' + hashlib.sha1(PracticumStandIn.body).hexdigest() + '"'
+        )
+    after_bytes, after_cpu = measure(conditional_poll, polls)
+    print(f'домашек в ответе: {homeworks_count}, ETag: '
+          f'{"да" if with_etag else "нет"}')
+    print(f'  на {PER_POLLS} опросов: байты {before_bytes / 1024:.0f} КБ -> '
+          f'{after_bytes / 1024:.0f} КБ, CPU клиента {before_cpu:.2f} с -> '
+          f'{after_cpu:.2f} с')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=2000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PracticumStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    homework.ENDPOINT = f'http://127.0.0.1:{server.server_port}/'
+    http_session.configure()
+    for homeworks_count in (0, 50):
+        for with_etag in (False, True):
+            run(homeworks_count, args.polls, with_etag)
+    http_session.close()
+    server.shutdown()
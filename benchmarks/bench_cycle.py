@@ -0,0 +1,203 @@
+"""
+Набор бенчмарков цикла «опрос -> проверка -> уведомление».
+Сеть и Telegram заменены заглушками из tests/check_utils.py:
+MockResponseGET вместо requests.get и MockTelegramBot вместо TeleBot.
+Для каждого бенчмарка считаются операции в секунду, задержки p50/p99
+и пиковая память (tracemalloc, отдельным прогоном). Результаты
+сохраняются в JSON, чтобы сравнивать их между коммитами.
+
+Запуск:
+    python benchmarks/bench_cycle.py --output benchmarks/results.json
+    python benchmarks/bench_cycle.py --compare benchmarks/results.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import requests  # noqa: E402
+import telebot  # noqa: E402
+
+import homework  # noqa: E402
+from state_store import IN_MEMORY  # noqa: E402
+from tests import check_utils  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'benchmarks', 'results.json')
+HOMEWORKS_IN_RESPONSE = 20
+REGRESSION_THRESHOLD = 1.1
+
+
+def make_response_data(homeworks_count):
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'homework_name': f'hw{number}.zip',
+                'status': 'approved',
+                'reviewer_comment': 'Принято!',
+                'date_updated': '2021-04-11T10:31:09Z',
+                'lesson_name': 'Проект спринта: Деплой бота'
+            }
+            for number in range(homeworks_count)
+        ],
+        'current_date': 1000198991
+    }
+
+
+def install_stand_ins(response_data):
+    """Подменяет сеть и Telegram заглушками из tests/check_utils.py."""
+    def mock_get(*args, **kwargs):
+        return check_utils.MockResponseGET(
+            *args, random_timestamp=response_data['current_date'],
+            data=response_data, **kwargs
+        )
+
+    requests.get = mock_get
+    # main() импортирует TeleBot из telebot при запуске.
+    telebot.TeleBot = check_utils.MockTelegramBot
+    homework.PRACTICUM_TOKEN = 'sometoken'
+    homework.TELEGRAM_TOKEN = '1234:abcdefg'
+    homework.TELEGRAM_CHAT_ID = '12345'
+    # Состояние прошлых прогонов не должно влиять на замер.
+    homework.STATE_DB = IN_MEMORY
+
+
+def run_main_once():
+    """Одна итерация main(): цикл прерывается на time.sleep."""
+    original_sleep = time.sleep
+
+    def break_loop(seconds):
+        raise check_utils.BreakInfiniteLoop
+
+    time.sleep = break_loop
+    try:
+        homework.main()
+    except check_utils.BreakInfiniteLoop:
+        pass
+    finally:
+        time.sleep = original_sleep
+
+
+def make_cases(response_data):
+    homeworks_list = response_data['homeworks']
+    bot = check_utils.MockTelegramBot()
+    return {
+        'get_api_answer': lambda: homework.get_api_answer(0),
+        'check_response': lambda: homework.check_response(response_data),
+        'parse_status': lambda: homework.parse_status(homeworks_list[0]),
+        'send_message': lambda: homework.send_message(bot, 'Сообщение'),
+        'main_iteration': run_main_once,
+    }
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def run_case(func, iterations):
+    for _ in range(min(iterations, 100)):
+        func()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+    latencies.sort()
+
+    tracemalloc.start()
+    for _ in range(min(iterations, 100)):
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / total,
+        'p50_us': percentile(latencies, 0.50) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """Печатает изменение p50 относительно прошлого прогона."""
+    print(f'\nсравнение с {previous.get("revision")}:')
+    regressions = []
+    for name, result in current['results'].items():
+        old = previous['results'].get(name)
+        if old is None:
+            continue
+        ratio = result['p50_us'] / old['p50_us']
+        mark = ''
+        if ratio > REGRESSION_THRESHOLD:
+            mark = '  <- регрессия'
+            regressions.append(name)
+        print(f'{name:<16} p50 {old["p50_us"]:9.1f} -> '
+              f'{result["p50_us"]:9.1f} мкс ({ratio:.2f}x){mark}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--homeworks', type=int,
+                        default=HOMEWORKS_IN_RESPONSE,
+                        help='число домашек в ответе API')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--compare',
+                        help='JSON с результатами прошлого прогона')
+    args = parser.parse_args()
+
+    # MockResponseGET пишет предупреждение на каждый запрос.
+    logging.disable(logging.WARNING)
+    response_data = make_response_data(args.homeworks)
+    install_stand_ins(response_data)
+
+    results = {}
+    for name, func in make_cases(response_data).items():
+        results[name] = run_case(func, args.iterations)
+        result = results[name]
+        print(f'{name:<16} {result["ops_per_sec"]:12.0f} оп/с  '
+              f'p50 {result["p50_us"]:9.1f} мкс  '
+              f'p99 {result["p99_us"]:9.1f} мкс  '
+              f'пик памяти {result["peak_memory_kb"]:8.1f} КБ')
+
+    current = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'created_at': time.time(),
+        'homeworks_in_response': args.homeworks,
+        'results': results,
+    }
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as previous_file:
+            regressions = compare(json.load(previous_file), current)
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(current, output_file, ensure_ascii=False, indent=2)
+    print(f'\nрезультаты сохранены в {args.output}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Бенчмарк сводок уведомлений (digest.py) при всплесках смен статусов.
+Каждый получатель за цикл опроса получает пачку смен статусов:
+у большинства одна, у доли burst_share - от 5 до max_burst (ревьюер
+проверил много работ подряд). Один цикл движка опроса прогоняется
+без сводок и с окном сводки; отправка в Telegram - заглушка без
+лимитов. Печатаются вызовы sendMessage, сэкономленная доля и оценка
+времени доставки при лимитах Telegram (delivery.CHAT_RATE,
+CHAT_BURST и GLOBAL_RATE).
+
+Запуск: python benchmarks/bench_digest.py --tenants 1000 --max-burst 40
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import delivery  # noqa: E402
+import engine  # noqa: E402
+import homework  # noqa: E402
+
+
+class StubBot:
+    """Заглушка TeleBot, считает вызовы sendMessage по чатам."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.characters = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.calls[chat_id] += 1
+        self.characters += len(text)
+
+
+def make_bursts(tenants_count, burst_share, max_burst, seed):
+    generator = random.Random(seed)
+    return [generator.randint(5, max_burst)
+            if generator.random() < burst_share else 1
+            for _ in range(tenants_count)]
+
+
+def make_fake_request(bursts):
+    def fake_request(timestamp, headers):
+        number = int(headers['Authorization'].rsplit('-', 1)[-1])
+        return {
+            'homeworks': [
+                {'id': number * 1000 + item,
+                 'homework_name': f'student{number}__project{item}.zip',
+                 'status': 'approved'}
+                for item in range(bursts[number])
+            ],
+            'current_date': timestamp + 1,
+        }
+    return fake_request
+
+
+def delivery_time(calls):
+    """Оценка времени доставки при лимитах Telegram, в секундах."""
+    per_chat = max(max(0, count - delivery.CHAT_BURST) / delivery.CHAT_RATE
+                   for count in calls.values())
+    total = sum(calls.values())
+    global_limit = max(0, total - delivery.GLOBAL_BURST) / delivery.GLOBAL_RATE
+    return max(per_chat, global_limit)
+
+
+def run(bursts, digest_window):
+    bot = StubBot()
+    tenants = [engine.Tenant(f'token-{number}', number, timestamp=0,
+                             digest_window=digest_window)
+               for number in range(len(bursts))]
+    queue = delivery.DeliveryQueue(bot, global_rate=1e9, global_burst=1e9,
+                                   chat_burst=1e9)
+    polling_engine = engine.PollingEngine(bot, tenants, delivery=queue)
+    asyncio.run(polling_engine.run(cycles=1))
+    return bot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--burst-share', type=float, default=0.2,
+                        help='доля получателей со всплеском')
+    parser.add_argument('--max-burst', type=int, default=40)
+    parser.add_argument('--window', type=float, default=0.05,
+                        help='окно сводки, в секундах')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    bursts = make_bursts(args.tenants, args.burst_share, args.max_burst,
+                         args.seed)
+    homework.request_homework_statuses = make_fake_request(bursts)
+    print(f'получателей: {args.tenants}, смен статусов: {sum(bursts)}, '
+          f'самая большая пачка: {max(bursts)}')
+    baseline = None
+    for label, window in (('без сводок', 0), ('со сводками', args.window)):
+        bot = run(bursts, window)
+        calls = sum(bot.calls.values())
+        if baseline is None:
+            baseline = calls
+        print(f'{label}: вызовов sendMessage {calls} '
+              f'(сэкономлено {1 - calls / baseline:.0%}), '
+              f'символов {bot.characters}, '
+              f'оценка доставки при лимитах Telegram '
+              f'{delivery_time(bot.calls):.0f} с')
+
+
+if __name__ == '__main__':
+    main()
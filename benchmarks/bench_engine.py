@@ -0,0 +1,82 @@
+"""
+Бенчмарк движка опроса для нескольких получателей (engine.py).
+Сетевой запрос заменён заглушкой с задержкой, отправка в Telegram -
+заглушкой без задержки и без лимитов Telegram. Скрипт измеряет
+процессорное время одного цикла и оценивает, сколько получателей
+одно ядро успевает опросить за RETRY_PERIOD секунд.
+
+Запуск: python benchmarks/bench_engine.py --tenants 2000 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import homework  # noqa: E402
+from delivery import DeliveryQueue  # noqa: E402
+
+
+class StubBot:
+    """Заглушка TeleBot, считает отправленные сообщения."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent += 1
+
+
+def make_fake_request(latency, with_update):
+    def fake_request(timestamp, headers):
+        time.sleep(latency)
+        homeworks = []
+        if with_update:
+            homeworks.append({'homework_name': 'hw.zip',
+                              'status': 'approved'})
+        return {'homeworks': homeworks, 'current_date': timestamp + 1}
+    return fake_request
+
+
+def run(tenants_count, latency, concurrency, with_update):
+    homework.request_homework_statuses = make_fake_request(latency,
+                                                           with_update)
+    bot = StubBot()
+    tenants = [engine.Tenant(f'token-{number}', number, timestamp=0)
+               for number in range(tenants_count)]
+    # Лимиты Telegram здесь не измеряются: снимаем их, чтобы цикл
+    # упирался только в опрос.
+    delivery = DeliveryQueue(bot, global_rate=1e9, global_burst=1e9,
+                             chat_burst=1e9)
+    polling_engine = engine.PollingEngine(bot, tenants, concurrency,
+                                          delivery=delivery)
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    asyncio.run(polling_engine.run(cycles=1))
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+    cpu_per_tenant = cpu / tenants_count
+    print(f'получателей: {tenants_count}, задержка API: {latency} с, '
+          f'параллельность: {concurrency}')
+    print(f'цикл: {wall:.3f} с (wall), {cpu:.3f} с (CPU), '
+          f'отправлено сообщений: {bot.sent}')
+    print(f'CPU на получателя: {cpu_per_tenant * 1e6:.1f} мкс')
+    print('оценка получателей на ядро за цикл '
+          f'{homework.RETRY_PERIOD} с: '
+          f'{int(homework.RETRY_PERIOD / cpu_per_tenant)} (по CPU), '
+          f'{int(homework.RETRY_PERIOD * concurrency / latency)} '
+          '(по задержке API)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--with-update', action='store_true',
+                        help='каждый ответ содержит смену статуса')
+    args = parser.parse_args()
+    run(args.tenants, args.latency, args.concurrency, args.with_update)
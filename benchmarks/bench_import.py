@@ -0,0 +1,85 @@
+"""
+Бюджет времени запуска бота.
+Каждый замер - новый интерпретатор: python -X importtime -c
+"import homework" даёт суммарное время импорта модуля homework со всеми
+зависимостями, а python homework.py --check - полное время проверки
+конфигурации. Печатаются медианы; код выхода 1, если медиана импорта
+превышает бюджет или при импорте загрузились сетевые библиотеки.
+
+Запуск:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-ms 80 --runs 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('requests', 'urllib3', 'telebot', 'ssl', 'http.client')
+DEFAULT_BUDGET_MS = 100
+CHECK_ENV = {'PRACTICUM_TOKEN': 'bench', 'TELEGRAM_TOKEN': '1234:bench',
+             'TELEGRAM_CHAT_ID': '1'}
+LOADED_SCRIPT = (
+    'import sys, homework; '
+    f'print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+)
+
+
+def run_python(*args, env=None, cwd=BASE_DIR):
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def import_time_ms():
+    """Суммарное время импорта homework по -X importtime, в мс."""
+    stderr = run_python('-X', 'importtime', '-c', 'import homework').stderr
+    for line in stderr.splitlines():
+        _, cumulative, name = line.split('|')
+        if name.strip() == 'homework':
+            return int(cumulative) / 1000
+    raise RuntimeError('В выводе -X importtime нет модуля homework')
+
+
+def check_time_ms():
+    """Время python homework.py --check от запуска до выхода, в мс."""
+    env = {**os.environ, **CHECK_ENV}
+    # Лог бота пишется в текущий каталог: не мусорим в репозитории.
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        run_python(os.path.join(BASE_DIR, 'homework.py'), '--check',
+                   env=env, cwd=directory)
+        return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=9)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='допустимая медиана времени импорта homework')
+    args = parser.parse_args()
+
+    imports = sorted(import_time_ms() for _ in range(args.runs))
+    checks = sorted(check_time_ms() for _ in range(args.runs))
+    loaded = run_python('-c', LOADED_SCRIPT).stdout.strip()
+    import_median = statistics.median(imports)
+    print(f'import homework: медиана {import_median:.1f} мс, '
+          f'мин {imports[0]:.1f} мс, бюджет {args.budget_ms:.0f} мс')
+    print(f'homework.py --check: медиана {statistics.median(checks):.1f} мс '
+          f'(с запуском интерпретатора)')
+
+    failed = False
+    if loaded:
+        print(f'ОШИБКА: при импорте загружены {loaded}')
+        failed = True
+    if import_median > args.budget_ms:
+        print('ОШИБКА: время импорта превышает бюджет')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Бенчмарк накладных расходов логирования за один цикл опроса.
+Цикл с пакетом из N домашек делает столько же вызовов логгера, сколько
+main(): запрос к API, проверка ответа, статус каждой домашки,
+две записи на каждое отправленное сообщение.
+«До» - f-строки и синхронный FileHandler (прежний logging.basicConfig),
+«после» - отложенное форматирование и DeferredQueueHandler из log_setup.py.
+Измеряется время в потоке опроса, с уровнем DEBUG и с уровнем INFO.
+
+Запуск: python benchmarks/bench_logging.py --homeworks 20
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import tempfile
+import timeit
+from logging.handlers import QueueListener
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_setup import LOG_FORMAT, DeferredQueueHandler  # noqa: E402
+
+ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+
+
+def legacy_cycle(logger, homeworks):
+    element_name = 'Ответ API'
+    request_data = {'url': ENDPOINT, 'headers': {'Authorization': 'OAuth x'},
+                    'params': {'from_date': 0}}
+    logger.debug('''Получаем ответ API.
+                    Информация о запросе:
+                    Адрес эндпоинта: {url},
+                    Headers: {headers},
+                    Параметры: {params}'''.format(**request_data))
+    logger.debug('Ответ API получен')
+    logger.debug(f'''Тип {element_name} проверен:
+                 полученный тип соответствует ожидаемому.''')
+    logger.debug(f'''Ответ API проверен.
+                 Все ожидаемые ключи {request_data.keys()}
+                 на месте.''')
+    for name, status in homeworks:
+        logger.debug(f'''Получен статус {status} для работы
+                     {name}''')
+    for name, status in homeworks:
+        message = f'Изменился статус проверки работы "{name}". {status}'
+        logger.debug(f'Бот начинает отправку сообщения: {message}')
+        logger.debug(f'Успешно отправлено сообщение: {message}')
+
+
+def deferred_cycle(logger, homeworks):
+    logger.debug('Получаем ответ API. Адрес эндпоинта: %s, параметры: %s',
+                 ENDPOINT, {'from_date': 0})
+    logger.debug('Ответ API получен')
+    logger.debug('Ответ API проверен, все ожидаемые ключи на месте.')
+    for name, status in homeworks:
+        logger.debug('Получен статус %s для работы %s', status, name)
+    for name, status in homeworks:
+        message = f'Изменился статус проверки работы "{name}". {status}'
+        logger.debug('Бот начинает отправку сообщения: %s', message)
+        logger.debug('Успешно отправлено сообщение: %s', message)
+
+
+def make_file_handler(directory, name):
+    handler = logging.FileHandler(os.path.join(directory, name))
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def measure(cycle, logger, homeworks, number):
+    return min(timeit.repeat(lambda: cycle(logger, homeworks),
+                             number=number, repeat=5)) / number
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--homeworks', type=int, default=20)
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+    homeworks = [(f'hw{number}.zip', 'approved')
+                 for number in range(args.homeworks)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_logger = logging.getLogger('bench.legacy')
+        legacy_logger.propagate = False
+        legacy_logger.addHandler(make_file_handler(directory, 'legacy.log'))
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue,
+                                 make_file_handler(directory, 'queue.log'))
+        listener.start()
+        deferred_logger = logging.getLogger('bench.deferred')
+        deferred_logger.propagate = False
+        deferred_logger.addHandler(DeferredQueueHandler(log_queue))
+
+        for level in (logging.DEBUG, logging.INFO):
+            legacy_logger.setLevel(level)
+            deferred_logger.setLevel(level)
+            before = measure(legacy_cycle, legacy_logger, homeworks,
+                             args.number)
+            after = measure(deferred_cycle, deferred_logger, homeworks,
+                            args.number)
+            print(f'уровень {logging.getLevelName(level)}: '
+                  f'до {before * 1e6:.1f} мкс/цикл, '
+                  f'после {after * 1e6:.1f} мкс/цикл, '
+                  f'выигрыш {before / after:.1f}x')
+        listener.stop()
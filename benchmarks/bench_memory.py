@@ -0,0 +1,100 @@
+"""
+Бенчмарк памяти на получателя в режиме нескольких получателей.
+Сравнивает объекты engine.Tenant (__slots__, заголовки по требованию,
+интернированные сообщения об ошибках) с прежним представлением:
+обычный объект с __dict__ и готовым словарём заголовков. Отдельно
+меряется индекс статусов для /status с одной домашкой на получателя.
+
+Запуск: python benchmarks/bench_memory.py --tenants 100000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+import homework  # noqa: E402
+from commands import StatusIndex  # noqa: E402
+
+ERROR = 'Ошибка доступа к API сервиса. Код ответа: 503'
+
+
+class DictTenant:
+    """Прежнее представление получателя: атрибуты в __dict__."""
+
+    def __init__(self, practicum_token, chat_id, timestamp=None):
+        self.practicum_token = practicum_token
+        self.chat_id = chat_id
+        self.headers = homework.make_headers(practicum_token)
+        self.timestamp = timestamp
+        self.last_message = None
+        self.in_flight = False
+        self.last_empty_response = None
+
+
+def measure(build):
+    """Возвращает результат build() и занятую им память в байтах."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def make_tenants(path, tenant_class, intern_errors):
+    with open(path, encoding='utf-8') as tenants_file:
+        records = json.load(tenants_file)
+    tenants = [tenant_class(record['practicum_token'], record['chat_id'],
+                            record['timestamp'])
+               for record in records]
+    del records
+    for tenant in tenants:
+        # Одинаковая ошибка у всех: так выглядит сбой API.
+        message = f'Возникла ошибка! {ERROR}'
+        tenant.last_message = sys.intern(message) if intern_errors else message
+    return tenants
+
+
+def make_index(count):
+    index = StatusIndex(homework.HOMEWORK_VERDICTS)
+    for chat_id in range(count):
+        index.update(chat_id, [json.loads(json.dumps({
+            'id': chat_id, 'homework_name': 'username__hw_python_oop.zip',
+            'status': 'approved', 'date_updated': '2024-01-01T00:00:00Z'
+        }))])
+    return index
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tenants.json')
+        with open(path, 'w', encoding='utf-8') as tenants_file:
+            json.dump([{'practicum_token': f'y0_AgAAAAA{number:024d}',
+                        'chat_id': 100000000 + number,
+                        'timestamp': 1700000000}
+                       for number in range(count)], tenants_file)
+        _, old = measure(lambda: make_tenants(path, DictTenant, False))
+        tenants, new = measure(
+            lambda: make_tenants(path, engine.Tenant, True)
+        )
+    _, index = measure(lambda: make_index(count))
+    print(f'получателей: {count}')
+    print(f'объект с __dict__: {old / count:.0f} байт на получателя')
+    print(f'engine.Tenant:     {new / count:.0f} байт на получателя '
+          f'(экономия {(1 - new / old) * 100:.0f}%)')
+    print(f'индекс статусов:   {index / count:.0f} байт на получателя')
+    assert tenants[0].headers['Authorization'].startswith('OAuth ')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=100000)
+    run(parser.parse_args().tenants)
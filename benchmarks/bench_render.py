@@ -0,0 +1,62 @@
+"""
+Микробенчмарк сборки уведомлений: 1 000 000 сообщений.
+Сравнивает прежнюю сборку (поиск вердикта в HOMEWORK_VERDICTS
+и f-строка на каждый вызов) со скомпилированными шаблонами
+MessageCatalog для русской и английской локалей и с выводом
+дополнительных полей.
+
+Запуск: python benchmarks/bench_render.py --renders 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+
+HOMEWORKS = [
+    {'id': number, 'homework_name': f'hw{number}.zip',
+     'status': status, 'lesson_name': 'Итоговый проект',
+     'reviewer_comment': 'Всё нравится'}
+    for number, status in enumerate(homework.HOMEWORK_VERDICTS)
+]
+
+
+def legacy_render(item):
+    """Сборка сообщения в том виде, в каком она была в parse_status."""
+    verdict = homework.HOMEWORK_VERDICTS.get(item['status'])
+    return (f'Изменился статус проверки работы "{item["homework_name"]}". '
+            f'{verdict}')
+
+
+def measure(render, renders):
+    items = (HOMEWORKS * (renders // len(HOMEWORKS) + 1))[:renders]
+    started = time.perf_counter()
+    for item in items:
+        render(item)
+    return time.perf_counter() - started
+
+
+def report(name, elapsed, renders):
+    print(f'{name}: {elapsed:.3f} с, {renders / elapsed / 1e6:.2f} млн '
+          f'сообщений/с')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--renders', type=int, default=1_000_000)
+    renders = parser.parse_args().renders
+    render = homework.messages.render
+    extras = ('lesson_name', 'reviewer_comment')
+
+    print(f'сообщений: {renders}')
+    report('f-строка и HOMEWORK_VERDICTS',
+           measure(legacy_render, renders), renders)
+    report('шаблоны, ru', measure(render, renders), renders)
+    report('шаблоны, en', measure(lambda item: render(item, 'en'), renders),
+           renders)
+    report('шаблоны, ru + доп. поля',
+           measure(lambda item: render(item, 'ru', extras), renders),
+           renders)
@@ -0,0 +1,120 @@
+"""
+Бенчмарк колеса таймеров (scheduler.py) для сроков опроса.
+Для 10 тысяч, 100 тысяч и миллиона получателей сроки равномерно
+разносятся по RETRY_PERIOD, затем моделируется один период с тактом
+1 с: сработавший срок сразу переносится на RETRY_PERIOD вперёд, как
+в движке с --spread. Печатаются затраты на вставку, отмену и такт
+для колеса и для кучи (heapq) и неравномерность нагрузки: максимум
+и коэффициент вариации опросов за такт. Для сравнения - опрос всех
+получателей в начале цикла, как без --spread.
+
+Запуск: python benchmarks/bench_scheduler.py --tenants 10000 100000 1000000
+"""
+import argparse
+import heapq
+import itertools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework import RETRY_PERIOD  # noqa: E402
+from scheduler import TimingWheel  # noqa: E402
+
+CANCEL_SHARE = 0.1
+
+
+def spread_deadlines(count, period):
+    return [period * number / count for number in range(count)]
+
+
+def load_stats(per_tick):
+    mean = statistics.fmean(per_tick)
+    return max(per_tick), statistics.pstdev(per_tick) / mean
+
+
+def bench_wheel(count, period):
+    wheel = TimingWheel(tick=1.0)
+    started = time.perf_counter()
+    timers = [wheel.schedule(number, deadline)
+              for number, deadline in enumerate(spread_deadlines(count,
+                                                                 period))]
+    insert = (time.perf_counter() - started) / count
+
+    cancelled = timers[::int(1 / CANCEL_SHARE)]
+    started = time.perf_counter()
+    for timer in cancelled:
+        wheel.cancel(timer)
+    cancel = (time.perf_counter() - started) / len(cancelled)
+    for timer in cancelled:
+        wheel.reschedule(timer, timer.deadline)
+
+    per_tick = []
+    started = time.perf_counter()
+    for now in range(1, int(period) + 1):
+        fired = wheel.advance(now)
+        for timer in fired:
+            wheel.reschedule(timer, timer.deadline + period)
+        per_tick.append(len(fired))
+    tick = (time.perf_counter() - started) / period
+    return insert, cancel, tick, per_tick
+
+
+def bench_heap(count, period):
+    order = itertools.count()
+    heap = []
+    cancelled = set()
+    started = time.perf_counter()
+    for number, deadline in enumerate(spread_deadlines(count, period)):
+        heapq.heappush(heap, (deadline, next(order), number))
+    insert = (time.perf_counter() - started) / count
+
+    # Отмена в куче - пометка; запись выбрасывается при извлечении.
+    started = time.perf_counter()
+    for number in range(0, count, int(1 / CANCEL_SHARE)):
+        cancelled.add(number)
+    cancel = (time.perf_counter() - started) / len(cancelled)
+
+    per_tick = []
+    started = time.perf_counter()
+    for now in range(1, int(period) + 1):
+        fired = 0
+        while heap and heap[0][0] <= now:
+            deadline, _, number = heapq.heappop(heap)
+            if number in cancelled:
+                cancelled.discard(number)
+            heapq.heappush(heap, (deadline + period, next(order), number))
+            fired += 1
+        per_tick.append(fired)
+    tick = (time.perf_counter() - started) / period
+    return insert, cancel, tick, per_tick
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, nargs='+',
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--period', type=float, default=RETRY_PERIOD)
+    args = parser.parse_args()
+
+    for count in args.tenants:
+        print(f'получателей: {count}, период: {args.period:.0f} с, '
+              f'такт: 1 с')
+        for name, bench in (('колесо', bench_wheel), ('куча', bench_heap)):
+            insert, cancel, tick, per_tick = bench(count, args.period)
+            peak, variation = load_stats(per_tick)
+            print(f'  {name}: вставка {insert * 1e9:.0f} нс, '
+                  f'отмена {cancel * 1e9:.0f} нс, '
+                  f'такт {tick * 1e3:.2f} мс '
+                  f'({tick / max(1, count / args.period) * 1e9:.0f} нс '
+                  f'на опрос), '
+                  f'опросов за такт: макс {peak}, '
+                  f'вариация {variation:.1%}')
+        print(f'  без --spread: все {count} опросов в первый такт '
+              f'цикла, затем {int(args.period) - 1} тактов без опросов')
+
+
+if __name__ == '__main__':
+    main()
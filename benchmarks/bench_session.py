@@ -0,0 +1,81 @@
+"""
+Бенчмарк задержки одного опроса: requests.get против пула соединений.
+Поднимает локальный HTTP/1.1 сервер, отвечающий как API Практикума,
+и сравнивает задержку get_api_answer без сессии (новое соединение
+на каждый запрос) и с настроенной keep-alive сессией.
+Локальный сервер работает без TLS, поэтому в реальной сети выигрыш
+больше: там к установке TCP-соединения добавляется TLS-рукопожатие.
+
+Запуск: python benchmarks/bench_session.py --polls 500
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+import http_session  # noqa: E402
+
+BODY = json.dumps({'homeworks': [], 'current_date': 0}).encode()
+
+
+class PracticumStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(polls):
+    latencies = []
+    for _ in range(polls):
+        started = time.perf_counter()
+        homework.get_api_answer(0)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+    }
+
+
+def report(name, result):
+    print(f'{name:<22} p50 {result["p50_ms"]:.3f} мс, '
+          f'p99 {result["p99_ms"]:.3f} мс, '
+          f'среднее {result["mean_ms"]:.3f} мс')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--polls', type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PracticumStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    homework.ENDPOINT = f'http://127.0.0.1:{server.server_port}/'
+
+    http_session.close()
+    plain = measure(args.polls)
+    http_session.configure()
+    pooled = measure(args.polls)
+    http_session.close()
+    server.shutdown()
+
+    report('requests.get', plain)
+    report('keep-alive сессия', pooled)
+    print(f'ускорение p50: {plain["p50_ms"] / pooled["p50_ms"]:.2f}x')
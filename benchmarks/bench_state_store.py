@@ -0,0 +1,52 @@
+"""
+Бенчмарк холодного и тёплого старта хранилища состояния.
+Заполняет SQLite-базу курсорами для N получателей и измеряет,
+за сколько восстанавливаются их курсоры при перезапуске.
+
+Запуск: python benchmarks/bench_state_store.py --tenants 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+from state_store import StateStore  # noqa: E402
+from tests.check_utils import MockTelegramBot  # noqa: E402
+
+
+def run(tenants_count):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.db')
+        store = StateStore(path)
+        tenants = [engine.Tenant('token', chat_id, timestamp=0)
+                   for chat_id in range(tenants_count)]
+        started = time.perf_counter()
+        for tenant in tenants:
+            store.save_cursor(tenant.state_key, 1000 + tenant.chat_id,
+                              'Изменился статус')
+        fill = time.perf_counter() - started
+        store.close()
+
+        started = time.perf_counter()
+        store = StateStore(path)
+        polling_engine = engine.PollingEngine(MockTelegramBot(), tenants,
+                                              store=store)
+        polling_engine.warm_start()
+        warm = time.perf_counter() - started
+        store.close()
+    assert tenants[-1].timestamp == 1000 + tenants_count - 1
+    print(f'получателей: {tenants_count}')
+    print(f'запись курсоров: {fill:.3f} с '
+          f'({fill / tenants_count * 1e6:.1f} мкс на запись)')
+    print(f'тёплый старт (открытие базы и восстановление): '
+          f'{warm * 1000:.1f} мс')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tenants', type=int, default=100000)
+    run(parser.parse_args().tenants)
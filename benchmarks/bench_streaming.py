@@ -0,0 +1,78 @@
+"""
+Бенчмарк памяти: разбор ответа API целиком против потокового разбора.
+Синтетический ответ с полной историей домашек (несколько мегабайт)
+подаётся кусками по 64 КБ, как их отдаёт response.iter_content.
+«Целиком» - json.loads, check_response и parse_statuses;
+«потоково» - HomeworkStream и parse_status для каждой домашки.
+Пиковая память считается через tracemalloc.
+
+Запуск: python benchmarks/bench_streaming.py --homeworks 20000 40000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from streaming import CHUNK_SIZE, HomeworkStream  # noqa: E402
+
+
+def make_payload(homeworks_count):
+    return json.dumps({
+        'homeworks': [
+            {'id': number, 'homework_name': f'project_{number}.zip',
+             'status': 'approved',
+             'reviewer_comment': 'Отличная работа, замечаний нет! ' * 3,
+             'date_updated': '2021-04-11T10:31:09Z',
+             'lesson_name': 'Проект спринта: Деплой бота'}
+            for number in range(homeworks_count)
+        ],
+        'current_date': 1000198991
+    }, ensure_ascii=False).encode('utf-8')
+
+
+def chunks(payload):
+    for start in range(0, len(payload), CHUNK_SIZE):
+        yield payload[start:start + CHUNK_SIZE]
+
+
+def whole(payload):
+    data = json.loads(b''.join(chunks(payload)))
+    return len(homework.parse_statuses(homework.check_response(data)))
+
+
+def streamed(payload):
+    rendered = 0
+    for item in HomeworkStream(chunks(payload)):
+        homework.parse_status(item)
+        rendered += 1
+    return rendered
+
+
+def measure(func, payload):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func(payload)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak, elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--homeworks', type=int, nargs='+',
+                        default=[10000, 20000, 40000])
+    args = parser.parse_args()
+    for homeworks_count in args.homeworks:
+        payload = make_payload(homeworks_count)
+        print(f'ответ {len(payload) / 2 ** 20:.1f} МБ, '
+              f'{homeworks_count} домашек')
+        for name, func in (('целиком', whole), ('потоково', streamed)):
+            count, peak, elapsed = measure(func, payload)
+            print(f'  {name:<9} пик памяти {peak / 2 ** 20:7.2f} МБ, '
+                  f'{elapsed:.2f} с, обработано {count}')
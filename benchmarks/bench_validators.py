@@ -0,0 +1,82 @@
+"""
+Микробенчмарк проверки ответа API с 10 000 домашек.
+Сравнивает прежнюю check_type_and_keys (схема - словарь, создаваемый
+при каждом вызове, и отладочные f-строки) со скомпилированными
+validate_response и validate_homework из homework.py.
+
+Запуск: python benchmarks/bench_validators.py --items 10000
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from exceptions import ExpectedKeyNotFound  # noqa: E402
+
+logger = logging.getLogger('legacy')
+
+
+def legacy_check_type_and_keys(response, example, element_name,
+                               return_key=None):
+    """check_type_and_keys в том виде, в каком она была до компиляции."""
+    expected_type = dict
+    return_item = None
+    if not isinstance(response, expected_type):
+        raise TypeError(f'Некорректный {element_name}.')
+    logger.debug(f'''Тип {element_name} проверен:
+                 полученный тип соответствует ожидаемому.''')
+    for key, value in example.items():
+        if key not in response.keys():
+            raise ExpectedKeyNotFound(key, element_name)
+        elif key == return_key:
+            return_item = response[key]
+        if not isinstance(response[key], value):
+            raise TypeError(f'Некорректный {element_name}.')
+    logger.debug(f'''{element_name} проверен.
+                 Все ожидаемые ключи {example.keys()}
+                 на месте.''')
+    if return_item:
+        return return_item
+
+
+def legacy_validate(response):
+    homeworks = legacy_check_type_and_keys(
+        response, {'homeworks': list, 'current_date': int},
+        'Ответ API', 'homeworks'
+    )
+    for item in homeworks:
+        legacy_check_type_and_keys(
+            item, {'homework_name': str, 'status': str},
+            'Элемент из списка с домашкой'
+        )
+
+
+def compiled_validate(response):
+    for item in homework.validate_response(response):
+        homework.validate_homework(item)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    response = {
+        'homeworks': [{'id': number, 'homework_name': f'hw{number}.zip',
+                       'status': 'approved'}
+                      for number in range(args.items)],
+        'current_date': 0
+    }
+    legacy = min(timeit.repeat(lambda: legacy_validate(response),
+                               number=1, repeat=args.repeat))
+    compiled = min(timeit.repeat(lambda: compiled_validate(response),
+                                 number=1, repeat=args.repeat))
+    print(f'домашек в ответе: {args.items}')
+    print(f'check_type_and_keys: {legacy * 1000:.2f} мс')
+    print(f'скомпилированные схемы: {compiled * 1000:.2f} мс')
+    print(f'ускорение: {legacy / compiled:.1f}x')
@@ -0,0 +1,157 @@
+"""
+Нагрузочный прогон бота против локальных заменителей API Практикума
+и Telegram Bot API (tests/fake_servers.py) без выхода в сеть.
+Режим main гоняет полный путь main(): настоящий requests, настоящий
+TeleBot, проверка ответа, dedup и хранилище состояния; пауза между
+опросами убрана. Режим engine делает то же для N получателей через
+движок опроса. Заменители работают в отдельных процессах, чтобы не
+делить с ботом GIL. В конце печатается устойчивая пропускная
+способность: опросы и доставленные уведомления в секунду.
+
+Запуск:
+    python benchmarks/load_test.py --mode main --duration 10
+    python benchmarks/load_test.py --mode engine --tenants 1000 \\
+        --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from telebot import TeleBot, apihelper  # noqa: E402
+
+import engine  # noqa: E402
+import homework  # noqa: E402
+import http_session  # noqa: E402
+from delivery import DeliveryQueue  # noqa: E402
+from state_store import IN_MEMORY  # noqa: E402
+from tests.fake_servers import (API_URL_PATH, ENDPOINT_PATH,  # noqa: E402
+                                STATS_PATH, FakePracticum, FakeTelegram)
+
+
+class Stop(Exception):
+    """Время прогона вышло."""
+
+
+def serve(server_class, kwargs, addresses):
+    """Точка входа процесса с заменителем: сервер до завершения процесса."""
+    server = server_class(**kwargs).start()
+    addresses.put(server.url)
+    threading.Event().wait()
+
+
+def start_server(context, server_class, **kwargs):
+    """Запускает заменитель в отдельном процессе; возвращает его и адрес."""
+    addresses = context.Queue()
+    process = context.Process(target=serve,
+                              args=(server_class, kwargs, addresses),
+                              daemon=True)
+    process.start()
+    return process, addresses.get(timeout=30)
+
+
+def get_stats(url):
+    return requests.get(url + STATS_PATH, timeout=5).json()
+
+
+def run_main(duration):
+    """Крутит main() без пауз, пока не выйдет duration секунд."""
+    deadline = time.monotonic() + duration
+
+    def sleep(seconds):
+        if time.monotonic() >= deadline:
+            raise Stop
+
+    homework.time = SimpleNamespace(time=time.time, sleep=sleep)
+    try:
+        homework.main()
+    except Stop:
+        pass
+    finally:
+        homework.time = time
+
+
+async def run_for(polling_engine, duration):
+    try:
+        await asyncio.wait_for(polling_engine.run(), duration)
+    except asyncio.TimeoutError:
+        pass
+
+
+def run_engine(tenants_count, concurrency, duration):
+    """Движок опроса для tenants_count получателей без пауз между циклами."""
+    bot = TeleBot(token=homework.TELEGRAM_TOKEN)
+    tenants = [engine.Tenant(f'token-{number}', number, timestamp=0)
+               for number in range(tenants_count)]
+    # Лимиты Telegram здесь не измеряются: снимаем их.
+    delivery = DeliveryQueue(bot, global_rate=1e9, global_burst=1e9,
+                             chat_burst=1e9)
+    polling_engine = engine.PollingEngine(bot, tenants, concurrency,
+                                          retry_period=0.05,
+                                          delivery=delivery)
+    asyncio.run(run_for(polling_engine, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=('main', 'engine'), default='main')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--tenants', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='задержка ответов обоих серверов, в секундах')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='доля ответов с ошибкой у обоих серверов')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    homework.PRACTICUM_TOKEN = 'load-test'
+    homework.HEADERS = homework.make_headers(homework.PRACTICUM_TOKEN)
+    homework.TELEGRAM_TOKEN = '1234:load-test'
+    homework.TELEGRAM_CHAT_ID = '12345'
+    # Состояние прошлых прогонов не должно влиять на замер.
+    homework.STATE_DB = IN_MEMORY
+    context = multiprocessing.get_context('spawn')
+    server_options = {'latency': args.latency,
+                      'error_rate': args.error_rate,
+                      'seed': args.seed}
+    practicum, practicum_url = start_server(context, FakePracticum,
+                                            **server_options)
+    telegram, telegram_url = start_server(context, FakeTelegram,
+                                          **server_options)
+    homework.ENDPOINT = practicum_url + ENDPOINT_PATH
+    apihelper.API_URL = telegram_url + API_URL_PATH
+    http_session.configure(max(http_session.POOL_SIZE, args.concurrency))
+
+    started = time.perf_counter()
+    if args.mode == 'main':
+        run_main(args.duration)
+    else:
+        run_engine(args.tenants, args.concurrency, args.duration)
+    elapsed = time.perf_counter() - started
+    polls = get_stats(practicum_url)
+    sent = get_stats(telegram_url)
+    practicum.terminate()
+    telegram.terminate()
+
+    print(f'режим: {args.mode}, длительность: {elapsed:.1f} с, '
+          f'задержка: {args.latency} с, доля ошибок: {args.error_rate}')
+    print(f'опросов API: {polls["requests"]} '
+          f'({polls["requests"] / elapsed:.0f}/с), '
+          f'из них с ошибкой: {polls["errors"]}')
+    print(f'доставлено сообщений: {sent["messages"]} '
+          f'({sent["messages"] / elapsed:.0f}/с), '
+          f'ошибок Telegram: {sent["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
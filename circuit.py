@@ -0,0 +1,181 @@
+"""
+Автоматические выключатели (circuit breakers) для API Практикума
+и Telegram. Выключатель общий для всех получателей: после
+failure_threshold сбоев подряд он размыкается, и вызовы сразу
+завершаются исключением CircuitOpen, не дожидаясь таймаутов.
+Через reset_timeout секунд выключатель переходит в полуоткрытое
+состояние и пропускает один пробный вызов: успех замыкает его,
+сбой снова размыкает. Состояние видно в метрике
+homework_circuit_state (0 - замкнут, 1 - разомкнут, 2 - полуоткрыт).
+Пока выключатели не настроены через configure(), они всегда замкнуты.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+
+import metrics
+from exceptions import ApiError, CircuitOpen, RequestError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 60
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_STATE = metrics.Gauge(
+    'homework_circuit_state',
+    'Состояние выключателя: 0 - замкнут, 1 - разомкнут, 2 - полуоткрыт.',
+    labelnames=('breaker',)
+)
+CIRCUIT_REJECTED = metrics.Counter(
+    'homework_circuit_rejected',
+    'Вызовы, отклонённые разомкнутым выключателем.',
+    labelnames=('breaker',)
+)
+
+
+def is_practicum_failure(error):
+    """
+    Проверяет, говорит ли ошибка о недоступности API Практикума.
+    Ошибки конкретного токена (401, 400) выключатель не размыкают.
+    """
+    if isinstance(error, RequestError):
+        return True
+    if isinstance(error, ApiError):
+        return (error.response_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+                or error.response_code == HTTPStatus.TOO_MANY_REQUESTS)
+    return False
+
+
+def is_telegram_failure(error):
+    """
+    Проверяет, говорит ли ошибка о недоступности Telegram.
+    Сетевые ошибки и ответы 5xx - сбой, ошибки конкретного
+    чата (400, 403) и 429 - нет.
+    """
+    error_code = getattr(error, 'error_code', None)
+    return (error_code is None
+            or error_code >= HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+class CircuitBreaker:
+    """
+    Выключатель с состояниями closed, open и half_open.
+    Один объект можно использовать из нескольких потоков.
+    В качестве параметров класс принимает:
+    name - имя выключателя для метрик и сообщений
+    failure_threshold - число сбоев подряд до размыкания, 0 - отключён
+    reset_timeout - время до пробного вызова, в секундах
+    clock - функция текущего времени (для тестов)
+    """
+
+    def __init__(self, name, failure_threshold=0,
+                 reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._gauge = CIRCUIT_STATE.labels(name)
+        self._rejected = CIRCUIT_REJECTED.labels(name)
+        self._gauge.set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self):
+        """Текущее состояние выключателя."""
+        return self._state
+
+    def _set_state(self, state):
+        if state != self._state:
+            logger.warning('Выключатель %s: %s -> %s',
+                           self.name, self._state, state)
+        self._state = state
+        self._gauge.set(STATE_VALUES[state])
+
+    def before_call(self):
+        """
+        Разрешает вызов или выбрасывает CircuitOpen.
+        В полуоткрытом состоянии пропускает только один пробный вызов.
+        """
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            if self._state == OPEN:
+                retry_in = (self._opened_at + self.reset_timeout
+                            - self._clock())
+                if retry_in > 0:
+                    self._rejected.inc()
+                    raise CircuitOpen(self.name, retry_in)
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    self._rejected.inc()
+                    raise CircuitOpen(self.name, self.reset_timeout)
+                self._probing = True
+
+    def record_success(self):
+        """Учитывает успешный вызов: выключатель замыкается."""
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        """Учитывает сбой; после failure_threshold сбоев размыкает."""
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if (self._state == HALF_OPEN
+                    or self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                self._set_state(OPEN)
+
+    @contextmanager
+    def guard(self, is_failure):
+        """
+        Оборачивает вызов внешнего сервиса.
+        Исключения, для которых is_failure(error) ложно, означают,
+        что сервис ответил, и считаются успехом.
+        """
+        self.before_call()
+        try:
+            yield
+        except Exception as error:
+            if is_failure(error):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+
+PRACTICUM = CircuitBreaker('practicum')
+TELEGRAM = CircuitBreaker('telegram')
+
+
+def configure(failure_threshold=FAILURE_THRESHOLD,
+              reset_timeout=RESET_TIMEOUT):
+    """
+    Включает выключатели для API Практикума и Telegram.
+    В качестве параметров функция принимает:
+    failure_threshold - число сбоев подряд до размыкания, 0 - отключить
+    reset_timeout - время до пробного вызова, в секундах
+    """
+    for breaker in (PRACTICUM, TELEGRAM):
+        with breaker._lock:
+            breaker.failure_threshold = failure_threshold
+            breaker.reset_timeout = reset_timeout
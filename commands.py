@@ -0,0 +1,131 @@
+"""
+Ответы на команды /status и /history в Telegram без запросов к API.
+StatusIndex хранит последний известный статус каждой домашки для
+каждого чата. Индекс обновляет цикл опроса (main() или движок для
+нескольких получателей), а обработчики команд только читают его,
+поэтому ответ собирается за доли миллисекунды и не стоит запросов
+к Практикуму. Готовые тексты ответов кэшируются до следующего
+обновления индекса для этого чата.
+"""
+import logging
+import sys
+import threading
+
+HISTORY_LIMIT = 20
+NO_DATA = 'Пока нет данных о ваших домашних работах.'
+
+logger = logging.getLogger(__name__)
+
+
+def intern(value):
+    """
+    Интернирует строку: статусы и названия работ повторяются у тысяч
+    получателей, и в индексе хранится по одной копии каждой строки.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class StatusIndex:
+    """
+    Последние известные статусы домашек по чатам.
+    Один объект можно использовать из нескольких потоков.
+    В качестве параметров класс принимает:
+    verdicts - словарь статус -> вердикт (HOMEWORK_VERDICTS)
+    history_limit - максимальное число домашек в ответе на /history
+    """
+
+    def __init__(self, verdicts, history_limit=HISTORY_LIMIT):
+        self.verdicts = verdicts
+        self.history_limit = history_limit
+        self._chats = {}
+        self._replies = {}
+        self._lock = threading.Lock()
+
+    def update(self, chat_id, homeworks):
+        """
+        Запоминает статусы домашек из ответа API или хранилища.
+        Более старая версия домашки не заменяет уже известную.
+        """
+        chat_key = str(chat_id)
+        with self._lock:
+            chat = self._chats.setdefault(chat_key, {})
+            for homework in homeworks:
+                homework_key = homework.get('id',
+                                            homework.get('homework_name'))
+                entry = (str(homework.get('date_updated') or ''),
+                         intern(homework.get('homework_name')),
+                         intern(homework.get('status')))
+                known = chat.get(homework_key)
+                if known is None or entry[0] >= known[0]:
+                    chat[homework_key] = entry
+            self._replies.pop(chat_key, None)
+
+    def __len__(self):
+        return sum(len(chat) for chat in self._chats.values())
+
+    def _entries(self, chat_key):
+        """Домашки чата от недавно обновлённых к старым."""
+        return sorted(self._chats.get(chat_key, {}).values(), reverse=True)
+
+    def _line(self, entry):
+        _, homework_name, status = entry
+        verdict = self.verdicts.get(status, f'Статус: {status}')
+        return f'"{homework_name}". {verdict}'
+
+    def _reply(self, chat_id, command):
+        chat_key = str(chat_id)
+        with self._lock:
+            replies = self._replies.setdefault(chat_key, {})
+            reply = replies.get(command)
+            if reply is None:
+                reply = self._render(chat_key, command)
+                replies[command] = reply
+        return reply
+
+    def _render(self, chat_key, command):
+        entries = self._entries(chat_key)
+        if not entries:
+            return NO_DATA
+        if command == 'status':
+            return f'Последняя работа: {self._line(entries[0])}'
+        lines = [self._line(entry)
+                 for entry in entries[:self.history_limit]]
+        return 'Ваши работы:\n' + '\n'.join(lines)
+
+    def status_reply(self, chat_id):
+        """Текст ответа на /status: последняя обновлённая домашка."""
+        return self._reply(chat_id, 'status')
+
+    def history_reply(self, chat_id):
+        """Текст ответа на /history: домашки с последними статусами."""
+        return self._reply(chat_id, 'history')
+
+
+def register_handlers(bot, index):
+    """
+    Регистрирует обработчики /status и /history.
+    В качестве параметров функция принимает:
+    bot - экземпляр класса TeleBot
+    index - индекс статусов (StatusIndex)
+    """
+    @bot.message_handler(commands=['status'])
+    def answer_status(message):
+        bot.reply_to(message, index.status_reply(message.chat.id))
+
+    @bot.message_handler(commands=['history'])
+    def answer_history(message):
+        bot.reply_to(message, index.history_reply(message.chat.id))
+
+
+def start_polling(bot, index):
+    """
+    Запускает приём команд в фоновом потоке через long polling.
+    Возвращает поток.
+    """
+    register_handlers(bot, index)
+    thread = threading.Thread(target=bot.infinity_polling,
+                              kwargs={'skip_pending': True},
+                              name='telegram-commands', daemon=True)
+    thread.start()
+    logger.info('Бот принимает команды /status и /history.')
+    return thread
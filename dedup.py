@@ -0,0 +1,88 @@
+"""
+Индекс уже доставленных смен статусов домашек.
+Смена статуса определяется полями id, status и date_updated из ответа
+API. Если бот отправил сообщение, но упал до сдвига курсора, или окна
+опроса пересеклись, повторная смена статуса отбрасывается до вызова
+send_message. Индекс ограничен по размеру (LRU) и по возрасту записей
+(TTL) и сохраняется в хранилище состояния между перезапусками.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+MAX_SIZE = 100_000
+TTL = 7 * 24 * 60 * 60
+
+
+def delivered_key(homework):
+    """
+    Возвращает ключ смены статуса (id, status, date_updated).
+    Для домашки без id возвращает None: такую смену нельзя
+    отличить от другой, и она всегда считается новой.
+    """
+    homework_id = homework.get('id')
+    if homework_id is None:
+        return None
+    return (str(homework_id),
+            str(homework.get('status')),
+            str(homework.get('date_updated')))
+
+
+class DeliveredIndex:
+    """
+    Ограниченный LRU/TTL-индекс доставленных смен статусов.
+    Ключи хранятся отдельно для каждого получателя, поэтому одна
+    и та же домашка может быть доставлена в разные чаты.
+    """
+
+    def __init__(self, store=None, max_size=MAX_SIZE, ttl=TTL,
+                 clock=time.time):
+        self.store = store
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if store is not None:
+            self._load()
+
+    def _load(self):
+        for tenant_key, *key, delivered_at in self.store.load_delivered(
+                self._clock() - self.ttl):
+            self._entries[(tenant_key, *key)] = delivered_at
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def seen(self, tenant_key, key):
+        """Проверяет, доставлялась ли уже эта смена статуса получателю."""
+        if key is None:
+            return False
+        entry = (str(tenant_key), *key)
+        with self._lock:
+            delivered_at = self._entries.get(entry)
+            if delivered_at is None:
+                return False
+            if self._clock() - delivered_at > self.ttl:
+                del self._entries[entry]
+                return False
+            self._entries.move_to_end(entry)
+            return True
+
+    def remember(self, tenant_key, key):
+        """Отмечает смену статуса как доставленную получателю."""
+        if key is None:
+            return
+        entry = (str(tenant_key), *key)
+        delivered_at = self._clock()
+        with self._lock:
+            self._entries[entry] = delivered_at
+            self._entries.move_to_end(entry)
+            self._evict()
+        if self.store is not None:
+            self.store.save_delivered(tenant_key, key, delivered_at)
@@ -0,0 +1,275 @@
+"""
+Очередь исходящих сообщений в Telegram с ограничением скорости.
+Сообщения отправляют рабочие потоки, поэтому опрос API не ждёт
+доставки. Скорость ограничена «ведром токенов» для каждого чата
+(около 1 сообщения в секунду) и общим ведром (около 30 сообщений
+в секунду). При ответе 429 отправка повторяется через retry_after
+секунд из ApiException, при прочих ошибках - с экспоненциальной паузой.
+Пока выключатель Telegram (circuit.py) разомкнут, отправка ждёт
+пробного запроса. С окном сводки пакеты одного чата склеиваются
+в одно сообщение (digest.py).
+"""
+import logging
+import queue
+import threading
+import time
+
+import circuit
+import metrics
+from digest import MESSAGE_LIMIT, SAVED_CALLS, Digest, DigestBuffer
+from exceptions import CircuitOpen
+from lazy_imports import lazy_import
+
+requests = lazy_import('requests')
+apihelper = lazy_import('telebot.apihelper')
+
+WORKERS = 8
+CHAT_RATE = 1
+CHAT_BURST = 3
+GLOBAL_RATE = 30
+GLOBAL_BURST = 30
+MAX_ATTEMPTS = 5
+BACKOFF = 1.0
+DIGEST_WINDOW = 0
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Потокобезопасное «ведро токенов».
+    reserve() забирает токен и возвращает, сколько секунд нужно
+    подождать, прежде чем им воспользоваться. Токены можно брать
+    в долг, поэтому ожидающие обслуживаются в порядке очереди.
+    """
+
+    __slots__ = ('rate', 'capacity', '_clock', '_tokens', '_updated',
+                 '_lock')
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Забирает токен и возвращает время ожидания в секундах."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+
+def get_retry_after(error):
+    """
+    Достаёт retry_after из ответа Telegram с кодом 429.
+    Возвращает None, если сервер не просил подождать.
+    """
+    result_json = getattr(error, 'result_json', None) or {}
+    parameters = result_json.get('parameters') or {}
+    return parameters.get('retry_after')
+
+
+def is_retryable(error):
+    """Проверяет, имеет ли смысл повторять отправку после ошибки."""
+    error_code = getattr(error, 'error_code', None)
+    if error_code is None:
+        return True
+    return error_code == 429 or error_code >= 500
+
+
+class DeliveryJob:
+    """Пакет сообщений для одного чата."""
+
+    __slots__ = ('chat_id', 'messages', 'on_done', 'on_sent')
+
+    def __init__(self, chat_id, messages, on_done=None, on_sent=None):
+        self.chat_id = chat_id
+        self.messages = messages
+        self.on_done = on_done
+        self.on_sent = on_sent
+
+
+class DeliveryQueue:
+    """
+    Очередь доставки с пулом рабочих потоков.
+    Пакет сообщений одного чата доставляет один поток по порядку;
+    on_done(delivered) вызывается после доставки всего пакета
+    или после первого сообщения, которое так и не удалось отправить.
+    Если окно сводки больше нуля, пакеты чата копятся window секунд
+    и уходят одной сводкой (digest.Digest).
+    """
+
+    def __init__(self, bot, workers=WORKERS, chat_rate=CHAT_RATE,
+                 chat_burst=CHAT_BURST, global_rate=GLOBAL_RATE,
+                 global_burst=GLOBAL_BURST, max_attempts=MAX_ATTEMPTS,
+                 backoff=BACKOFF, digest_window=DIGEST_WINDOW,
+                 message_limit=MESSAGE_LIMIT):
+        self.bot = bot
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.digest_window = digest_window
+        self.message_limit = message_limit
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._chat_buckets = {}
+        self._chat_buckets_lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._digests = DigestBuffer()
+        self._flusher = None
+        self._threads = []
+
+    def start(self):
+        """Запускает рабочие потоки и поток сводок."""
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work,
+                                      name=f'delivery-{number}',
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._flusher = threading.Thread(target=self._flush_digests,
+                                         name='delivery-digest',
+                                         daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        """
+        Доставляет уже поставленные пакеты, в том числе незакрытые
+        сводки, и останавливает потоки.
+        """
+        if self._flusher is not None:
+            self._digests.close()
+            self._flusher.join()
+            self._flusher = None
+            self._digests = DigestBuffer()
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, chat_id, messages, on_done=None, on_sent=None,
+               window=None):
+        """
+        Ставит пакет сообщений в очередь и сразу возвращает управление.
+        В качестве параметров функция принимает:
+        chat_id - идентификатор чата получателя
+        messages - список строк с текстами сообщений
+        on_done - функция, которой передаётся True, если доставлен
+        весь пакет, и False в противном случае
+        on_sent - функция, которой передаётся номер каждого
+        доставленного сообщения пакета
+        window - окно сводки для чата в секундах, None - окно очереди,
+        0 - отправлять без сводки
+        """
+        job = DeliveryJob(chat_id, messages, on_done, on_sent)
+        if window is None:
+            window = self.digest_window
+        if window > 0:
+            self._digests.add(job, window)
+        else:
+            self._jobs.put(job)
+
+    def pending(self):
+        """Количество пакетов и сводок, ожидающих доставки."""
+        return self._jobs.qsize() + self._digests.pending()
+
+    def _flush_digests(self):
+        while True:
+            due = self._digests.wait_due()
+            if due is None:
+                return
+            for chat_id, jobs in due:
+                self._jobs.put(self._make_digest(chat_id, jobs))
+
+    def _make_digest(self, chat_id, jobs):
+        digest = Digest(jobs, self.message_limit)
+        if digest.saved_calls:
+            SAVED_CALLS.inc(digest.saved_calls)
+            logger.debug('Сводка для чата %s: %s сообщений вместо %s',
+                         chat_id, len(digest.messages),
+                         len(digest.messages) + digest.saved_calls)
+        return DeliveryJob(chat_id, digest.messages, digest.on_done,
+                           digest.on_sent)
+
+    def _chat_bucket(self, chat_id):
+        with self._chat_buckets_lock:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+                self._chat_buckets[chat_id] = bucket
+            return bucket
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                delivered = self._deliver(job)
+            except Exception as error:
+                # Поток доставки не должен умирать: иначе on_done
+                # не вызовется, и получатель больше не будет опрошен.
+                logger.error(error, exc_info=True)
+                delivered = False
+            if job.on_done is not None:
+                try:
+                    job.on_done(delivered)
+                except Exception as error:
+                    logger.error(error, exc_info=True)
+
+    def _deliver(self, job):
+        for index, message in enumerate(job.messages):
+            if not self._send(job.chat_id, message):
+                return False
+            if job.on_sent is not None:
+                try:
+                    job.on_sent(index)
+                except Exception as error:
+                    # Сообщение уже отправлено: пакет доставляется дальше.
+                    logger.error(error, exc_info=True)
+        return True
+
+    def _wait_for_slot(self, chat_id):
+        time.sleep(max(self._chat_bucket(chat_id).reserve(),
+                       self.global_bucket.reserve()))
+
+    def _send(self, chat_id, message):
+        for attempt in range(1, self.max_attempts + 1):
+            self._wait_for_slot(chat_id)
+            try:
+                with circuit.TELEGRAM.guard(circuit.is_telegram_failure):
+                    with metrics.SEND_LATENCY.time():
+                        self.bot.send_message(chat_id=chat_id, text=message)
+                logger.debug('Успешно отправлено сообщение в чат %s',
+                             chat_id)
+                return True
+            except CircuitOpen as error:
+                logger.debug('Отправка в чат %s отложена: %s',
+                             chat_id, error)
+                if attempt == self.max_attempts:
+                    return False
+                time.sleep(error.retry_in)
+            except (apihelper.ApiException,
+                    requests.RequestException) as error:
+                logger.error('Ошибка отправки в чат %s (попытка %s): %s',
+                             chat_id, attempt, error)
+                metrics.count_error(error)
+                if not is_retryable(error) or attempt == self.max_attempts:
+                    return False
+                retry_after = get_retry_after(error)
+                if retry_after is None:
+                    retry_after = self.backoff * 2 ** (attempt - 1)
+                time.sleep(retry_after)
+        return False
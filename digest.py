@@ -0,0 +1,189 @@
+"""
+Сводки уведомлений: несколько смен статусов одного чата - одно
+сообщение в Telegram.
+Когда ревьюер проверяет много работ подряд, каждая смена статуса
+становится отдельным вызовом sendMessage и упирается в лимиты
+Telegram. Очередь доставки (delivery.py) с окном сводки держит
+пакеты чата window секунд с момента первого из них, а затем
+склеивает все накопленные уведомления в одно сообщение. Делить
+сводку на несколько сообщений приходится только на границе
+MESSAGE_LIMIT символов - ограничения Telegram на длину сообщения.
+"""
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+
+import metrics
+
+MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+
+logger = logging.getLogger(__name__)
+
+SAVED_CALLS = metrics.Counter(
+    'homework_digest_saved_calls',
+    'Вызовы sendMessage, сэкономленные склейкой уведомлений в сводки.'
+)
+
+
+def split_long(message, limit=MESSAGE_LIMIT):
+    """
+    Делит сообщение длиннее limit на части не длиннее limit.
+    Части по возможности режутся по переводу строки.
+    """
+    parts = []
+    while len(message) > limit:
+        cut = message.rfind('\n', 0, limit + 1)
+        if cut <= 0:
+            parts.append(message[:limit])
+            message = message[limit:]
+        else:
+            parts.append(message[:cut])
+            message = message[cut + 1:]
+    parts.append(message)
+    return parts
+
+
+def pack_messages(messages, limit=MESSAGE_LIMIT, separator=SEPARATOR):
+    """
+    Склеивает сообщения в как можно меньшее число частей до limit.
+    Возвращает список пар (текст части, номера сообщений, последний
+    кусок которых попал в эту часть).
+    В качестве параметров функция принимает:
+    messages - тексты сообщений по порядку
+    limit - максимальная длина одной части
+    separator - разделитель сообщений внутри части
+    """
+    parts = []
+    text = ''
+    completed = []
+    for index, message in enumerate(messages):
+        for piece in split_long(message, limit):
+            if text and len(text) + len(separator) + len(piece) > limit:
+                parts.append((text, completed))
+                text, completed = '', []
+            text = f'{text}{separator}{piece}' if text else piece
+        completed.append(index)
+    if text or completed:
+        parts.append((text, completed))
+    return parts
+
+
+class Digest:
+    """
+    Сводка из нескольких пакетов доставки одного чата.
+    Колбэки исходных пакетов вызываются по мере отправки частей:
+    on_sent - для каждого сообщения, целиком попавшего в отправленные
+    части, on_done - для каждого пакета, в том числе True для пакета,
+    все сообщения которого ушли до ошибки.
+    В качестве параметров класс принимает:
+    jobs - пакеты доставки (delivery.DeliveryJob) одного чата
+    limit - максимальная длина одного сообщения
+    """
+
+    def __init__(self, jobs, limit=MESSAGE_LIMIT):
+        self.jobs = jobs
+        origins = []
+        texts = []
+        for job in jobs:
+            for index, message in enumerate(job.messages):
+                origins.append((job, index))
+                texts.append(message)
+        parts = pack_messages(texts, limit)
+        self.messages = [text for text, _ in parts]
+        self._completed = [[origins[position] for position in completed]
+                           for _, completed in parts]
+        self._sent = dict.fromkeys(map(id, jobs), 0)
+        self.saved_calls = len(texts) - len(parts)
+
+    def on_sent(self, part):
+        for job, index in self._completed[part]:
+            self._sent[id(job)] += 1
+            if job.on_sent is None:
+                continue
+            try:
+                job.on_sent(index)
+            except Exception as error:
+                logger.error(error, exc_info=True)
+
+    def on_done(self, delivered):
+        for job in self.jobs:
+            if job.on_done is None:
+                continue
+            try:
+                job.on_done(delivered
+                            or self._sent[id(job)] == len(job.messages))
+            except Exception as error:
+                logger.error(error, exc_info=True)
+
+
+class DigestBuffer:
+    """
+    Пакеты доставки, ожидающие окончания окна сводки своего чата.
+    Окно отсчитывается от первого пакета чата; пакеты, пришедшие
+    позже, попадают в ту же сводку.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._pending = {}
+        self._deadlines = []
+        self._order = itertools.count()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def add(self, job, window):
+        """
+        Добавляет пакет в сводку его чата.
+        В качестве параметров функция принимает:
+        job - пакет доставки
+        window - окно сводки чата, в секундах
+        """
+        with self._condition:
+            jobs = self._pending.get(job.chat_id)
+            if jobs is not None:
+                jobs.append(job)
+                return
+            self._pending[job.chat_id] = [job]
+            heapq.heappush(self._deadlines, (self._clock() + window,
+                                             next(self._order), job.chat_id))
+            self._condition.notify()
+
+    def pending(self):
+        """Количество чатов, сводки которых ещё не готовы."""
+        with self._condition:
+            return len(self._pending)
+
+    def close(self):
+        """Отдаёт все сводки сразу, не дожидаясь окончания окон."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def wait_due(self):
+        """
+        Ждёт готовых сводок и возвращает список пар (чат, пакеты).
+        После close() возвращает оставшиеся сводки, затем None.
+        """
+        with self._condition:
+            while True:
+                if self._closed and not self._pending:
+                    return None
+                due = self._pop_due(math.inf if self._closed
+                                    else self._clock())
+                if due:
+                    return due
+                timeout = None
+                if self._deadlines:
+                    timeout = self._deadlines[0][0] - self._clock()
+                self._condition.wait(timeout)
+
+    def _pop_due(self, now):
+        due = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, chat_id = heapq.heappop(self._deadlines)
+            due.append((chat_id, self._pending.pop(chat_id)))
+        return due
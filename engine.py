@@ -0,0 +1,415 @@
+"""
+Асинхронный движок опроса API для нескольких получателей.
+Один процесс опрашивает API сервиса Практикум.Домашка для многих пар
+(токен Практикума, чат в Telegram). Проверка и разбор ответа остаются
+прежними: check_response и parse_status из homework.py.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import homework
+import metrics
+from dedup import DeliveredIndex, delivered_key
+from delivery import DIGEST_WINDOW, GLOBAL_RATE
+from delivery import WORKERS as DELIVERY_WORKERS
+from delivery import DeliveryQueue
+from exceptions import CircuitOpen, TokenMissing
+from profiling import NullProfiler
+from scheduler import TICK as SPREAD_TICK
+from scheduler import TimingWheel
+from sharding import shard_tenants
+from singleflight import SingleFlight
+from state_store import StateStore
+from templates import EXTRA_FIELDS
+
+DEFAULT_CONCURRENCY = 64
+STATE_KEY_DIGEST = 16
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_POLLS = metrics.Gauge(
+    'homework_scheduled_polls',
+    'Опросы в колесе таймеров движка (режим --spread).'
+)
+
+# Кортежи дополнительных полей, общие для всех получателей: у тысяч
+# получателей с одинаковым extras хранится один объект, а не копии.
+# Ключи - наборы полей из EXTRA_FIELDS, поэтому кэш ограничен.
+_shared_extras = {}
+
+
+class Tenant:
+    """
+    Получатель уведомлений: токен Практикума и чат в Telegram.
+    Движок держит в памяти по объекту на получателя, поэтому атрибуты
+    объявлены в __slots__: у объекта нет собственного __dict__,
+    а заголовки запроса собираются только на время опроса.
+    """
+
+    __slots__ = ('practicum_token', 'chat_id', 'timestamp', 'last_message',
+                 'in_flight', 'last_empty_response', 'locale', 'extras',
+                 'digest_window')
+
+    def __init__(self, practicum_token, chat_id, timestamp=None,
+                 locale=None, extras=(), digest_window=None):
+        self.practicum_token = practicum_token
+        self.chat_id = chat_id
+        self.digest_window = digest_window
+        unknown = set(extras) - set(EXTRA_FIELDS)
+        if unknown:
+            raise ValueError(f'Неизвестные дополнительные поля: {unknown}')
+        self.locale = sys.intern(locale) if locale else None
+        # Одинаковые наборы полей у разных получателей - один кортеж.
+        extras = tuple(extras)
+        self.extras = _shared_extras.setdefault(extras, extras)
+        if timestamp is None:
+            timestamp = int(time.time())
+        self.timestamp = timestamp
+        self.last_message = None
+        self.in_flight = False
+        self.last_empty_response = None
+
+    def __repr__(self):
+        return f'Tenant(chat_id={self.chat_id!r})'
+
+    @property
+    def headers(self):
+        """Заголовки запроса к API с токеном получателя."""
+        return homework.make_headers(self.practicum_token)
+
+    @property
+    def key(self):
+        """
+        Ключ чата: доставленные статусы, кэш статусов для команд
+        и доставка общие для всех подписок чата.
+        """
+        return str(self.chat_id)
+
+    @property
+    def state_key(self):
+        """
+        Ключ курсора и последней ошибки в хранилище состояния.
+        Чат может следить за несколькими аккаунтами Практикума
+        (канал группы, наставник), и у каждой подписки свой курсор.
+        Вместо токена в базу пишется начало его SHA-256.
+        """
+        digest = hashlib.sha256(
+            self.practicum_token.encode('utf-8')
+        ).hexdigest()[:STATE_KEY_DIGEST]
+        return f'{self.chat_id}:{digest}'
+
+
+def load_tenants(path):
+    """
+    Загружает список получателей из JSON-файла.
+    Файл содержит список объектов с ключами practicum_token и chat_id.
+    Необязательные ключи: timestamp - начальная временная метка,
+    locale - язык уведомлений (ru, en), extras - список дополнительных
+    полей домашки в уведомлении (lesson_name, reviewer_comment),
+    digest_window - окно сводки уведомлений чата в секундах (0 - без
+    сводки, по умолчанию - значение --digest-window).
+    В качестве параметра функция принимает:
+    path - путь к JSON-файлу
+    """
+    with open(path, encoding='utf-8') as tenants_file:
+        records = json.load(tenants_file)
+    return [Tenant(record['practicum_token'],
+                   record['chat_id'],
+                   record.get('timestamp'),
+                   record.get('locale'),
+                   record.get('extras', ()),
+                   record.get('digest_window'))
+            for record in records]
+
+
+class PollingEngine:
+    """
+    Планировщик опроса API для многих получателей в одном процессе.
+    Блокирующие запросы к API выполняются в пуле потоков, одновременно
+    выполняется не больше concurrency опросов. Сообщения уходят
+    через очередь доставки (delivery.py), опрос её не ждёт.
+    Со spread=True получатели опрашиваются не все сразу в начале
+    цикла, а каждый в свой срок: сроки равномерно разнесены по
+    retry_period и хранятся в колесе таймеров (scheduler.py).
+    Одновременные опросы получателей с одним токеном и одной временной
+    меткой объединяются в один запрос к API (singleflight.py).
+    Циклы без spread профилируются профилировщиком profiler
+    (profiling.py), если он передан.
+    """
+
+    def __init__(self, bot, tenants, concurrency=DEFAULT_CONCURRENCY,
+                 retry_period=homework.RETRY_PERIOD, store=None,
+                 delivery=None, delivered=None, status_index=None,
+                 spread=False, tick=SPREAD_TICK, profiler=None):
+        self.bot = bot
+        self.tenants = list(tenants)
+        self.concurrency = concurrency
+        self.retry_period = retry_period
+        self.store = store if store is not None else StateStore()
+        self.delivery = (delivery if delivery is not None
+                         else DeliveryQueue(bot))
+        self.delivered = (delivered if delivered is not None
+                          else DeliveredIndex(self.store))
+        self.status_index = (status_index if status_index is not None
+                             else homework.status_index)
+        self.spread = spread
+        self.tick = tick
+        self.flights = SingleFlight()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self._executor = None
+
+    def warm_start(self):
+        """
+        Восстанавливает курсоры, последние ошибки и известные статусы
+        домашек из хранилища. Каждая таблица читается одним запросом,
+        поэтому даже для тысяч получателей восстановление занимает
+        миллисекунды.
+        """
+        saved = self.store.load_all()
+        saved_homeworks = self.store.load_all_homeworks()
+        subscriptions = None
+        restored = 0
+        for tenant in self.tenants:
+            state = saved.get(tenant.state_key)
+            if state is None and tenant.key in saved:
+                # Базы прежних версий хранили курсор по чату: он
+                # однозначен, только если чат следит за одним аккаунтом.
+                if subscriptions is None:
+                    subscriptions = Counter(other.key
+                                            for other in self.tenants)
+                if subscriptions[tenant.key] == 1:
+                    state = saved[tenant.key]
+            if state is not None:
+                tenant.timestamp, _, last_error = state
+                # Одинаковые ошибки у разных получателей - одна строка.
+                tenant.last_message = (sys.intern(last_error)
+                                       if last_error else None)
+                restored += 1
+            self.status_index.update(tenant.key,
+                                     saved_homeworks.get(tenant.key, ()))
+        logger.info('Восстановлено состояние %s из %s получателей.',
+                    restored, len(self.tenants))
+
+    async def _run_blocking(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _batch_done(self, tenant, timestamp, last_status, delivered):
+        """Продвигает курсор, когда очередь доставила весь пакет."""
+        if delivered:
+            tenant.timestamp = timestamp
+            tenant.last_message = None
+            self.store.save_cursor(tenant.state_key, timestamp, last_status)
+        tenant.in_flight = False
+
+    def _message_sent(self, tenant, keys, index):
+        self.delivered.remember(tenant.key, keys[index])
+
+    def _submit_batch(self, tenant, response, homeworks_list):
+        """
+        Готовит уведомления о новых статусах и ставит их в очередь.
+        Уже доставленные статусы пропускаются; если отправлять нечего,
+        курсор продвигается сразу.
+        """
+        status_updates = homework.parse_statuses(
+            homeworks_list, tenant.locale, tenant.extras
+        )
+        self.status_index.update(tenant.key, homeworks_list)
+        keys = []
+        messages = []
+        for item, message in zip(homeworks_list, status_updates):
+            key = delivered_key(item)
+            if not self.delivered.seen(tenant.key, key):
+                keys.append(key)
+                messages.append(message)
+        on_done = partial(self._batch_done, tenant,
+                          response['current_date'], status_updates[-1])
+        if not messages:
+            on_done(True)
+            return
+        tenant.in_flight = True
+        self.delivery.submit(tenant.chat_id, messages, on_done,
+                             partial(self._message_sent, tenant, keys),
+                             tenant.digest_window)
+
+    async def poll_tenant(self, tenant):
+        """Один цикл опроса для одного получателя, как в main()."""
+        if tenant.in_flight:
+            logger.debug('Пакет для %r ещё доставляется, опрос пропущен',
+                         tenant)
+            return
+        try:
+            response = await self.flights.do(
+                (tenant.practicum_token, tenant.timestamp),
+                partial(self._run_blocking,
+                        homework.request_homework_statuses,
+                        tenant.timestamp,
+                        tenant.headers)
+            )
+            if response is tenant.last_empty_response:
+                # 304: тот же пустой ответ, что уже проверялся.
+                return
+            homeworks_list = homework.check_response(response)
+            if not homeworks_list:
+                tenant.last_empty_response = response
+                logger.debug('Для %r нет обновлений статусов с %s',
+                             tenant, tenant.timestamp)
+                return
+            self._submit_batch(tenant, response, homeworks_list)
+        except CircuitOpen as error:
+            logger.debug('Опрос для %r пропущен: %s', tenant, error)
+        except Exception as error:
+            logger.error('Ошибка опроса для %r: %s', tenant, error,
+                         exc_info=True, extra={'chat_id': tenant.chat_id})
+            metrics.count_error(error)
+            error_message = sys.intern(f'Возникла ошибка! {error}')
+            if tenant.last_message != error_message:
+                self.delivery.submit(tenant.chat_id, [error_message])
+                tenant.last_message = error_message
+                self.store.save_error(tenant.state_key, tenant.timestamp,
+                                      error_message)
+
+    async def run_cycle(self):
+        """Опрашивает всех получателей один раз."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def guarded_poll(tenant):
+            async with semaphore:
+                await self.poll_tenant(tenant)
+
+        await asyncio.gather(*(guarded_poll(tenant)
+                               for tenant in self.tenants))
+
+    async def run(self, cycles=None):
+        """
+        Запускает опрос каждые retry_period секунд.
+        В качестве параметра функция принимает:
+        cycles - количество циклов, None - работать бесконечно
+        """
+        self.warm_start()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self.delivery.start()
+        try:
+            if self.spread:
+                await self._run_spread(cycles)
+            else:
+                await self._run_cycles(cycles)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self.delivery.stop()
+
+    async def _run_cycles(self, cycles):
+        loop = asyncio.get_running_loop()
+        loop_lag = metrics.LoopLag(self.retry_period)
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            loop_lag.tick()
+            started = loop.time()
+            self.profiler.start()
+            try:
+                await self.run_cycle()
+            finally:
+                self.profiler.stop()
+            elapsed = loop.time() - started
+            logger.info('Цикл опроса %s получателей занял %.3f с',
+                        len(self.tenants), elapsed)
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                await asyncio.sleep(max(0, self.retry_period - elapsed))
+
+    async def _run_spread(self, cycles):
+        """
+        Опрашивает каждого получателя в его срок.
+        Срок получателей i-го токена - start + retry_period * i / N,
+        где N - число разных токенов: получатели одного аккаунта
+        опрашиваются одновременно, и их запросы объединяются.
+        Следующий срок - ровно через retry_period после предыдущего,
+        поэтому нагрузка остаётся равномерной и не дрейфует.
+        С cycles опрос заканчивается через cycles * retry_period.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = loop.time()
+        wheel = TimingWheel(self.tick, start=start)
+        groups = {}
+        for tenant in self.tenants:
+            groups.setdefault(tenant.practicum_token, len(groups))
+        for tenant in self.tenants:
+            number = groups[tenant.practicum_token]
+            wheel.schedule(tenant,
+                           start + self.retry_period * number / len(groups))
+        stop_at = None
+        if cycles is not None:
+            stop_at = start + cycles * self.retry_period
+        polls = set()
+
+        async def guarded_poll(tenant):
+            async with semaphore:
+                await self.poll_tenant(tenant)
+
+        while stop_at is None or loop.time() < stop_at:
+            for timer in wheel.advance(loop.time()):
+                if stop_at is not None and timer.deadline >= stop_at:
+                    continue
+                task = asyncio.create_task(guarded_poll(timer.item))
+                polls.add(task)
+                task.add_done_callback(polls.discard)
+                wheel.reschedule(timer, timer.deadline + self.retry_period)
+            SCHEDULED_POLLS.set(len(wheel))
+            await asyncio.sleep(self.tick)
+        if polls:
+            await asyncio.gather(*polls)
+
+
+def run_engine(tenants_path, concurrency=DEFAULT_CONCURRENCY,
+               delivery_workers=DELIVERY_WORKERS, commands=False,
+               shard=None, digest_window=DIGEST_WINDOW, spread=False):
+    """
+    Запускает бота в режиме нескольких получателей.
+    В качестве параметров функция принимает:
+    tenants_path - путь к JSON-файлу со списком получателей
+    concurrency - максимальное число одновременных опросов
+    delivery_workers - число потоков, отправляющих сообщения
+    commands - отвечать ли на команды /status и /history
+    shard - пара (номер воркера, число воркеров) для режима нескольких
+    процессов: опрашиваются только получатели этого воркера, а общий
+    лимит отправки в Telegram делится между воркерами
+    digest_window - окно сводки уведомлений по умолчанию, в секундах
+    spread - разносить опросы получателей равномерно по RETRY_PERIOD
+    """
+    from telebot import TeleBot
+
+    if not homework.TELEGRAM_TOKEN:
+        raise TokenMissing('TELEGRAM_TOKEN')
+    tenants = load_tenants(tenants_path)
+    global_rate = GLOBAL_RATE
+    if shard is not None:
+        worker_id, workers = shard
+        tenants = shard_tenants(tenants, worker_id, workers)
+        global_rate = GLOBAL_RATE / workers
+    bot = TeleBot(token=homework.TELEGRAM_TOKEN)
+    store = StateStore(homework.STATE_DB)
+    logger.info('Движок опроса запущен для %s получателей.', len(tenants))
+    delivery = DeliveryQueue(bot, workers=delivery_workers,
+                             global_rate=global_rate,
+                             global_burst=global_rate,
+                             digest_window=digest_window)
+    profiler = homework.make_cycle_profiler()
+    polling_engine = PollingEngine(bot, tenants, concurrency, store=store,
+                                   delivery=delivery, spread=spread,
+                                   profiler=profiler)
+    if commands:
+        from commands import start_polling
+        start_polling(bot, polling_engine.status_index)
+    try:
+        asyncio.run(polling_engine.run())
+    finally:
+        profiler.close()
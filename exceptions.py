@@ -52,3 +52,24 @@ class RequestError(Exception):
     def __str__(self):
         return f'При запросе возникла ошибка {self.error}'
 
+
+class CircuitOpen(Exception):
+    """Выключатель разомкнут: внешний сервис недоступен."""
+
+    def __init__(self, breaker_name, retry_in):
+        self.breaker_name = breaker_name
+        self.retry_in = retry_in
+
+    def __str__(self):
+        return (f'Сервис {self.breaker_name} недоступен, запросы '
+                f'приостановлены ещё на {self.retry_in:.0f} с')
+
+
+class InvalidConfig(Exception):
+    """Конфигурация бота не прошла проверку."""
+
+    def __init__(self, problem):
+        self.problem = problem
+
+    def __str__(self):
+        return f'Некорректная конфигурация: {self.problem}'
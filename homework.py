@@ -1,21 +1,65 @@
+import argparse
 import logging
 import os
+import sqlite3
 import sys
 import time
-from http import HTTPStatus, client
+from functools import partial
+from http import HTTPStatus
 
-import requests
-from dotenv import load_dotenv
-from telebot import TeleBot, apihelper
+import circuit
+import http_session
+import metrics
+from commands import StatusIndex
+from dedup import DeliveredIndex
+from exceptions import (ApiError, CircuitOpen, InvalidConfig, RequestError,
+                        TokenMissing)
+from lazy_imports import lazy_import
+from log_setup import setup_logging
+from outbox import Outbox
+from profiling import KEEP as PROFILE_KEEP_DEFAULT
+from profiling import make_profiler
+from state_store import DEFAULT_PATH as STATE_DB_DEFAULT
+from state_store import StateStore
+from streaming import CHUNK_SIZE as STREAM_CHUNK_SIZE
+from streaming import HomeworkStream
+from templates import MessageCatalog
+from validators import compile_validator
 
-from exceptions import (ApiError, ExpectedKeyNotFound, RequestError,
-                        TokenMissing, UnexpectedHomeworkStatus)
+# Сетевые библиотеки импортируются при первом обращении (lazy_imports.py).
+client = lazy_import('http.client')
+requests = lazy_import('requests')
+apihelper = lazy_import('telebot.apihelper')
 
-load_dotenv()
+
+def load_env(filename='.env'):
+    """
+    Загружает переменные окружения из файла, как load_dotenv().
+    Файл ищется в каталоге бота и выше; python-dotenv импортируется,
+    только если файл найден.
+    В качестве параметра функция принимает:
+    filename - имя файла с переменными окружения
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            return load_dotenv(path)
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return False
+        directory = parent
+
+
+load_env()
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+STATE_DB = os.getenv('STATE_DB', STATE_DB_DEFAULT)
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+PROFILE_KEEP = os.getenv('PROFILE_KEEP', str(PROFILE_KEEP_DEFAULT))
 
 RETRY_PERIOD = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
@@ -27,9 +71,23 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+# Последние известные статусы домашек для ответов на /status и /history.
+status_index = StatusIndex(HOMEWORK_VERDICTS)
+# Шаблоны уведомлений компилируются один раз при запуске.
+messages = MessageCatalog(HOMEWORK_VERDICTS)
+
+RESPONSE_SCHEMA = {'homeworks': list,
+                   'current_date': int,
+                   }
+HOMEWORK_SCHEMA = {'homework_name': str,
+                   'status': str
+                   }
+validate_response = compile_validator(RESPONSE_SCHEMA, 'Ответ API',
+                                      'homeworks')
+validate_homework = compile_validator(HOMEWORK_SCHEMA,
+                                      'Элемент из списка с домашкой')
+
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler(stream=sys.stdout)
-logger.addHandler(handler)
 
 
 def check_tokens():
@@ -41,16 +99,51 @@ def check_tokens():
     missing_tokens = []
     for token_name, token_value in tokens.items():
         if not token_value:
-            missing_tokens += token_name
+            missing_tokens.append(token_name)
     if missing_tokens:
         missing_tokens_names = ', '.join(missing_tokens)
-        logger.critical(f'''Проблема с переменными окружения (токенами).
-                            Не обнаружены обязательные переменные:
-                            {missing_tokens_names}!
-                            Бот завершает работу''')
+        logger.critical('Проблема с переменными окружения (токенами). '
+                        'Не обнаружены обязательные переменные: %s! '
+                        'Бот завершает работу', missing_tokens_names)
         raise TokenMissing(missing_tokens_names)
 
 
+def profile_keep():
+    """
+    Возвращает число хранимых профилей циклов из PROFILE_KEEP.
+    Некорректное значение - ошибка конфигурации InvalidConfig.
+    """
+    try:
+        keep = int(PROFILE_KEEP)
+    except ValueError:
+        keep = 0
+    if keep < 1:
+        raise InvalidConfig(f'PROFILE_KEEP: ожидалось положительное целое '
+                            f'число, получено {PROFILE_KEEP!r}')
+    return keep
+
+
+def make_cycle_profiler():
+    """
+    Создаёт профилировщик циклов опроса.
+    Без PROFILE_DIR профилировщик ничего не делает; с PROFILE_DIR
+    он создаёт каталог и включает tracemalloc, поэтому вызывается
+    при запуске опроса, а не при импорте модуля.
+    """
+    if not PROFILE_DIR:
+        return make_profiler(None)
+    return make_profiler(PROFILE_DIR, profile_keep())
+
+
+def make_headers(token):
+    """
+    Собирает заголовки запроса к API для токена Практикума.
+    В качестве параметра функция принимает:
+    token - OAuth-токен сервиса Практикум.Домашка
+    """
+    return {'Authorization': f'OAuth {token}'}
+
+
 def send_message(bot, message):
     """
     Отправляет сообщение в Telegram-чат.
@@ -59,14 +152,30 @@ def send_message(bot, message):
     bot - экземпляр класса TeleBot
     message - строку с текстом сообщения
     """
-    chat_id = TELEGRAM_CHAT_ID
+    return send_message_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to_chat(bot, chat_id, message):
+    """
+    Отправляет сообщение в указанный Telegram-чат.
+    Возвращает True, если сообщение отправлено, иначе False.
+    В качестве параметров функция принимает:
+    bot - экземпляр класса TeleBot
+    chat_id - идентификатор чата получателя
+    message - строку с текстом сообщения
+    """
     try:
-        logger.debug(f'Бот начинает отправку сообщения: {message}')
-        bot.send_message(chat_id=chat_id, text=message)
-        logger.debug(f'Успешно отправлено сообщение: {message}')
+        logger.debug('Бот начинает отправку сообщения: %s', message)
+        with circuit.TELEGRAM.guard(circuit.is_telegram_failure):
+            with metrics.SEND_LATENCY.time():
+                bot.send_message(chat_id=chat_id, text=message)
+        logger.debug('Успешно отправлено сообщение: %s', message)
         return True
-    except apihelper.ApiException or requests.RequestException as error:
-        logger.error(error, exc_info=True)
+    except CircuitOpen as error:
+        logger.warning('Сообщение не отправлено: %s', error)
+        return False
+    except (apihelper.ApiException, requests.RequestException) as error:
+        logger.error(error, exc_info=True, extra={'chat_id': chat_id})
         return False
 
 
@@ -78,64 +187,86 @@ def get_api_answer(timestamp):
     В качестве параметров функция принимает:
     timestamp - временную метку в формате Unix-времени
     """
+    return request_homework_statuses(timestamp, HEADERS)
+
+
+def request_homework_statuses(timestamp, headers):
+    """
+    Запрашивает статусы домашек с заголовками конкретного пользователя.
+    Используется как get_api_answer, так и движком опроса
+    для нескольких получателей (engine.py).
+    В качестве параметров функция принимает:
+    timestamp - временную метку в формате Unix-времени
+    headers - заголовки запроса с токеном пользователя
+    """
     payload = {'from_date': timestamp}
     request_data = {
         'url': ENDPOINT,
-        'headers': HEADERS,
+        'headers': headers,
         'params': payload
     }
-    logger_template = '''Получаем ответ API.
-                    Информация о запросе:
-                    Адрес эндпоинта: {url},
-                    Headers: {headers},
-                    Параметры: {params}'''
-    logger.debug(logger_template.format(**request_data))
-    try:
-        homework_statuses = requests.get(**request_data)
-        response_code = homework_statuses.status_code
-        homework_statuses_json = homework_statuses.json()
-    except requests.RequestException as error:
-        logger.error(error, exc_info=True)
-        raise RequestError(error)
-    if response_code != HTTPStatus.OK:
-        raise ApiError(response_code, client.responses[response_code])
+    logger.debug('Получаем ответ API. Адрес эндпоинта: %s, параметры: %s',
+                 ENDPOINT, payload)
+    with circuit.PRACTICUM.guard(circuit.is_practicum_failure):
+        try:
+            with metrics.POLL_LATENCY.time():
+                homework_statuses = http_session.conditional_get(
+                    **request_data
+                )
+                response_code = homework_statuses.status_code
+                homework_statuses_json = homework_statuses.json()
+        except requests.RequestException as error:
+            logger.error(error, exc_info=True)
+            raise RequestError(error)
+        if response_code != HTTPStatus.OK:
+            raise ApiError(response_code, client.responses[response_code])
     logger.debug('Ответ API получен')
     return homework_statuses_json
 
 
+def stream_homework_statuses(timestamp, headers):
+    """
+    Запрашивает статусы домашек и разбирает ответ потоково.
+    Возвращает streaming.HomeworkStream: домашки читаются из тела
+    ответа по одной, поэтому даже полная история (timestamp=0)
+    не загружается в память целиком. Поток держит соединение из пула,
+    поэтому его используют в with.
+    В качестве параметров функция принимает:
+    timestamp - временную метку в формате Unix-времени
+    headers - заголовки запроса с токеном пользователя
+    """
+    logger.debug('Получаем потоковый ответ API. Параметры: from_date=%s',
+                 timestamp)
+    with circuit.PRACTICUM.guard(circuit.is_practicum_failure):
+        try:
+            response = http_session.get(ENDPOINT, headers=headers,
+                                        params={'from_date': timestamp},
+                                        stream=True)
+        except requests.RequestException as error:
+            logger.error(error, exc_info=True)
+            raise RequestError(error)
+        if response.status_code != HTTPStatus.OK:
+            response.close()
+            raise ApiError(response.status_code,
+                           client.responses[response.status_code])
+    return HomeworkStream(response.iter_content(STREAM_CHUNK_SIZE),
+                          on_close=response.close)
+
+
 def check_type_and_keys(response, example, element_name, return_key=None):
     """
     Проверяет наличие ключей и типы их значений.
     Ключи должны соответствовать документации API сервиса Практикум.Домашка.
+    Схема компилируется при каждом вызове, поэтому в цикле опроса
+    используются заранее скомпилированные validate_response
+    и validate_homework.
     В качестве параметров функция принимает:
     response - Элемент, который необходимо проверить
     example - Пример данных, с которыми необходимо сравнить response
     element_name - Название проверяемого элемента для сообщений об ошибках
     и логов
     """
-    expected_type = dict
-    return_item = None
-    if not isinstance(response, expected_type):
-        reponse_type = type(response)
-        raise TypeError(f'''Некорректный {element_name}.
-                        Ожидался {expected_type.__name__},
-                        получен {reponse_type.__name__}.''')
-    logger.debug(f'''Тип {element_name} проверен:
-                 полученный тип соответствует ожидаемому.''')
-    for key, value in example.items():
-        if key not in response.keys():
-            raise ExpectedKeyNotFound(key, element_name)
-        elif key == return_key:
-            return_item = response[key]
-        if not isinstance(response[key], value):
-            raise TypeError(f'''Некорректный {element_name}.
-                            Ожидался тип значения {key} равный {value},
-                            получен {type(response[key])}''')
-    logger.debug(f'''{element_name} проверен.
-                 Все ожидаемые ключи {example.keys()}
-                 на месте.''')
-    if return_item:
-        return return_item
+    return compile_validator(example, element_name, return_key)(response)
 
 
 def check_response(response):
@@ -146,17 +277,9 @@ def check_response(response):
     В качестве параметра функция получает:
     response - ответ API, приведённый к типам данных Python.
     """
-    response_keys_and_types = {'homeworks': list,
-                               'current_date': int,
-                               }
-    checking = 'Ответ API'
-    homework_list = check_type_and_keys(response,
-                                        response_keys_and_types,
-                                        checking,
-                                        'homeworks')
-    logger.debug(f'''Ответ API проверен.
-                 Все ожидаемые ключи {response_keys_and_types.keys()}
-                 на месте.''')
+    with metrics.VALIDATION_TIME.labels('response').time():
+        homework_list = validate_response(response)
+    logger.debug('Ответ API проверен, все ожидаемые ключи на месте.')
     return homework_list
 
 
@@ -171,63 +294,267 @@ def parse_status(homework):
     homework - словарь с информацией о домашней работе,
     описанный в документации к API
     """
-    homework_keys_and_types = {'homework_name': str,
-                               'status': str
-                               }
-    checking = 'Элемент из списка с домашкой'
-    check_type_and_keys(homework, homework_keys_and_types, checking)
-    homework_status = homework['status']
-    homework_name = homework['homework_name']
-    if homework_status not in HOMEWORK_VERDICTS.keys():
-        raise UnexpectedHomeworkStatus(homework_status)
-    verdict = HOMEWORK_VERDICTS[homework_status]
-    logger.debug(f'''Получен статус {homework_status} для работы
-                 {homework_name}''')
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    return render_status(homework)
+
+
+def render_status(homework, locale=None, extras=()):
+    """
+    Проверяет домашку и собирает уведомление из шаблонов локали.
+    С параметрами по умолчанию результат совпадает с parse_status.
+    В качестве параметров функция принимает:
+    homework - словарь с информацией о домашней работе
+    locale - локаль получателя, None - русская
+    extras - дополнительные поля домашки для вывода
+    (templates.EXTRA_FIELDS)
+    """
+    validate_homework(homework)
+    message = messages.render(homework, locale, extras)
+    logger.debug('Получен статус %s для работы %s',
+                 homework['status'], homework['homework_name'])
+    return message
+
+
+def parse_statuses(homeworks_list, locale=None, extras=()):
+    """
+    Готовит сообщения для всех домашек из ответа API за один проход.
+    Если хотя бы одна домашка некорректна, исключение выбрасывается
+    до отправки каких-либо сообщений.
+    В качестве параметров функция получает:
+    homeworks_list - список домашек из ответа API
+    locale - локаль получателя, None - русская
+    extras - дополнительные поля домашки для вывода
+    """
+    with metrics.VALIDATION_TIME.labels('homeworks').time():
+        return [render_status(homework, locale, extras)
+                for homework in homeworks_list]
+
+
+def run_safely(func, *args):
+    """
+    Вызывает func(*args) в конце цикла опроса.
+    Ошибка (например, sqlite3.Error при заблокированной базе или
+    заполненном диске) логируется и учитывается в метриках, но не
+    прерывает цикл: следующий цикл попробует ещё раз.
+    """
+    try:
+        return func(*args)
+    except Exception as error:
+        logger.error(error, exc_info=True)
+        metrics.count_error(error)
 
 
 def main():
     """Основная логика работы бота."""
     check_tokens()
+    from telebot import TeleBot
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    logger.info(f'Бот начал работу. Первая временная метка: {timestamp}.')
+    store = StateStore(STATE_DB)
+    outbox = Outbox(store, DeliveredIndex(store))
+    status_index.update(TELEGRAM_CHAT_ID,
+                        store.load_homeworks(TELEGRAM_CHAT_ID))
+    timestamp, _, last_message = store.load(TELEGRAM_CHAT_ID,
+                                            int(time.time()))
+    logger.info('Бот начал работу. Первая временная метка: %s.', timestamp)
     send_message(bot, 'Бот начал работу!')
-    last_message = None
+    loop_lag = metrics.LoopLag(RETRY_PERIOD)
+    cycle_profiler = make_cycle_profiler()
     while True:
+        loop_lag.tick()
+        cycle_profiler.start()
         try:
             homeworks = get_api_answer(timestamp)
             homeworks_list = check_response(homeworks)
             if not homeworks_list:
-                logger.debug(f'''Проверен период от {timestamp}
-                             до {int(time.time())}.
-                             В ответе отсутствуют обновления статусов
-                              домашки (список работ под ключом
-                              "homeworks" пуст).''')
+                logger.debug('Проверен период от %s: обновлений статусов '
+                             'домашки нет (список "homeworks" пуст).',
+                             timestamp)
             else:
-                status_update = parse_status(homeworks_list[0])
-                message_sent = send_message(bot, status_update)
-                if message_sent:
-                    timestamp = homeworks['current_date']
-                    last_message = None
+                status_updates = parse_statuses(homeworks_list)
+                status_index.update(TELEGRAM_CHAT_ID, homeworks_list)
+                # Курсор сдвигается вместе с записью уведомлений
+                # в outbox, не дожидаясь их доставки, и только если
+                # запись удалась.
+                outbox.put(TELEGRAM_CHAT_ID, homeworks_list,
+                           status_updates, homeworks['current_date'])
+                timestamp = homeworks['current_date']
+                last_message = None
+        except CircuitOpen as error:
+            logger.warning(error)
         except Exception as error:
             logger.error(error, exc_info=True)
+            metrics.count_error(error)
             error_message = f'Возникла ошибка! {error}'
             if last_message != error_message:
                 send_message(bot, error_message)
                 last_message = error_message
+                run_safely(store.save_error, TELEGRAM_CHAT_ID, timestamp,
+                           error_message)
         finally:
+            run_safely(outbox.flush, TELEGRAM_CHAT_ID,
+                       partial(send_message, bot))
+            run_safely(cycle_profiler.stop)
             time.sleep(RETRY_PERIOD)
 
 
-if __name__ == '__main__':
-    logging.basicConfig(
-        format='%(asctime)s, %(name)s, %(levelname)s, %(message)s',
-        level=logging.DEBUG,
-        filename='homework_bot.log',
-        filemode='a'
+def parse_args():
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description='Бот-ассистент Практикума')
+    parser.add_argument('--tenants',
+                        help='JSON-файл со списком получателей: '
+                             'режим опроса для нескольких получателей')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='максимальное число одновременных опросов')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='число процессов опроса для режима '
+                             'нескольких получателей')
+    parser.add_argument('--delivery-workers', type=int, default=8,
+                        help='число потоков отправки сообщений в Telegram')
+    parser.add_argument('--spread', action='store_true',
+                        help='опрашивать получателей не все сразу, '
+                             'а равномерно в течение RETRY_PERIOD')
+    parser.add_argument('--digest-window', type=float, default=0,
+                        help='окно сводки в секундах: смены статусов '
+                             'одного чата за это время уходят одним '
+                             'сообщением; 0 - без сводок')
+    parser.add_argument('--pool-size', type=int,
+                        default=http_session.POOL_SIZE,
+                        help='размер пула keep-alive соединений к API')
+    parser.add_argument('--connect-timeout', type=float,
+                        default=http_session.CONNECT_TIMEOUT,
+                        help='таймаут соединения с API, в секундах')
+    parser.add_argument('--read-timeout', type=float,
+                        default=http_session.READ_TIMEOUT,
+                        help='таймаут ожидания ответа API, в секундах')
+    parser.add_argument('--log-json',
+                        help='файл для дополнительного лога в формате '
+                             'JSON lines')
+    parser.add_argument('--metrics-port', type=int,
+                        help='локальный порт для метрик в формате '
+                             'Prometheus')
+    parser.add_argument('--breaker-threshold', type=int,
+                        default=circuit.FAILURE_THRESHOLD,
+                        help='число сбоев подряд, после которого запросы '
+                             'к API или Telegram приостанавливаются; '
+                             '0 - не приостанавливать')
+    parser.add_argument('--breaker-reset', type=float,
+                        default=circuit.RESET_TIMEOUT,
+                        help='пауза до пробного запроса, в секундах')
+    parser.add_argument('--commands', action='store_true',
+                        help='отвечать на команды /status и /history '
+                             'из кэша статусов')
+    parser.add_argument('--check', action='store_true',
+                        help='проверить конфигурацию и выйти, не загружая '
+                             'сетевые библиотеки')
+    commands = parser.add_subparsers(dest='command')
+    backfill_parser = commands.add_parser(
+        'backfill', help='загрузить историю домашек в хранилище состояния'
     )
+    backfill_parser.add_argument('--since', type=int, default=0,
+                                 help='начало истории, Unix-время')
+    backfill_parser.add_argument('--until', type=int,
+                                 help='конец истории, Unix-время '
+                                      '(по умолчанию - сейчас)')
+    # Флаги можно указать и после имени команды.
+    backfill_parser.add_argument('--tenants', default=argparse.SUPPRESS,
+                                 help='JSON-файл со списком получателей')
+    backfill_parser.add_argument('--concurrency', type=int,
+                                 default=argparse.SUPPRESS,
+                                 help='максимальное число одновременных '
+                                      'запросов')
+    args = parser.parse_args()
+    if args.workers > 1 and not args.tenants:
+        parser.error('--workers работает только вместе с --tenants')
+    if args.digest_window > 0 and not args.tenants:
+        parser.error('--digest-window работает только вместе с --tenants')
+    return args
+
+
+def check_config(args):
+    """
+    Проверяет конфигурацию, не запуская опрос.
+    Для одного получателя проверяются токены из окружения, для многих -
+    TELEGRAM_TOKEN и файл получателей; в обоих случаях - база
+    состояния STATE_DB и PROFILE_KEEP.
+    requests и telebot при этом не импортируются.
+    В качестве параметра функция принимает:
+    args - разобранные аргументы командной строки
+    """
+    if args.tenants:
+        from engine import load_tenants
+        if not TELEGRAM_TOKEN:
+            raise TokenMissing('TELEGRAM_TOKEN')
+        try:
+            tenants = load_tenants(args.tenants)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            raise InvalidConfig(f'файл получателей {args.tenants}: '
+                                f'{error!r}')
+        logger.info('Файл получателей %s: %s получателей',
+                    args.tenants, len(tenants))
+    else:
+        check_tokens()
+    if PROFILE_DIR:
+        profile_keep()
     try:
+        StateStore(STATE_DB).close()
+    except sqlite3.Error as error:
+        raise InvalidConfig(f'база состояния {STATE_DB}: {error}')
+    logger.info('Конфигурация в порядке')
+
+
+def run_command(args):
+    """Запускает выбранный режим работы бота."""
+    if args.check:
+        check_config(args)
+    elif args.command == 'backfill':
+        from backfill import run_backfill_command
+        run_backfill_command(args.tenants, args.since, args.until,
+                             args.concurrency)
+    elif args.workers > 1:
+        from supervisor import run_supervisor
+        run_supervisor(args)
+    elif args.tenants:
+        from engine import run_engine
+        run_engine(args.tenants, args.concurrency, args.delivery_workers,
+                   args.commands, digest_window=args.digest_window,
+                   spread=args.spread)
+    else:
+        if args.commands:
+            from telebot import TeleBot
+
+            from commands import start_polling
+            check_tokens()
+            start_polling(TeleBot(token=TELEGRAM_TOKEN), status_index)
         main()
+
+
+def configure_process(args, metrics_port=None):
+    """
+    Настраивает логи, метрики, HTTP-сессию и выключатели процесса.
+    В качестве параметров функция принимает:
+    args - разобранные аргументы командной строки
+    metrics_port - порт для метрик или None
+    """
+    setup_logging(json_filename=args.log_json)
+    if args.check:
+        return
+    if metrics_port is not None:
+        metrics.start_http_server(metrics_port)
+    pool_size = args.pool_size
+    if args.tenants or args.command:
+        # Каждому одновременному опросу - своё keep-alive соединение.
+        pool_size = max(pool_size, args.concurrency)
+    http_session.configure(pool_size,
+                           args.connect_timeout,
+                           args.read_timeout)
+    circuit.configure(args.breaker_threshold, args.breaker_reset)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_process(args, args.metrics_port)
+    try:
+        run_command(args)
     except TokenMissing as error:
         sys.exit(f'Отсутствует обязательная переменная окружения. {error}.')
+    except InvalidConfig as error:
+        sys.exit(str(error))
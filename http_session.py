@@ -0,0 +1,197 @@
+"""
+Управляемая HTTP-сессия для запросов к API Практикума.
+Сессия держит пул keep-alive соединений для каждого хоста, поэтому
+повторные опросы не открывают заново TCP и TLS соединение.
+Пока сессия не настроена через configure(), запросы идут через
+requests.get, но всегда с таймаутами на соединение и чтение.
+conditional_get дополнительно просит сжатый ответ и повторно
+проверяет закэшированный ответ по ETag и Last-Modified: если сервер
+отвечает 304, тело не передаётся и JSON не разбирается заново.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+
+import metrics
+from lazy_imports import lazy_import
+
+# requests импортируется при первом запросе или при configure().
+requests = lazy_import('requests')
+adapters = lazy_import('requests.adapters')
+
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+CONDITIONAL_CACHE_SIZE = 10_000
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+_lock = threading.Lock()
+
+RECEIVED_BYTES = metrics.Counter(
+    'homework_poll_received_bytes',
+    'Байты тела ответов API, полученные по сети.'
+)
+NOT_MODIFIED = metrics.Counter(
+    'homework_poll_not_modified',
+    'Ответы API 304: тело не передавалось, использован кэш.'
+)
+
+
+def configure(pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+              read_timeout=READ_TIMEOUT):
+    """
+    Создаёт сессию с пулом соединений и задаёт таймауты.
+    Повторный вызов закрывает прежнюю сессию.
+    В качестве параметров функция принимает:
+    pool_size - число соединений, которые держатся открытыми для хоста
+    connect_timeout - таймаут установки соединения, в секундах
+    read_timeout - таймаут ожидания ответа, в секундах
+    """
+    global _session, _timeout
+    session = requests.Session()
+    adapter = adapters.HTTPAdapter(pool_connections=pool_size,
+                                   pool_maxsize=pool_size,
+                                   pool_block=False)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    with _lock:
+        previous, _session = _session, session
+        _timeout = (connect_timeout, read_timeout)
+    if previous is not None:
+        previous.close()
+    logger.debug('HTTP-сессия настроена: пул %s, таймауты %s',
+                 pool_size, _timeout)
+    return session
+
+
+def close():
+    """Закрывает сессию, дальнейшие запросы идут через requests.get."""
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def get(url, **kwargs):
+    """
+    Выполняет GET-запрос через пул соединений, если сессия настроена.
+    Таймауты подставляются, если не переданы явно.
+    """
+    kwargs.setdefault('timeout', _timeout)
+    session = _session
+    if session is None:
+        return requests.get(url, **kwargs)
+    return session.get(url, **kwargs)
+
+
+class CachedResponse:
+    """
+    Ответ, восстановленный из кэша после 304 Not Modified.
+    Повторяет ту часть интерфейса requests.Response, которой
+    пользуется бот: status_code, headers и json().
+    """
+
+    def __init__(self, data, headers):
+        self.status_code = HTTPStatus.OK
+        self.headers = headers
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class ConditionalCache:
+    """
+    Валидаторы (ETag, Last-Modified) и разобранные тела ответов.
+    Хранит не больше max_size записей, вытесняя самые старые.
+    """
+
+    def __init__(self, max_size=CONDITIONAL_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url, headers, params):
+        """Ключ запроса: адрес, токен и параметры."""
+        return (url,
+                (headers or {}).get('Authorization'),
+                tuple(sorted((params or {}).items())))
+
+    def request_headers(self, key):
+        """Заголовки If-None-Match/If-Modified-Since для запроса."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def get(self, key):
+        """Возвращает закэшированное тело ответа или None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, key, etag, last_modified, data):
+        """Сохраняет валидаторы и разобранное тело ответа."""
+        with self._lock:
+            self._entries[key] = (etag, last_modified, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+conditional_cache = ConditionalCache()
+
+
+def response_size(response):
+    """Размер тела ответа в байтах так, как он пришёл по сети."""
+    headers = getattr(response, 'headers', None) or {}
+    content_length = headers.get('Content-Length')
+    if content_length is not None:
+        return int(content_length)
+    content = getattr(response, 'content', None)
+    return len(content) if isinstance(content, bytes) else 0
+
+
+def conditional_get(url, headers=None, params=None, **kwargs):
+    """
+    GET-запрос со сжатием и условной проверкой закэшированного ответа.
+    При ответе 304 возвращает CachedResponse с ранее разобранным
+    телом. Ответ 200 с ETag или Last-Modified разбирается один раз
+    и кэшируется.
+    """
+    key = conditional_cache.make_key(url, headers, params)
+    request_headers = {**(headers or {}),
+                       'Accept-Encoding': 'gzip',
+                       **conditional_cache.request_headers(key)}
+    response = get(url, headers=request_headers, params=params, **kwargs)
+    RECEIVED_BYTES.inc(response_size(response))
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        cached = conditional_cache.get(key)
+        if cached is not None:
+            NOT_MODIFIED.inc()
+            return CachedResponse(cached, response.headers)
+        return response
+    response_headers = getattr(response, 'headers', None) or {}
+    etag = response_headers.get('ETag')
+    last_modified = response_headers.get('Last-Modified')
+    if response.status_code != HTTPStatus.OK or not (etag or last_modified):
+        return response
+    data = response.json()
+    conditional_cache.put(key, etag, last_modified, data)
+    return CachedResponse(data, response_headers)
@@ -0,0 +1,52 @@
+"""
+Отложенный импорт тяжёлых зависимостей.
+requests и telebot тянут за собой urllib3, ssl, email и certifi,
+и их импорт занимает большую часть запуска бота. Проверке
+конфигурации (--check) и коротким командам сеть не нужна, поэтому
+модули бота получают вместо них LazyModule: настоящий модуль
+импортируется при первом обращении к любому его атрибуту.
+Атрибуты каждый раз читаются у настоящего модуля, поэтому подмена
+requests.get в тестах видна через заместителя.
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    Заместитель модуля, который импортируется при первом обращении.
+    В качестве параметров класс принимает:
+    name - полное имя модуля, например 'telebot.apihelper'
+    """
+
+    def __init__(self, name):
+        self._lazy_name = name
+        self._lazy_module = None
+
+    def _load(self):
+        module = self._lazy_module
+        if module is None:
+            module = importlib.import_module(self._lazy_name)
+            self._lazy_module = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = 'загружен' if self._lazy_module else 'не загружен'
+        return f'<LazyModule {self._lazy_name} ({state})>'
+
+
+def lazy_import(name):
+    """
+    Возвращает модуль, если он уже импортирован, иначе заместителя.
+    В качестве параметров функция принимает:
+    name - полное имя модуля
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_loaded(name):
+    """Проверяет, импортирован ли модуль на самом деле."""
+    return name in sys.modules
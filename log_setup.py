@@ -0,0 +1,88 @@
+"""
+Настройка логирования бота.
+Обработчики логов (файл, stdout и необязательный JSON lines) работают
+в отдельном потоке QueueListener: поток опроса только кладёт запись
+в очередь. Сообщение записи форматируется тоже в потоке-слушателе,
+поэтому вызовы logger.debug('... %s', value) на горячем пути
+не собирают строк, даже когда уровень DEBUG включён.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FILE = 'homework_bot.log'
+LOG_FORMAT = '%(asctime)s, %(name)s, %(levelname)s, %(message)s'
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler, который не форматирует запись перед постановкой
+    в очередь. Очередь живёт внутри процесса, поэтому запись можно
+    передать слушателю как есть.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Форматирует запись в одну строку JSON.
+    Поля, переданные через extra, попадают в JSON как есть.
+    """
+
+    STANDARD_FIELDS = frozenset(vars(logging.makeLogRecord({}))) | {
+        'message', 'asctime'
+    }
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self.STANDARD_FIELDS:
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(filename=LOG_FILE, level=logging.DEBUG,
+                  json_filename=None, stream=sys.stdout):
+    """
+    Настраивает корневой логгер на запись через очередь.
+    Возвращает запущенный QueueListener; он останавливается
+    при завершении процесса.
+    В качестве параметров функция принимает:
+    filename - файл основного лога
+    level - уровень логирования
+    json_filename - файл для лога в формате JSON lines, если нужен
+    stream - поток для вывода логов в консоль
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(filename, mode='a', encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(stream=stream)
+    stream_handler.setFormatter(formatter)
+    handlers = [file_handler, stream_handler]
+    if json_filename:
+        json_handler = logging.FileHandler(json_filename, mode='a',
+                                           encoding='utf-8')
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers,
+                             respect_handler_level=True)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
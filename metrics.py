@@ -0,0 +1,287 @@
+"""
+Лёгкий реестр метрик бота в формате Prometheus.
+Счётчики, гистограммы и шкалы (gauge) живут в памяти процесса;
+start_http_server отдаёт их в текстовом формате Prometheus
+на локальном порту. Сторонние библиотеки не нужны.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from lazy_imports import lazy_import
+
+# http.server тянет за собой http.client и email: импорт при запуске
+# сервера метрик.
+http_server = lazy_import('http.server')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+                   10, 30)
+LAG_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    """Набор метрик, которые выводятся вместе."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Добавляет метрику в реестр."""
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def escape_label_value(value):
+    """Экранирует значение метки по правилам текстового формата."""
+    return (str(value).replace('\\', '\\\\')
+            .replace('\n', '\\n')
+            .replace('"', '\\"'))
+
+
+def format_labels(names, values, extra=()):
+    """Собирает строку меток вида {name="value"}."""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"'
+                          for name, value in pairs) + '}'
+
+
+class _Metric:
+    """Общая часть метрик: имя, описание и дочерние значения по меткам."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        """Возвращает значение метрики для набора меток."""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        """Увеличивает счётчик без меток."""
+        self._default().inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield (f'{self.name}_total'
+                   f'{format_labels(self.labelnames, values)} {child.value}')
+
+
+class Gauge(_Metric):
+    """Значение, которое может как расти, так и уменьшаться."""
+
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        """Устанавливает значение шкалы без меток."""
+        self._default().set(value)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield (f'{self.name}'
+                   f'{format_labels(self.labelnames, values)} {child.value}')
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Гистограмма распределения значений, например задержек."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        """Добавляет наблюдение в гистограмму без меток."""
+        self._default().observe(value)
+
+    def time(self):
+        """Контекстный менеджер, измеряющий время выполнения блока."""
+        return self._default().time()
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            bounds = [str(bucket) for bucket in self.buckets] + ['+Inf']
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = format_labels(self.labelnames, values,
+                                       [('le', bound)])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = format_labels(self.labelnames, values)
+            yield f'{self.name}_sum{labels} {total}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class LoopLag:
+    """
+    Отставание цикла опроса от расписания.
+    tick() вызывается в начале каждого цикла; разница между реальным
+    интервалом и ожидаемым period попадает в гистограмму LOOP_LAG.
+    """
+
+    def __init__(self, period, histogram=None):
+        self.period = period
+        self.histogram = histogram if histogram is not None else LOOP_LAG
+        self._last_tick = None
+
+    def tick(self):
+        """Отмечает начало очередного цикла."""
+        now = time.monotonic()
+        if self._last_tick is not None:
+            lag = now - self._last_tick - self.period
+            self.histogram.observe(max(lag, 0))
+        self._last_tick = now
+
+
+POLL_LATENCY = Histogram('homework_poll_latency_seconds',
+                         'Время запроса к API Практикум.Домашка.')
+VALIDATION_TIME = Histogram('homework_validation_seconds',
+                            'Время проверки и разбора ответа API.',
+                            labelnames=('stage',))
+SEND_LATENCY = Histogram('homework_send_latency_seconds',
+                         'Время отправки сообщения в Telegram.')
+ERRORS = Counter('homework_errors',
+                 'Ошибки цикла опроса по классам исключений.',
+                 labelnames=('exception',))
+LOOP_LAG = Histogram('homework_loop_lag_seconds',
+                     'Отставание начала цикла опроса от RETRY_PERIOD.',
+                     buckets=LAG_BUCKETS)
+
+
+def count_error(error):
+    """Учитывает ошибку в счётчике по имени её класса."""
+    ERRORS.labels(type(error).__name__).inc()
+
+
+def make_handler(registry=REGISTRY):
+    """Класс обработчика, который отдаёт метрики registry по GET."""
+
+    class MetricsHandler(http_server.BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug('Запрос метрик: ' + format, *args)
+
+    return MetricsHandler
+
+
+def start_http_server(port, host='127.0.0.1', registry=REGISTRY):
+    """
+    Запускает HTTP-сервер метрик в фоновом потоке.
+    Возвращает сервер; остановить его можно методом shutdown().
+    В качестве параметров функция принимает:
+    port - порт, 0 - выбрать свободный
+    host - адрес, на котором слушает сервер
+    registry - реестр, метрики которого отдаются
+    """
+    server = http_server.ThreadingHTTPServer((host, port),
+                                             make_handler(registry))
+    thread = threading.Thread(target=server.serve_forever,
+                              name='metrics-server', daemon=True)
+    thread.start()
+    logger.info('Метрики доступны на http://%s:%s/metrics',
+                host, server.server_port)
+    return server
@@ -0,0 +1,103 @@
+"""
+Надёжная очередь исходящих уведомлений (outbox) для main().
+Готовые тексты уведомлений записываются в хранилище состояния
+той же транзакцией, что и новый курсор опроса, ещё до отправки.
+Поэтому неудачная отправка больше не держит курсор на месте:
+следующий цикл не запрашивает и не проверяет заново весь период,
+а повторяет только недоставленные записи outbox с экспоненциальной
+паузой. Записи отправляются строго по порядку: пока первая
+не доставлена, следующие ждут. С STATE_DB outbox переживает
+перезапуск бота.
+"""
+import logging
+import time
+
+import metrics
+from dedup import delivered_key
+
+BACKOFF = 60
+MAX_BACKOFF = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+PENDING = metrics.Gauge(
+    'homework_outbox_pending',
+    'Уведомления в outbox, ещё не доставленные в Telegram.'
+)
+
+
+class Outbox:
+    """
+    Outbox одного хранилища состояния.
+    В качестве параметров класс принимает:
+    store - хранилище состояния (state_store.StateStore)
+    delivered - индекс доставленных смен статусов (dedup.DeliveredIndex)
+    backoff - пауза после первой неудачной попытки, в секундах
+    max_backoff - предельная пауза между попытками, в секундах
+    clock - источник текущего времени
+    """
+
+    def __init__(self, store, delivered, backoff=BACKOFF,
+                 max_backoff=MAX_BACKOFF, clock=time.time):
+        self.store = store
+        self.delivered = delivered
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+
+    def put(self, tenant_key, homeworks_list, status_updates, timestamp):
+        """
+        Записывает новые уведомления пакета и сдвигает курсор опроса.
+        Уже доставленные смены статусов пропускаются.
+        В качестве параметров функция принимает:
+        tenant_key - ключ получателя
+        homeworks_list - список домашек из ответа API
+        status_updates - уведомления для этих домашек
+        timestamp - current_date из ответа API
+        """
+        entries = []
+        for homework, message in zip(homeworks_list, status_updates):
+            key = delivered_key(homework)
+            if self.delivered.seen(tenant_key, key):
+                logger.debug('Смена статуса %s уже доставлена, '
+                             'пропускаем', key)
+                continue
+            entries.append((key, message))
+        self.store.save_outbox(tenant_key, entries, timestamp,
+                               status_updates[-1])
+        return len(entries)
+
+    def delay(self, attempts):
+        """Пауза перед попыткой номер attempts + 1, в секундах."""
+        return min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+
+    def flush(self, tenant_key, send):
+        """
+        Отправляет недоставленные уведомления получателя по порядку.
+        Останавливается на первой записи, время которой не пришло
+        или отправка которой не удалась. Возвращает число
+        доставленных уведомлений.
+        В качестве параметров функция принимает:
+        tenant_key - ключ получателя
+        send - функция отправки текста, возвращает True при успехе
+        """
+        rows = self.store.load_outbox(tenant_key)
+        now = self._clock()
+        sent = 0
+        for row_id, key, message, attempts, next_attempt_at in rows:
+            if next_attempt_at > now:
+                logger.debug('Повтор отправки из outbox через %.0f с',
+                             next_attempt_at - now)
+                break
+            if not send(message):
+                attempts += 1
+                self.store.retry_outbox(row_id, now + self.delay(attempts))
+                logger.warning('Уведомление осталось в outbox, попытка %s, '
+                               'следующая через %s с',
+                               attempts, self.delay(attempts))
+                break
+            self.store.delete_outbox(row_id)
+            self.delivered.remember(tenant_key, key)
+            sent += 1
+        PENDING.set(len(rows) - sent)
+        return sent
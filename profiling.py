@@ -0,0 +1,150 @@
+"""
+Профилирование циклов опроса по запросу.
+Если задана переменная окружения PROFILE_DIR, каждый цикл main()
+(и движка для нескольких получателей) выполняется под cProfile,
+а в конце цикла снимается снимок tracemalloc. В PROFILE_DIR для
+каждого цикла пишутся два файла: .prof со статистикой cProfile
+(для pstats, snakeviz и т. п.) и .txt со сводкой - самые дорогие
+функции и рост памяти по строкам кода с прошлого цикла. Хранятся
+последние PROFILE_KEEP циклов, старые файлы удаляются.
+Без PROFILE_DIR используется NullProfiler, вызовы которого ничего
+не делают.
+"""
+import io
+import logging
+import os
+import time
+
+from lazy_imports import lazy_import
+
+# Без PROFILE_DIR профилировщики не нужны: импорт при включении.
+cProfile = lazy_import('cProfile')
+pstats = lazy_import('pstats')
+tracemalloc = lazy_import('tracemalloc')
+
+KEEP = 20
+TOP = 25
+SUFFIXES = ('.prof', '.txt')
+
+logger = logging.getLogger(__name__)
+
+
+class NullProfiler:
+    """Профилирование выключено: start и stop ничего не делают."""
+
+    enabled = False
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class CycleProfiler:
+    """
+    Профилировщик циклов опроса с ротацией файлов.
+    В качестве параметров класс принимает:
+    directory - каталог для файлов профиля
+    keep - сколько последних циклов хранить
+    top - сколько строк выводить в сводке
+    """
+
+    enabled = True
+
+    def __init__(self, directory, keep=KEEP, top=TOP):
+        self.directory = directory
+        self.keep = keep
+        self.top = top
+        self.cycle = 0
+        self._profile = None
+        self._started = None
+        self._snapshot = None
+        os.makedirs(directory, exist_ok=True)
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+
+    def start(self):
+        """Начинает профилирование цикла."""
+        self.cycle += 1
+        self._started = time.perf_counter()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        """Заканчивает цикл: пишет файлы профиля и удаляет старые."""
+        if self._profile is None:
+            return
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        name = os.path.join(
+            self.directory,
+            f'{time.strftime("%Y%m%d-%H%M%S")}-cycle{self.cycle:06d}'
+        )
+        self._profile.dump_stats(name + '.prof')
+        with open(name + '.txt', 'w', encoding='utf-8') as summary:
+            summary.write(self._summary(elapsed, snapshot))
+        self._profile = None
+        self._snapshot = snapshot
+        self._rotate()
+        logger.debug('Профиль цикла %s (%.3f с) записан в %s',
+                     self.cycle, elapsed, name)
+
+    def close(self):
+        """Выключает tracemalloc, если его включил этот профилировщик."""
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        self._snapshot = None
+
+    def _summary(self, elapsed, snapshot):
+        output = io.StringIO()
+        output.write(f'Цикл {self.cycle}: {elapsed:.3f} с\n\n'
+                     f'Самые дорогие функции (cumulative):\n')
+        stats = pstats.Stats(self._profile, stream=output)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        if self._snapshot is None:
+            output.write('\nВыделенная память (первый цикл):\n')
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                output.write(f'{stat}\n')
+        else:
+            output.write('\nРост памяти с прошлого цикла:\n')
+            for stat in snapshot.compare_to(self._snapshot,
+                                            'lineno')[:self.top]:
+                output.write(f'{stat}\n')
+        return output.getvalue()
+
+    def _rotate(self):
+        names = sorted({
+            entry.name[:-len(suffix)]
+            for entry in os.scandir(self.directory)
+            for suffix in SUFFIXES
+            if entry.name.endswith(suffix) and '-cycle' in entry.name
+        })
+        for name in names[:-self.keep]:
+            for suffix in SUFFIXES:
+                try:
+                    os.remove(os.path.join(self.directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+def make_profiler(directory=None, keep=KEEP):
+    """
+    Возвращает CycleProfiler, если задан каталог, иначе NullProfiler.
+    В качестве параметров функция принимает:
+    directory - каталог для файлов профиля или None
+    keep - сколько последних циклов хранить
+    """
+    if not directory:
+        return NullProfiler()
+    logger.info('Профилирование циклов включено, файлы в %s', directory)
+    return CycleProfiler(directory, keep)
@@ -0,0 +1,165 @@
+"""
+Иерархическое колесо таймеров для сроков опроса получателей.
+Время делится на такты длиной tick секунд. Нижний уровень колеса -
+slots ячеек по одному такту, каждый следующий уровень - slots ячеек,
+каждая из которых в slots раз длиннее ячейки предыдущего уровня.
+Таймер кладётся в ячейку того уровня, который покрывает его срок,
+поэтому вставка и отмена занимают O(1) независимо от числа таймеров.
+Когда нижний уровень делает полный оборот, ячейка следующего уровня
+раскладывается по нижним уровням. advance() за один такт просматривает
+одну ячейку, а не всех получателей, как перебор или куча.
+"""
+import math
+
+TICK = 1.0
+SLOTS = 64
+LEVELS = 4
+
+
+class Timer:
+    """
+    Запланированный срок для объекта item.
+    deadline - срок в секундах в шкале часов колеса.
+    """
+
+    __slots__ = ('item', 'deadline', 'ticks', 'bucket')
+
+    def __init__(self, item, deadline, ticks):
+        self.item = item
+        self.deadline = deadline
+        self.ticks = ticks
+        self.bucket = None
+
+    @property
+    def active(self):
+        """Таймер ещё ждёт срока и не отменён."""
+        return self.bucket is not None
+
+
+class TimingWheel:
+    """
+    Иерархическое колесо таймеров.
+    В качестве параметров класс принимает:
+    tick - длина такта в секундах (точность сроков)
+    slots - число ячеек на каждом уровне
+    levels - число уровней; сроки дальше tick * slots ** levels
+    секунд откладываются в последнюю ячейку верхнего уровня
+    start - время, с которого отсчитываются такты
+    """
+
+    def __init__(self, tick=TICK, slots=SLOTS, levels=LEVELS, start=0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.start = start
+        self._now = 0
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._due = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def now(self):
+        """Время последнего обработанного такта, в секундах."""
+        return self.start + self._now * self.tick
+
+    def schedule(self, item, deadline):
+        """
+        Планирует item на срок deadline и возвращает Timer.
+        Срок округляется вверх до такта; прошедший срок сработает
+        при следующем вызове advance().
+        """
+        ticks = math.ceil((deadline - self.start) / self.tick)
+        timer = Timer(item, deadline, ticks)
+        self._insert(timer)
+        self._count += 1
+        return timer
+
+    def reschedule(self, timer, deadline):
+        """
+        Переносит сработавший или отменённый таймер на новый срок.
+        Объект таймера переиспользуется, поэтому перенос дешевле,
+        чем schedule().
+        """
+        if timer.bucket is not None:
+            self.cancel(timer)
+        timer.deadline = deadline
+        timer.ticks = math.ceil((deadline - self.start) / self.tick)
+        self._insert(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer):
+        """Отменяет таймер; повторная отмена ничего не делает."""
+        if timer.bucket is None:
+            return False
+        del timer.bucket[timer]
+        timer.bucket = None
+        self._count -= 1
+        return True
+
+    def advance(self, now):
+        """
+        Продвигает колесо до времени now.
+        Возвращает сработавшие таймеры в порядке тактов.
+        """
+        target = math.floor((now - self.start) / self.tick)
+        expired = self._expire(self._due)
+        while self._now < target:
+            self._now += 1
+            for level in range(self.levels - 1, 0, -1):
+                if self._now % self._spans[level] == 0:
+                    self._cascade(level)
+            expired.extend(self._expire(
+                self._wheels[0][self._now % self.slots]
+            ))
+            if self._due:
+                # Срок, попавший ровно на этот такт при раскладке.
+                expired.extend(self._expire(self._due))
+        return expired
+
+    def _insert(self, timer):
+        ticks = timer.ticks
+        delay = ticks - self._now
+        if delay <= 0:
+            bucket = self._due
+        elif delay < self.slots:
+            bucket = self._wheels[0][ticks % self.slots]
+        else:
+            spans = self._spans
+            level = 0
+            while level < self.levels - 1 and delay >= spans[level + 1]:
+                level += 1
+            ticks = min(ticks, self._now + spans[level + 1] - 1)
+            bucket = self._wheels[level][(ticks // spans[level])
+                                         % self.slots]
+        bucket[timer] = None
+        timer.bucket = bucket
+
+    def _cascade(self, level):
+        slot = (self._now // self._spans[level]) % self.slots
+        bucket = self._wheels[level][slot]
+        timers = list(bucket)
+        bucket.clear()
+        for timer in timers:
+            self._insert(timer)
+
+    def _expire(self, bucket):
+        expired = list(bucket)
+        bucket.clear()
+        now = self._now
+        for timer in expired:
+            timer.bucket = None
+        if self.levels == 1:
+            late = [timer for timer in expired if timer.ticks > now]
+            if late:
+                # Срок дальше охвата колеса: таймер лежал в отложенной
+                # ячейке и ещё не наступил.
+                for timer in late:
+                    self._insert(timer)
+                expired = [timer for timer in expired if timer.ticks <= now]
+        self._count -= len(expired)
+        return expired
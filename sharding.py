@@ -0,0 +1,53 @@
+"""
+Распределение получателей между процессами-воркерами.
+Используется согласованное хеширование: каждый воркер занимает
+на кольце replicas точек, получатель достаётся воркеру с ближайшей
+точкой по часовой стрелке. При изменении числа воркеров переезжает
+только доля получателей около 1/N, остальные остаются на месте.
+Получатели делятся по токену Практикума, а не по чату: все подписчики
+одного аккаунта (студент, наставник, канал группы) попадают в один
+воркер, и их одновременные опросы объединяются (singleflight.py).
+"""
+import bisect
+import hashlib
+
+REPLICAS = 100
+
+
+def ring_hash(value):
+    """Позиция строки на кольце: первые 8 байт MD5."""
+    digest = hashlib.md5(value.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class HashRing:
+    """
+    Кольцо согласованного хеширования.
+    В качестве параметров класс принимает:
+    nodes - итерируемый объект с именами узлов (воркеров)
+    replicas - число точек на кольце для каждого узла
+    """
+
+    def __init__(self, nodes, replicas=REPLICAS):
+        points = sorted((ring_hash(f'{node}#{replica}'), node)
+                        for node in nodes
+                        for replica in range(replicas))
+        if not points:
+            raise ValueError('Для кольца нужен хотя бы один узел')
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        """Возвращает узел, которому принадлежит ключ."""
+        index = bisect.bisect(self._hashes, ring_hash(str(key)))
+        return self._nodes[index % len(self._nodes)]
+
+
+def shard_tenants(tenants, worker_id, workers):
+    """
+    Оставляет получателей, которые принадлежат воркеру worker_id
+    из workers. Принадлежность определяется по токену Практикума.
+    """
+    ring = HashRing(range(workers))
+    return [tenant for tenant in tenants
+            if ring.node_for(tenant.practicum_token) == worker_id]
@@ -0,0 +1,52 @@
+"""
+Объединение одновременных одинаковых запросов (single flight).
+Несколько чатов (студент, наставник, канал группы) могут следить
+за одним аккаунтом Практикума. Если их опросы с одинаковым ключом
+(токен, from_date) совпали по времени, к API уходит один запрос,
+а его результат или исключение получает каждый из ожидающих.
+Ключ забывается, как только запрос завершился, поэтому следующий
+опрос снова идёт к API: это не кэш ответов.
+"""
+import asyncio
+
+import metrics
+
+COALESCED = metrics.Counter(
+    'homework_poll_coalesced',
+    'Опросы, которые дождались уже идущего одинакового запроса к API.'
+)
+
+
+class SingleFlight:
+    """Группа одновременно выполняемых запросов движка опроса."""
+
+    def __init__(self):
+        self._flights = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    async def do(self, key, call):
+        """
+        Возвращает результат call() для ключа key.
+        Если запрос с таким ключом уже выполняется, новый не
+        запускается: вызывающий дожидается результата идущего.
+        В качестве параметров функция принимает:
+        key - ключ запроса, например (токен, from_date)
+        call - функция без аргументов, возвращающая awaitable
+        """
+        future = self._flights.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._flights[key] = future
+            future.add_done_callback(
+                lambda done: self._forget(key, done)
+            )
+        else:
+            COALESCED.inc()
+        # Отмена одного ожидающего не отменяет запрос для остальных.
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._flights.get(key) is future:
+            del self._flights[key]
@@ -0,0 +1,292 @@
+"""
+Локальное хранилище состояния бота на SQLite в режиме WAL.
+Для каждого получателя хранится временная метка последнего
+доставленного пакета (курсор опроса), последний доставленный статус
+и последняя отправленная ошибка, а также уже доставленные смены
+статусов (для dedup.py), загруженная история домашек (для
+backfill.py) и недоставленные уведомления (для outbox.py). После
+перезапуска бот продолжает опрос с сохранённых
+курсоров и не повторяет уже отправленные ошибки.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+IN_MEMORY = ':memory:'
+# База по умолчанию - файл рядом с логом бота.
+DEFAULT_PATH = 'homework_bot.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tenant_state (
+    tenant_key TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    last_status TEXT,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS delivered (
+    tenant_key TEXT NOT NULL,
+    homework_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    date_updated TEXT NOT NULL,
+    delivered_at REAL NOT NULL,
+    PRIMARY KEY (tenant_key, homework_id, status, date_updated)
+);
+CREATE INDEX IF NOT EXISTS delivered_at_index ON delivered (delivered_at);
+CREATE TABLE IF NOT EXISTS homeworks (
+    tenant_key TEXT NOT NULL,
+    homework_id TEXT NOT NULL,
+    homework_name TEXT,
+    status TEXT,
+    date_updated TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (tenant_key, homework_id)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant_key TEXT NOT NULL,
+    homework_id TEXT,
+    status TEXT,
+    date_updated TEXT,
+    message TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    UNIQUE (tenant_key, homework_id, status, date_updated)
+);
+CREATE INDEX IF NOT EXISTS outbox_tenant_index ON outbox (tenant_key, id);
+'''
+
+
+class StateStore:
+    """
+    Хранилище курсоров и последних сообщений получателей.
+    Один объект можно использовать из нескольких потоков:
+    обращения к соединению защищены блокировкой.
+    """
+
+    def __init__(self, path=IN_MEMORY):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False,
+                                           isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+
+    def load(self, tenant_key, default_timestamp):
+        """
+        Возвращает кортеж (timestamp, last_status, last_error).
+        Если для получателя ничего не сохранено, возвращает
+        (default_timestamp, None, None).
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT timestamp, last_status, last_error '
+                'FROM tenant_state WHERE tenant_key = ?',
+                (str(tenant_key),)
+            ).fetchone()
+        if row is None:
+            return default_timestamp, None, None
+        return row
+
+    def load_all(self):
+        """
+        Загружает состояние всех получателей одним запросом.
+        Возвращает словарь tenant_key -> (timestamp, last_status, last_error).
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT tenant_key, timestamp, last_status, last_error '
+                'FROM tenant_state'
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def save_cursor(self, tenant_key, timestamp, last_status):
+        """Сохраняет курсор после доставки пакета и сбрасывает ошибку."""
+        with self._lock:
+            self._connection.execute(
+                'INSERT INTO tenant_state '
+                '(tenant_key, timestamp, last_status, last_error, updated_at) '
+                'VALUES (?, ?, ?, NULL, ?) '
+                'ON CONFLICT(tenant_key) DO UPDATE SET '
+                'timestamp = excluded.timestamp, '
+                'last_status = excluded.last_status, '
+                'last_error = NULL, updated_at = excluded.updated_at',
+                (str(tenant_key), timestamp, last_status, time.time())
+            )
+
+    def save_error(self, tenant_key, timestamp, last_error):
+        """Сохраняет последнюю отправленную получателю ошибку."""
+        with self._lock:
+            self._connection.execute(
+                'INSERT INTO tenant_state '
+                '(tenant_key, timestamp, last_error, updated_at) '
+                'VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(tenant_key) DO UPDATE SET '
+                'last_error = excluded.last_error, '
+                'updated_at = excluded.updated_at',
+                (str(tenant_key), timestamp, last_error, time.time())
+            )
+
+    def save_delivered(self, tenant_key, key, delivered_at):
+        """
+        Запоминает доставленную смену статуса.
+        key - кортеж (homework_id, status, date_updated).
+        """
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO delivered '
+                '(tenant_key, homework_id, status, date_updated, '
+                'delivered_at) VALUES (?, ?, ?, ?, ?)',
+                (str(tenant_key), *key, delivered_at)
+            )
+
+    def load_delivered(self, since):
+        """
+        Удаляет записи о доставке старше since и возвращает остальные
+        в порядке доставки: кортежи
+        (tenant_key, homework_id, status, date_updated, delivered_at).
+        """
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM delivered WHERE delivered_at < ?', (since,)
+            )
+            return self._connection.execute(
+                'SELECT tenant_key, homework_id, status, date_updated, '
+                'delivered_at FROM delivered ORDER BY delivered_at'
+            ).fetchall()
+
+    def save_homeworks(self, tenant_key, homeworks):
+        """
+        Сохраняет домашки получателя одной транзакцией.
+        Уже сохранённая домашка заменяется, только если новая версия
+        обновлена не раньше неё. Домашки без id и названия пропускаются.
+        """
+        rows = [
+            (str(tenant_key),
+             str(item.get('id', item.get('homework_name'))),
+             item.get('homework_name'), item.get('status'),
+             item.get('date_updated'),
+             json.dumps(item, ensure_ascii=False))
+            for item in homeworks
+            if item.get('id', item.get('homework_name')) is not None
+        ]
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.executemany(
+                    'INSERT INTO homeworks (tenant_key, homework_id, '
+                    'homework_name, status, date_updated, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(tenant_key, homework_id) DO UPDATE SET '
+                    'homework_name = excluded.homework_name, '
+                    'status = excluded.status, '
+                    'date_updated = excluded.date_updated, '
+                    'data = excluded.data '
+                    'WHERE IFNULL(excluded.date_updated, \'\') >= '
+                    'IFNULL(homeworks.date_updated, \'\')',
+                    rows
+                )
+        return len(rows)
+
+    def load_homeworks(self, tenant_key):
+        """
+        Возвращает сохранённые домашки получателя,
+        от недавно обновлённых к старым.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT data FROM homeworks WHERE tenant_key = ? '
+                'ORDER BY date_updated DESC',
+                (str(tenant_key),)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def load_all_homeworks(self):
+        """
+        Загружает домашки всех получателей одним запросом.
+        Возвращает словарь tenant_key -> список домашек.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT tenant_key, data FROM homeworks'
+            ).fetchall()
+        homeworks = {}
+        for tenant_key, data in rows:
+            homeworks.setdefault(tenant_key, []).append(json.loads(data))
+        return homeworks
+
+    def save_outbox(self, tenant_key, entries, timestamp, last_status):
+        """
+        Одной транзакцией кладёт уведомления в outbox и сдвигает курсор.
+        Уведомление о смене статуса, которое уже лежит в outbox,
+        повторно не добавляется.
+        В качестве параметров функция принимает:
+        tenant_key - ключ получателя
+        entries - пары (ключ смены статуса из dedup.delivered_key
+        или None, текст уведомления)
+        timestamp - новый курсор опроса
+        last_status - последнее уведомление пакета
+        """
+        # Новые уведомления можно отправлять сразу.
+        rows = [(str(tenant_key), *(key or (None, None, None)), message, 0)
+                for key, message in entries]
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.executemany(
+                    'INSERT OR IGNORE INTO outbox (tenant_key, homework_id, '
+                    'status, date_updated, message, next_attempt_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                self._connection.execute(
+                    'INSERT INTO tenant_state (tenant_key, timestamp, '
+                    'last_status, last_error, updated_at) '
+                    'VALUES (?, ?, ?, NULL, ?) '
+                    'ON CONFLICT(tenant_key) DO UPDATE SET '
+                    'timestamp = excluded.timestamp, '
+                    'last_status = excluded.last_status, '
+                    'last_error = NULL, updated_at = excluded.updated_at',
+                    (str(tenant_key), timestamp, last_status, time.time())
+                )
+
+    def load_outbox(self, tenant_key):
+        """
+        Возвращает недоставленные уведомления получателя по порядку:
+        кортежи (id, ключ смены статуса или None, текст, число попыток,
+        время следующей попытки).
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, homework_id, status, date_updated, message, '
+                'attempts, next_attempt_at FROM outbox '
+                'WHERE tenant_key = ? ORDER BY id',
+                (str(tenant_key),)
+            ).fetchall()
+        return [(row_id, None if homework_id is None
+                 else (homework_id, status, date_updated),
+                 message, attempts, next_attempt_at)
+                for row_id, homework_id, status, date_updated, message,
+                attempts, next_attempt_at in rows]
+
+    def delete_outbox(self, row_id):
+        """Удаляет доставленное уведомление из outbox."""
+        with self._lock:
+            self._connection.execute('DELETE FROM outbox WHERE id = ?',
+                                     (row_id,))
+
+    def retry_outbox(self, row_id, next_attempt_at):
+        """Учитывает неудачную попытку и назначает следующую."""
+        with self._lock:
+            self._connection.execute(
+                'UPDATE outbox SET attempts = attempts + 1, '
+                'next_attempt_at = ? WHERE id = ?',
+                (next_attempt_at, row_id)
+            )
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,180 @@
+"""
+Потоковый разбор ответа API со списком домашек.
+Ответ с from_date=0 содержит всю историю студента. HomeworkStream
+читает тело ответа кусками и отдаёт домашки из списка "homeworks"
+по одной, поэтому в памяти одновременно находится не больше одной
+домашки и одного куска тела, каким бы большим ни был ответ.
+Сторонние библиотеки не нужны: отдельные значения разбирает
+json.JSONDecoder.raw_decode.
+"""
+import codecs
+import json
+
+from exceptions import ExpectedKeyNotFound
+
+CHUNK_SIZE = 64 * 1024
+MAX_VALUE_SIZE = 1024 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class HomeworkStream:
+    """
+    Итератор по домашкам из тела ответа API.
+    После того как итерация закончилась, в current_date лежит
+    временная метка ответа, а в fields - прочие ключи верхнего уровня.
+    Структура ответа проверяется так же, как в check_response:
+    TypeError для неверных типов и ExpectedKeyNotFound для
+    отсутствующих ключей. Повреждённый JSON вызывает
+    json.JSONDecodeError.
+    Поток закрывается, когда итерация закончилась, прервана ошибкой
+    или остановлена; чтобы соединение вернулось в пул и при брошенной
+    итерации, поток используется как контекстный менеджер.
+    В качестве параметров класс принимает:
+    chunks - итерируемый объект с кусками тела ответа (bytes)
+    element_name - название ответа для сообщений об ошибках
+    on_close - функция без аргументов, освобождающая ответ, или None
+    """
+
+    def __init__(self, chunks, element_name='Ответ API', on_close=None):
+        self.element_name = element_name
+        self._on_close = on_close
+        self.current_date = None
+        self.fields = {}
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self._started = False
+
+    def _fill(self):
+        """Дочитывает следующий кусок; возвращает False в конце тела."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._decoder.decode(b'', final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        if len(self._buffer) > MAX_VALUE_SIZE:
+            raise json.JSONDecodeError(
+                'Слишком большое значение в ответе API',
+                self._buffer[:100], 0
+            )
+        return True
+
+    def _peek(self):
+        """Возвращает следующий непробельный символ, не сдвигая позицию."""
+        while True:
+            while (self._position < len(self._buffer)
+                   and self._buffer[self._position] in WHITESPACE):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ''
+
+    def _expect(self, *chars):
+        char = self._peek()
+        if char not in chars:
+            raise json.JSONDecodeError(
+                f'Ожидался один из символов {chars}', self._buffer,
+                self._position
+            )
+        self._position += 1
+        return char
+
+    def _value(self):
+        """Разбирает одно значение JSON, при необходимости дочитывая тело."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer,
+                                                   self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Число на границе куска могло прийти не полностью.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def _items(self):
+        if self._peek() != '[':
+            value = self._value()
+            raise TypeError(f'''Некорректный {self.element_name}.
+                            Ожидался тип значения homeworks равный
+                            {list}, получен {type(value)}''')
+        self._position += 1
+        if self._peek() == ']':
+            self._position += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(',', ']') == ']':
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Освобождает ответ; повторный вызов ничего не делает."""
+        on_close, self._on_close = self._on_close, None
+        self._eof = True
+        if on_close is not None:
+            on_close()
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError('Ответ API можно прочитать только один раз')
+        self._started = True
+        try:
+            yield from self._read()
+        finally:
+            self.close()
+
+    def _read(self):
+        if self._peek() != '{':
+            value = self._value()
+            raise TypeError(f'''Некорректный {self.element_name}.
+                            Ожидался dict, получен {type(value).__name__}.''')
+        self._position += 1
+        seen_homeworks = False
+        if self._peek() == '}':
+            self._position += 1
+        else:
+            while True:
+                key = self._value()
+                self._expect(':')
+                if key == 'homeworks':
+                    seen_homeworks = True
+                    yield from self._items()
+                else:
+                    self.fields[key] = self._value()
+                if self._expect(',', '}') == '}':
+                    break
+        if self._peek():
+            raise json.JSONDecodeError('Лишние данные после ответа API',
+                                       self._buffer, self._position)
+        self._check(seen_homeworks)
+
+    def _check(self, seen_homeworks):
+        if not seen_homeworks:
+            raise ExpectedKeyNotFound('homeworks', self.element_name)
+        if 'current_date' not in self.fields:
+            raise ExpectedKeyNotFound('current_date', self.element_name)
+        current_date = self.fields['current_date']
+        if not isinstance(current_date, int):
+            raise TypeError(f'''Некорректный {self.element_name}.
+                            Ожидался тип значения current_date равный
+                            {int}, получен {type(current_date)}''')
+        self.current_date = current_date
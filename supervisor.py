@@ -0,0 +1,210 @@
+"""
+Режим нескольких процессов: супервизор и воркеры.
+Супервизор запускает N процессов, каждый со своим движком опроса
+(engine.py) для своей доли получателей (sharding.py), и перезапускает
+упавшие. Курсоры и доставленные смены статусов воркеры хранят в общей
+базе STATE_DB, поэтому получатель, переехавший к другому воркеру,
+продолжает опрос с того же места без повторных уведомлений.
+Перед перераспределением все воркеры останавливаются, и два процесса
+никогда не опрашивают одного получателя одновременно.
+Сигналы супервизору: SIGHUP - перечитать файл получателей,
+SIGUSR1/SIGUSR2 - добавить/убрать воркер, SIGTERM/SIGINT - остановка.
+"""
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+
+import homework
+import metrics
+from state_store import IN_MEMORY
+
+CHECK_INTERVAL = 1.0
+RESTART_DELAY = 1.0
+STOP_TIMEOUT = 30.0
+
+logger = logging.getLogger(__name__)
+
+WORKER_RESTARTS = metrics.Counter(
+    'homework_worker_restarts',
+    'Перезапуски упавших процессов-воркеров.'
+)
+WORKERS = metrics.Gauge('homework_workers',
+                        'Число запущенных процессов-воркеров.')
+
+
+def _exit_on_signal(signum, frame):
+    sys.exit(0)
+
+
+def run_worker(args, worker_id, workers):
+    """
+    Точка входа процесса-воркера: движок опроса для своей доли
+    получателей. SIGTERM завершает процесс после доставки сообщений,
+    уже стоящих в очереди.
+    В качестве параметров функция принимает:
+    args - разобранные аргументы командной строки (homework.parse_args)
+    worker_id - номер воркера, от 0 до workers - 1
+    workers - общее число воркеров
+    """
+    from engine import run_engine
+
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    metrics_port = None
+    if args.metrics_port is not None:
+        metrics_port = args.metrics_port + 1 + worker_id
+    homework.configure_process(args, metrics_port)
+    logger.info('Воркер %s из %s запущен.', worker_id, workers)
+    run_engine(args.tenants, args.concurrency, args.delivery_workers,
+               shard=(worker_id, workers), digest_window=args.digest_window,
+               spread=args.spread)
+
+
+class Supervisor:
+    """
+    Пул процессов-воркеров с перезапуском упавших.
+    В качестве параметров класс принимает:
+    args - аргументы командной строки, передаются воркерам
+    workers - число воркеров
+    target - функция воркера с параметрами (args, worker_id, workers)
+    context - контекст multiprocessing, по умолчанию spawn
+    restart_delay - пауза перед перезапуском упавшего воркера, в секундах
+    """
+
+    def __init__(self, args, workers, target=run_worker, context=None,
+                 restart_delay=RESTART_DELAY, stop_timeout=STOP_TIMEOUT):
+        if workers < 1:
+            raise ValueError('Нужен хотя бы один воркер')
+        self.args = args
+        self.workers = workers
+        self.target = target
+        self.context = context or multiprocessing.get_context('spawn')
+        self.restart_delay = restart_delay
+        self.stop_timeout = stop_timeout
+        self.processes = {}
+        self._restart_at = {}
+        self._pending_resize = None
+        self._stopping = False
+
+    def _spawn(self, worker_id):
+        process = self.context.Process(
+            target=self.target,
+            args=(self.args, worker_id, self.workers),
+            name=f'homework-worker-{worker_id}'
+        )
+        process.start()
+        self.processes[worker_id] = process
+        self._restart_at.pop(worker_id, None)
+        logger.info('Запущен воркер %s (pid %s).', worker_id, process.pid)
+
+    def start(self):
+        """Запускает все воркеры."""
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        WORKERS.set(self.workers)
+
+    def stop(self):
+        """
+        Останавливает воркеры: сначала SIGTERM, после stop_timeout
+        секунд - SIGKILL.
+        """
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for worker_id, process in self.processes.items():
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning('Воркер %s не остановился, завершаем '
+                               'принудительно.', worker_id)
+                process.kill()
+                process.join()
+        self.processes = {}
+        self._restart_at = {}
+        WORKERS.set(0)
+
+    def restart_dead(self, now=None):
+        """
+        Перезапускает упавшие воркеры через restart_delay секунд.
+        Возвращает список перезапущенных воркеров.
+        """
+        now = time.monotonic() if now is None else now
+        restarted = []
+        for worker_id, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            restart_at = self._restart_at.get(worker_id)
+            if restart_at is None:
+                logger.error('Воркер %s (pid %s) завершился с кодом %s.',
+                             worker_id, process.pid, process.exitcode)
+                self._restart_at[worker_id] = now + self.restart_delay
+                continue
+            if now >= restart_at:
+                WORKER_RESTARTS.inc()
+                self._spawn(worker_id)
+                restarted.append(worker_id)
+        return restarted
+
+    def resize(self, workers=None):
+        """
+        Перераспределяет получателей между workers воркерами.
+        Без параметра перезапускает прежнее число воркеров, и они
+        заново читают файл получателей.
+        """
+        workers = self.workers if workers is None else workers
+        if workers < 1:
+            raise ValueError('Нужен хотя бы один воркер')
+        logger.info('Перераспределение получателей: %s -> %s воркеров.',
+                    self.workers, workers)
+        self.stop()
+        self.workers = workers
+        self.start()
+
+    def _request_resize(self, delta):
+        def handler(signum, frame):
+            current = self._pending_resize or self.workers
+            self._pending_resize = max(1, current + delta)
+        return handler
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def install_signal_handlers(self):
+        """Подключает сигналы управления супервизором."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_resize(0))
+        signal.signal(signal.SIGUSR1, self._request_resize(1))
+        signal.signal(signal.SIGUSR2, self._request_resize(-1))
+
+    def run(self, check_interval=CHECK_INTERVAL):
+        """Запускает воркеры и следит за ними до сигнала остановки."""
+        self.start()
+        try:
+            while not self._stopping:
+                time.sleep(check_interval)
+                if self._pending_resize is not None:
+                    workers, self._pending_resize = self._pending_resize, None
+                    self.resize(workers)
+                self.restart_dead()
+        finally:
+            self.stop()
+
+
+def run_supervisor(args):
+    """
+    Запускает супервизор с args.workers воркерами.
+    В качестве параметров функция принимает:
+    args - разобранные аргументы командной строки (homework.parse_args)
+    """
+    if homework.STATE_DB == IN_MEMORY:
+        logger.warning('STATE_DB хранится в памяти: после перезапуска или '
+                       'перераспределения воркеры не будут знать о уже '
+                       'доставленных уведомлениях.')
+    if args.commands:
+        logger.warning('Команды /status и /history в режиме нескольких '
+                       'процессов не поддерживаются.')
+    supervisor = Supervisor(args, args.workers)
+    supervisor.install_signal_handlers()
+    supervisor.run()
@@ -0,0 +1,115 @@
+"""
+Каталоги шаблонов уведомлений по локалям.
+Шаблоны компилируются один раз при создании MessageCatalog: вердикт
+подставляется заранее, и для каждой пары (локаль, статус) остаются
+две готовые части сообщения вокруг названия работы. Уведомление
+собирается склейкой трёх строк без разбора шаблона на каждый вызов.
+Дополнительные поля домашки (reviewer_comment, lesson_name) выводятся
+отдельными строками, только если получатель их запросил.
+"""
+from exceptions import UnexpectedHomeworkStatus
+
+DEFAULT_LOCALE = 'ru'
+EXTRA_FIELDS = ('lesson_name', 'reviewer_comment')
+
+TEMPLATES = {
+    'ru': {
+        'status': 'Изменился статус проверки работы "{homework_name}". '
+                  '{verdict}',
+        'lesson_name': 'Урок: {lesson_name}',
+        'reviewer_comment': 'Комментарий ревьюера: {reviewer_comment}',
+    },
+    'en': {
+        'status': 'The review status of "{homework_name}" has changed. '
+                  '{verdict}',
+        'lesson_name': 'Lesson: {lesson_name}',
+        'reviewer_comment': 'Reviewer comment: {reviewer_comment}',
+    },
+}
+
+VERDICTS = {
+    'en': {
+        'approved': 'The work has been reviewed: the reviewer liked '
+                    'everything. Hooray!',
+        'reviewing': 'The work has been taken for review.',
+        'rejected': 'The work has been reviewed: the reviewer left '
+                    'comments.',
+    },
+}
+
+
+def split_template(template, field):
+    """
+    Делит шаблон на части до и после {field}.
+    Поле должно встречаться в шаблоне ровно один раз.
+    """
+    parts = template.split('{' + field + '}')
+    if len(parts) != 2:
+        raise ValueError(f'В шаблоне "{template}" поле {field} должно '
+                         f'встречаться ровно один раз')
+    return parts[0], parts[1]
+
+
+class MessageCatalog:
+    """
+    Скомпилированные шаблоны уведомлений для всех локалей.
+    Неизвестная локаль заменяется локалью по умолчанию.
+    В качестве параметров класс принимает:
+    default_verdicts - вердикты локали по умолчанию (HOMEWORK_VERDICTS)
+    default_locale - локаль по умолчанию
+    verdicts - вердикты остальных локалей
+    templates - шаблоны сообщений по локалям
+    """
+
+    def __init__(self, default_verdicts, default_locale=DEFAULT_LOCALE,
+                 verdicts=VERDICTS, templates=TEMPLATES):
+        self.default_locale = default_locale
+        verdicts = {**verdicts, default_locale: default_verdicts}
+        self._statuses = {}
+        self._extras = {}
+        for locale, locale_templates in templates.items():
+            status_template = locale_templates['status']
+            self._statuses[locale] = {
+                status: split_template(
+                    status_template.replace('{verdict}', verdict),
+                    'homework_name'
+                )
+                for status, verdict in verdicts.get(locale, {}).items()
+            }
+            self._extras[locale] = {
+                field: split_template(locale_templates[field], field)
+                for field in EXTRA_FIELDS
+            }
+        self._default_statuses = self._statuses[default_locale]
+        self.locales = frozenset(self._statuses)
+
+    def render(self, homework, locale=None, extras=()):
+        """
+        Собирает уведомление о смене статуса домашки.
+        Для недокументированного статуса выбрасывает
+        UnexpectedHomeworkStatus.
+        В качестве параметров функция принимает:
+        homework - словарь с информацией о домашней работе
+        locale - локаль получателя, None - локаль по умолчанию
+        extras - дополнительные поля из EXTRA_FIELDS для вывода
+        """
+        statuses = self._statuses.get(locale, self._default_statuses)
+        status = homework['status']
+        parts = statuses.get(status)
+        if parts is None:
+            raise UnexpectedHomeworkStatus(status)
+        message = f'{parts[0]}{homework["homework_name"]}{parts[1]}'
+        if extras:
+            message += self._render_extras(homework, locale, extras)
+        return message
+
+    def _render_extras(self, homework, locale, extras):
+        templates = self._extras.get(locale,
+                                     self._extras[self.default_locale])
+        lines = ''
+        for field in extras:
+            value = homework.get(field)
+            if value:
+                prefix, suffix = templates[field]
+                lines += '\n' + prefix + str(value) + suffix
+        return lines
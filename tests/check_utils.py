@@ -1,12 +1,13 @@
 import logging
 import re
 import signal
+import time
 from collections import namedtuple
 from contextlib import contextmanager
 from functools import wraps
 from http import HTTPStatus
 from inspect import signature
-from types import ModuleType
+from types import ModuleType, SimpleNamespace
 
 
 def get_clean_source_code(raw_src: str) -> str:
@@ -116,10 +117,51 @@ class MockTelegramBot:
         self.text = text
 
 
+class RecordingBot(MockTelegramBot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
 class BreakInfiniteLoop(Exception):
     pass
 
 
+def run_main(monkeypatch, practicum, telegram, iterations):
+    """Крутит main() против фейковых серверов iterations циклов."""
+    from telebot import apihelper
+
+    import homework
+
+    polls = []
+
+    def sleep(seconds):
+        polls.append(seconds)
+        if len(polls) == iterations:
+            raise BreakInfiniteLoop
+
+    monkeypatch.setattr(homework, 'ENDPOINT', practicum.endpoint)
+    monkeypatch.setattr(apihelper, 'API_URL', telegram.api_url)
+    monkeypatch.setattr(homework, 'time',
+                        SimpleNamespace(time=time.time, sleep=sleep))
+    try:
+        homework.main()
+    except BreakInfiniteLoop:
+        return
+    raise AssertionError('main() вышел из цикла опроса')
+
+
 class TestTimeoutError(BaseException):
     pass
 
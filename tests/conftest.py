@@ -53,3 +53,5 @@ pytest_timeout.write = write_timeout_reasons
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+# Тесты не должны оставлять базу состояния в репозитории.
+os.environ['STATE_DB'] = ':memory:'
@@ -0,0 +1,243 @@
+"""
+Локальные заменители API Практикума и Telegram Bot API.
+Оба сервера слушают 127.0.0.1 на свободном порту и годятся как для
+тестов, так и для нагрузочного прогона (benchmarks/load_test.py).
+Задержка ответа и доля ошибок настраиваются; ошибки Практикума
+бывают четырёх видов: код, отличный от 200, повреждённый JSON и ответ
+без ключа homeworks или current_date. Статусы домашек меняются по
+сценарию: каждый успешный запрос токена переводит его домашку
+в следующий статус и сдвигает виртуальные часы на секунду, поэтому
+каждый ответ содержит новую смену статуса. GET /_stats на любом
+из серверов возвращает его счётчики, даже если сервер запущен
+в другом процессе.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_SCRIPT = ('reviewing', 'rejected', 'reviewing', 'approved')
+PRACTICUM_ERRORS = ('status', 'malformed', 'no_homeworks',
+                    'no_current_date')
+ERROR_CODES = (500, 502, 503)
+ENDPOINT_PATH = '/api/user_api/homework_statuses/'
+API_URL_PATH = '/bot{0}/{1}'
+STATS_PATH = '/_stats'
+
+
+def dump(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class FakeServer:
+    """
+    Общая часть заменителей: HTTP-сервер в фоновом потоке,
+    задержка, доля ошибок и счётчики запросов.
+    В качестве параметров класс принимает:
+    latency - задержка каждого ответа, в секундах
+    error_rate - доля ответов с ошибкой, от 0 до 1
+    seed - начальное значение генератора случайных чисел
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        """Адрес сервера вида http://127.0.0.1:порт."""
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Запускает сервер в фоновом потоке и возвращает self."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                fake.handle(self)
+
+            def do_POST(self):
+                fake.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever,
+                         kwargs={'poll_interval': 0.05},
+                         daemon=True).start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def _choice(self, options):
+        with self._lock:
+            return self._random.choice(options)
+
+    def stats(self):
+        """Счётчики сервера."""
+        with self._lock:
+            return {'requests': self.requests, 'errors': self.errors}
+
+    def handle(self, request):
+        if request.path == STATS_PATH:
+            status, body = 200, dump(self.stats())
+        else:
+            if self.latency:
+                time.sleep(self.latency)
+            status, body = self.respond(request)
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def respond(self, request):
+        raise NotImplementedError
+
+
+class FakePracticum(FakeServer):
+    """
+    Заменитель API Практикум.Домашка.
+    Адрес для homework.ENDPOINT - endpoint.
+    В качестве параметров класс принимает:
+    script - последовательность статусов домашки, повторяется по кругу
+    errors - виды ошибок из PRACTICUM_ERRORS, которые можно отдавать
+    остальные параметры - как у FakeServer
+    """
+
+    def __init__(self, script=DEFAULT_SCRIPT, errors=PRACTICUM_ERRORS,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.script = tuple(script)
+        self.error_kinds = tuple(errors)
+        self.clock = int(time.time())
+        self._steps = {}
+
+    @property
+    def endpoint(self):
+        """Адрес эндпоинта со статусами домашек."""
+        return self.url + ENDPOINT_PATH
+
+    def _next_homework(self, token):
+        with self._lock:
+            self.clock += 1
+            step = self._steps.get(token, 0)
+            self._steps[token] = step + 1
+            date_updated = datetime.fromtimestamp(self.clock, timezone.utc)
+            return self.clock, {
+                'id': zlib.crc32(token.encode('utf-8')),
+                'status': self.script[step % len(self.script)],
+                'homework_name': f'{token}__hw_python_oop.zip',
+                'reviewer_comment': 'Нагрузочный тест',
+                'date_updated': date_updated.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'lesson_name': 'Итоговый проект',
+            }
+
+    def _error(self):
+        kind = self._choice(self.error_kinds)
+        if kind == 'status':
+            code = self._choice(ERROR_CODES)
+            return code, dump({'code': 'error', 'message': 'Сбой'})
+        if kind == 'malformed':
+            return 200, b'{"homeworks": [{"id": 1'
+        if kind == 'no_homeworks':
+            return 200, dump({'current_date': self.clock})
+        return 200, dump({'homeworks': []})
+
+    def respond(self, request):
+        token = request.headers.get('Authorization', '')
+        if not token.startswith('OAuth '):
+            return 401, dump({'code': 'not_authenticated'})
+        if self._should_fail():
+            return self._error()
+        current_date, homework = self._next_homework(token[len('OAuth '):])
+        return 200, dump({'homeworks': [homework],
+                          'current_date': current_date})
+
+
+class FakeTelegram(FakeServer):
+    """
+    Заменитель Telegram Bot API: принимает sendMessage и запоминает
+    сообщения по чатам. Адрес для apihelper.API_URL - api_url.
+    Ошибки отдаются как 500 или 429 с retry_after.
+    В качестве параметров класс принимает:
+    retry_after - значение retry_after в ответах 429, в секундах
+    остальные параметры - как у FakeServer
+    """
+
+    def __init__(self, retry_after=0, **kwargs):
+        super().__init__(**kwargs)
+        self.retry_after = retry_after
+        self.messages = []
+
+    @property
+    def api_url(self):
+        """Шаблон адреса метода для telebot.apihelper.API_URL."""
+        return self.url + API_URL_PATH
+
+    def stats(self):
+        """Счётчики сервера и число принятых сообщений."""
+        stats = super().stats()
+        with self._lock:
+            stats['messages'] = len(self.messages)
+        return stats
+
+    def respond(self, request):
+        url = urlsplit(request.path)
+        params = dict(parse_qsl(url.query))
+        length = int(request.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(request.rfile.read(length).decode()))
+        method = url.path.rsplit('/', 1)[-1]
+        if method != 'sendMessage':
+            return 200, dump({'ok': True, 'result': []})
+        if self._should_fail():
+            if self._choice((True, False)):
+                return 429, dump({
+                    'ok': False, 'error_code': 429,
+                    'description': 'Too Many Requests',
+                    'parameters': {'retry_after': self.retry_after},
+                })
+            return 500, dump({'ok': False, 'error_code': 500,
+                              'description': 'Internal Server Error'})
+        with self._lock:
+            self.messages.append((params.get('chat_id'), params.get('text')))
+            message_id = len(self.messages)
+        return 200, dump({'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(params.get('chat_id', 0)), 'type': 'private'},
+            'text': params.get('text'),
+        }})
@@ -0,0 +1,123 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import backfill
+from engine import Tenant
+from exceptions import TokenMissing
+from state_store import StateStore
+from streaming import HomeworkStream
+
+DAY = 24 * 60 * 60
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        '%Y-%m-%dT%H:%M:%SZ')
+
+
+def stream_of(items):
+    body = json.dumps({'homeworks': items, 'current_date': 0})
+    return HomeworkStream([body.encode('utf-8')])
+
+
+def test_backfill_requests_each_tenant_once(monkeypatch):
+    history = {
+        'first': [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+             'date_updated': iso(DAY)},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved',
+             'date_updated': iso(12 * DAY)},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': iso(25 * DAY)},
+            {'id': 4, 'homework_name': 'hw4', 'status': 'approved',
+             'date_updated': iso(40 * DAY)},
+        ],
+        'second': [
+            {'id': 3, 'homework_name': 'hw3', 'status': 'rejected',
+             'date_updated': iso(5 * DAY)},
+        ],
+    }
+    requested = []
+
+    def fake_stream(timestamp, headers):
+        token = headers['Authorization'].split()[-1]
+        requested.append((token, timestamp))
+        # Как и API, отдаём всё, что обновлено после from_date.
+        return stream_of([item for item in history[token]
+                          if backfill.updated_at(item) >= timestamp])
+
+    monkeypatch.setattr(backfill.homework, 'stream_homework_statuses',
+                        fake_stream)
+    store = StateStore()
+    tenants = [Tenant('first', 1), Tenant('second', 2)]
+
+    report = backfill.run_backfill(tenants, store, since=0, until=30 * DAY,
+                                   concurrency=4)
+
+    assert sorted(requested) == [('first', 0), ('second', 0)]
+    assert report.requests == 2
+    assert report.failed == 0
+    # Домашка позже until получена, но не сохранена.
+    assert report.fetched == 5
+    assert report.stored == 3
+    assert [(item['id'], item['status'])
+            for item in store.load_homeworks(1)] == [(1, 'approved'),
+                                                     (2, 'approved')]
+    assert [item['id'] for item in store.load_homeworks(2)] == [3]
+
+
+def test_backfill_keeps_going_after_failed_tenant(monkeypatch):
+    def fake_stream(timestamp, headers):
+        if headers['Authorization'] == 'OAuth broken':
+            raise ConnectionError('нет связи')
+        return stream_of([{'id': 1, 'homework_name': 'hw1',
+                           'status': 'approved', 'date_updated': iso(DAY)}])
+
+    monkeypatch.setattr(backfill.homework, 'stream_homework_statuses',
+                        fake_stream)
+    store = StateStore()
+    tenants = [Tenant('broken', 1), Tenant('token', 2)]
+
+    report = backfill.run_backfill(tenants, store, since=0, until=20 * DAY)
+
+    assert report.failed == 1
+    assert store.load_homeworks(1) == []
+    assert [item['id'] for item in store.load_homeworks(2)] == [1]
+
+
+def test_store_keeps_newer_homework():
+    store = StateStore()
+    store.save_homeworks(1, [{'id': 1, 'status': 'approved',
+                              'date_updated': iso(2 * DAY)}])
+    store.save_homeworks(1, [{'id': 1, 'status': 'reviewing',
+                              'date_updated': iso(DAY)}])
+
+    assert store.load_homeworks(1)[0]['status'] == 'approved'
+
+
+def test_backfill_closes_stream_after_invalid_homework(monkeypatch):
+    closed = []
+
+    def fake_stream(timestamp, headers):
+        body = json.dumps({'homeworks': [{'homework_name': 'hw1'},
+                                         {'homework_name': 'hw2'}],
+                           'current_date': 0})
+        return HomeworkStream([body.encode('utf-8')],
+                              on_close=lambda: closed.append(True))
+
+    monkeypatch.setattr(backfill.homework, 'stream_homework_statuses',
+                        fake_stream)
+
+    report = backfill.run_backfill([Tenant('token', 1)], StateStore(),
+                                   since=0, until=DAY)
+
+    assert report.failed == 1
+    assert closed == [True]
+
+
+def test_backfill_command_requires_chat_id(monkeypatch):
+    monkeypatch.setattr(backfill.homework, 'TELEGRAM_CHAT_ID', None)
+    with pytest.raises(TokenMissing, match='TELEGRAM_CHAT_ID'):
+        backfill.run_backfill_command()
@@ -0,0 +1,91 @@
+import pytest
+import requests
+
+import circuit
+import homework
+import metrics
+from exceptions import ApiError, CircuitOpen, RequestError
+from tests.check_utils import FakeClock
+
+
+def fail(breaker, error=RequestError('нет связи')):
+    with pytest.raises(type(error)):
+        with breaker.guard(circuit.is_practicum_failure):
+            raise error
+
+
+def test_breaker_opens_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = circuit.CircuitBreaker('test-cycle', failure_threshold=2,
+                                     reset_timeout=10, clock=clock)
+    fail(breaker)
+    assert breaker.state == circuit.CLOSED
+    fail(breaker)
+    assert breaker.state == circuit.OPEN
+
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    clock.now = 11
+    breaker.before_call()
+    assert breaker.state == circuit.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == circuit.CLOSED
+
+
+def test_failed_probe_opens_breaker_again():
+    clock = FakeClock()
+    breaker = circuit.CircuitBreaker('test-probe', failure_threshold=1,
+                                     reset_timeout=10, clock=clock)
+    fail(breaker)
+    clock.now = 10
+    fail(breaker)
+    assert breaker.state == circuit.OPEN
+    clock.now = 15
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+
+def test_tenant_errors_do_not_open_breaker():
+    breaker = circuit.CircuitBreaker('test-tenant', failure_threshold=1)
+    fail(breaker, ApiError(401, 'Unauthorized'))
+    assert breaker.state == circuit.CLOSED
+    fail(breaker, ApiError(503, 'Service Unavailable'))
+    assert breaker.state == circuit.OPEN
+
+
+def test_disabled_breaker_never_opens():
+    breaker = circuit.CircuitBreaker('test-disabled')
+    for _ in range(10):
+        fail(breaker)
+    assert breaker.state == circuit.CLOSED
+
+
+def test_state_is_exported_in_metrics():
+    breaker = circuit.CircuitBreaker('test-metrics', failure_threshold=1)
+    fail(breaker)
+
+    rendered = metrics.REGISTRY.render()
+    assert 'homework_circuit_state{breaker="test-metrics"} 1' in rendered
+
+
+def test_open_breaker_fails_fast_without_request(monkeypatch):
+    calls = []
+
+    def broken_get(*args, **kwargs):
+        calls.append(args)
+        raise requests.ConnectionError('нет связи')
+
+    monkeypatch.setattr(requests, 'get', broken_get)
+    monkeypatch.setattr(circuit, 'PRACTICUM', circuit.CircuitBreaker(
+        'test-practicum', failure_threshold=2, reset_timeout=60
+    ))
+    for _ in range(2):
+        with pytest.raises(RequestError):
+            homework.get_api_answer(0)
+    with pytest.raises(CircuitOpen):
+        homework.get_api_answer(0)
+
+    assert len(calls) == 2
@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import engine
+import homework
+from commands import NO_DATA, StatusIndex, register_handlers
+from state_store import StateStore
+from tests.check_utils import RecordingBot
+
+
+def test_index_keeps_latest_status_per_homework():
+    index = StatusIndex(homework.HOMEWORK_VERDICTS)
+    index.update(1, [
+        {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+         'date_updated': '2024-01-01T00:00:00Z'},
+        {'id': 2, 'homework_name': 'hw2', 'status': 'rejected',
+         'date_updated': '2024-01-05T00:00:00Z'},
+    ])
+    index.update('1', [{'id': 1, 'homework_name': 'hw1',
+                        'status': 'approved',
+                        'date_updated': '2024-01-10T00:00:00Z'}])
+    index.update(1, [{'id': 2, 'homework_name': 'hw2',
+                      'status': 'reviewing',
+                      'date_updated': '2024-01-02T00:00:00Z'}])
+
+    approved = homework.HOMEWORK_VERDICTS['approved']
+    rejected = homework.HOMEWORK_VERDICTS['rejected']
+    assert index.status_reply(1) == f'Последняя работа: "hw1". {approved}'
+    assert index.history_reply(1).splitlines() == [
+        'Ваши работы:', f'"hw1". {approved}', f'"hw2". {rejected}'
+    ]
+    assert index.status_reply(2) == NO_DATA
+
+
+def test_cached_reply_refreshes_after_update():
+    index = StatusIndex(homework.HOMEWORK_VERDICTS)
+    index.update(1, [{'id': 1, 'homework_name': 'hw1',
+                      'status': 'reviewing', 'date_updated': '1'}])
+    assert 'проверку' in index.status_reply(1)
+
+    index.update(1, [{'id': 1, 'homework_name': 'hw1',
+                      'status': 'approved', 'date_updated': '2'}])
+    assert 'Ура' in index.status_reply(1)
+
+
+def test_handlers_answer_from_index():
+    class CommandBot(RecordingBot):
+        def __init__(self):
+            super().__init__()
+            self.handlers = {}
+
+        def message_handler(self, commands):
+            def decorator(handler):
+                for command in commands:
+                    self.handlers[command] = handler
+                return handler
+            return decorator
+
+        def reply_to(self, message, text):
+            self.sent.append((message.chat.id, text))
+
+    index = StatusIndex(homework.HOMEWORK_VERDICTS)
+    index.update(42, [{'id': 1, 'homework_name': 'hw1',
+                       'status': 'approved'}])
+    bot = CommandBot()
+    register_handlers(bot, index)
+    message = SimpleNamespace(chat=SimpleNamespace(id=42))
+    bot.handlers['status'](message)
+    bot.handlers['history'](message)
+
+    assert [chat_id for chat_id, _ in bot.sent] == [42, 42]
+    assert all('hw1' in text for _, text in bot.sent)
+
+
+def test_engine_keeps_index_up_to_date(monkeypatch, random_timestamp):
+    def fake_request(timestamp, headers):
+        return {
+            'homeworks': [{'id': 7, 'homework_name': 'hw.zip',
+                           'status': 'approved'}],
+            'current_date': random_timestamp
+        }
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    store = StateStore()
+    store.save_homeworks(2, [{'id': 3, 'homework_name': 'old.zip',
+                              'status': 'rejected'}])
+    index = StatusIndex(homework.HOMEWORK_VERDICTS)
+    tenants = [engine.Tenant('token1', 1, 0), engine.Tenant('token2', 2, 0)]
+    polling_engine = engine.PollingEngine(RecordingBot(), tenants, store=store,
+                                          status_index=index)
+    asyncio.run(polling_engine.run(cycles=1))
+
+    assert 'hw.zip' in index.status_reply(1)
+    assert 'old.zip' in index.history_reply(2)
+    assert len(index) == 3
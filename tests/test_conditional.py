@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import requests
+
+import http_session
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.json_calls = 0
+
+    def json(self):
+        self.json_calls += 1
+        return self.data
+
+
+def test_not_modified_reuses_cached_body(monkeypatch):
+    data = {'homeworks': [], 'current_date': 1}
+    first = FakeResponse(HTTPStatus.OK, data, {'ETag': '"v1"'})
+    sent_headers = []
+
+    def mock_get(url, headers=None, **kwargs):
+        sent_headers.append(headers)
+        if len(sent_headers) == 1:
+            return first
+        return FakeResponse(HTTPStatus.NOT_MODIFIED)
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    monkeypatch.setattr(http_session, 'conditional_cache',
+                        http_session.ConditionalCache())
+    http_session.close()
+    request = {'url': 'https://example.com',
+               'headers': {'Authorization': 'OAuth token'},
+               'params': {'from_date': 0}}
+
+    assert http_session.conditional_get(**request).json() is data
+    cached = http_session.conditional_get(**request)
+
+    assert cached.status_code == HTTPStatus.OK
+    assert cached.json() is data
+    assert first.json_calls == 1
+    assert sent_headers[0]['Accept-Encoding'] == 'gzip'
+    assert 'If-None-Match' not in sent_headers[0]
+    assert sent_headers[1]['If-None-Match'] == '"v1"'
+    assert sent_headers[1]['Authorization'] == 'OAuth token'
+
+
+def test_response_without_validators_is_not_cached(monkeypatch):
+    response = FakeResponse(HTTPStatus.OK, {'homeworks': []})
+    monkeypatch.setattr(requests, 'get', lambda url, **kwargs: response)
+    monkeypatch.setattr(http_session, 'conditional_cache',
+                        http_session.ConditionalCache())
+    http_session.close()
+
+    assert http_session.conditional_get('https://example.com') is response
+    assert http_session.conditional_cache.get(
+        http_session.ConditionalCache.make_key('https://example.com',
+                                               None, None)
+    ) is None
@@ -0,0 +1,55 @@
+import asyncio
+
+import engine
+import homework
+from dedup import DeliveredIndex, delivered_key
+from state_store import StateStore
+from tests.check_utils import FakeClock, RecordingBot
+
+HOMEWORK = {'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+            'date_updated': '2021-04-11T10:31:09Z'}
+
+
+def test_key_uses_id_status_and_date_updated():
+    assert delivered_key(HOMEWORK) == ('1', 'approved',
+                                       '2021-04-11T10:31:09Z')
+    assert delivered_key({'homework_name': 'hw.zip'}) is None
+
+
+def test_index_is_bounded_and_expires():
+    clock = FakeClock(1000.0)
+    index = DeliveredIndex(max_size=2, ttl=10, clock=clock)
+    for homework_id in ('1', '2', '3'):
+        index.remember('chat', (homework_id, 'approved', 'date'))
+
+    assert len(index) == 2
+    assert not index.seen('chat', ('1', 'approved', 'date'))
+    assert index.seen('chat', ('3', 'approved', 'date'))
+    assert not index.seen('other_chat', ('3', 'approved', 'date'))
+    clock.now += 11
+    assert not index.seen('chat', ('3', 'approved', 'date'))
+
+
+def test_index_survives_restart(tmp_path):
+    path = str(tmp_path / 'state.db')
+    DeliveredIndex(StateStore(path)).remember(12345, delivered_key(HOMEWORK))
+
+    restored = DeliveredIndex(StateStore(path))
+    assert restored.seen(12345, delivered_key(HOMEWORK))
+
+
+def test_engine_skips_delivered_transitions(monkeypatch):
+    monkeypatch.setattr(
+        homework, 'request_homework_statuses',
+        lambda timestamp, headers: {'homeworks': [HOMEWORK],
+                                    'current_date': 100}
+    )
+    delivered = DeliveredIndex()
+    delivered.remember('1', delivered_key(HOMEWORK))
+    bot = RecordingBot()
+    tenant = engine.Tenant('token', 1, timestamp=0)
+    polling_engine = engine.PollingEngine(bot, [tenant], delivered=delivered)
+    asyncio.run(polling_engine.run(cycles=1))
+
+    assert bot.sent == []
+    assert tenant.timestamp == 100
@@ -0,0 +1,54 @@
+import sqlite3
+
+import telebot
+
+from delivery import DeliveryQueue, TokenBucket, get_retry_after
+from tests.check_utils import FakeClock, RecordingBot
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 1.0, 2.0]
+    clock.now = 10
+    assert bucket.reserve() == 0
+
+
+def test_retry_after_is_read_from_telegram_error():
+    error = telebot.apihelper.ApiTelegramException(
+        'sendMessage', None,
+        {'error_code': 429, 'description': 'Too Many Requests',
+         'parameters': {'retry_after': 7}}
+    )
+    assert get_retry_after(error) == 7
+    assert get_retry_after(ValueError()) is None
+
+
+def test_queue_delivers_batch_in_order():
+    bot = RecordingBot()
+    results = []
+    delivery = DeliveryQueue(bot, workers=2)
+    delivery.start()
+    delivery.submit(1, ['первое', 'второе'], results.append)
+    delivery.stop()
+
+    assert bot.sent == [(1, 'первое'), (1, 'второе')]
+    assert results == [True]
+
+
+def test_failing_on_sent_does_not_stop_worker():
+    bot = RecordingBot()
+    results = []
+
+    def on_sent(index):
+        raise sqlite3.OperationalError('database is locked')
+
+    delivery = DeliveryQueue(bot, workers=1)
+    delivery.start()
+    delivery.submit(1, ['первое', 'второе'], results.append, on_sent)
+    delivery.submit(2, ['третье'], results.append)
+    delivery.stop()
+
+    assert bot.sent == [(1, 'первое'), (1, 'второе'), (2, 'третье')]
+    assert results == [True, True]
@@ -0,0 +1,111 @@
+import asyncio
+import sys
+
+import pytest
+
+import engine
+import homework
+from delivery import DeliveryJob, DeliveryQueue
+from digest import Digest, pack_messages, split_long
+from tests.check_utils import RecordingBot
+
+
+def test_pack_messages_fills_parts_up_to_limit():
+    parts = pack_messages(['aaaa', 'bbbb', 'cccc'], limit=10, separator='|')
+
+    assert parts == [('aaaa|bbbb', [0, 1]), ('cccc', [2])]
+    assert pack_messages(['a', 'b'], limit=10) == [('a\n\nb', [0, 1])]
+
+
+def test_long_message_is_split_at_line_breaks():
+    assert split_long('aaa\nbbb\ncc', limit=7) == ['aaa\nbbb', 'cc']
+    assert split_long('a' * 10, limit=4) == ['aaaa', 'aaaa', 'aa']
+    parts = pack_messages(['x', 'a' * 10], limit=4, separator='')
+    assert [text for text, _ in parts] == ['x', 'aaaa', 'aaaa', 'aa']
+    assert [completed for _, completed in parts] == [[0], [], [], [1]]
+
+
+def test_digest_reports_jobs_sent_before_failure():
+    done = {}
+    sent = []
+    first = DeliveryJob(1, ['a' * 6, 'b' * 6],
+                        lambda ok: done.setdefault('first', ok),
+                        lambda index: sent.append(('first', index)))
+    second = DeliveryJob(1, ['c' * 6],
+                         lambda ok: done.setdefault('second', ok))
+    digest = Digest([first, second], limit=15)
+
+    assert len(digest.messages) == 2
+    assert digest.saved_calls == 1
+    digest.on_sent(0)
+    digest.on_done(False)
+
+    assert sent == [('first', 0), ('first', 1)]
+    assert done == {'first': True, 'second': False}
+
+
+def test_queue_merges_batches_of_one_chat():
+    bot = RecordingBot()
+    results = []
+    delivery = DeliveryQueue(bot, digest_window=0.05)
+    delivery.start()
+    delivery.submit(1, ['первое'], results.append)
+    delivery.submit(1, ['второе', 'третье'], results.append)
+    delivery.submit(2, ['другой чат'], results.append)
+    delivery.submit(3, ['сразу'], results.append, window=0)
+    delivery.stop()
+
+    assert sorted(bot.sent) == [(1, 'первое\n\nвторое\n\nтретье'),
+                                (2, 'другой чат'), (3, 'сразу')]
+    assert results == [True] * 4
+
+
+def test_engine_sends_burst_as_one_message(monkeypatch, random_timestamp):
+    homeworks = [{'id': number, 'homework_name': f'hw{number}.zip',
+                  'status': 'approved'}
+                 for number in range(50)]
+
+    def fake_request(timestamp, headers):
+        return {'homeworks': homeworks, 'current_date': random_timestamp}
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    bot = RecordingBot()
+    tenant = engine.Tenant('token', 1, timestamp=0, digest_window=0.01)
+    asyncio.run(engine.PollingEngine(bot, [tenant]).run(cycles=1))
+
+    texts = [text for _, text in bot.sent]
+    assert len(texts) < len(homeworks)
+    assert all(len(text) <= 4096 for text in texts)
+    assert '\n\n'.join(texts) == '\n\n'.join(
+        homework.parse_status(item) for item in homeworks
+    )
+    assert tenant.timestamp == random_timestamp
+
+
+def test_digest_window_requires_tenants(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['homework.py', '--digest-window', '60'])
+    with pytest.raises(SystemExit):
+        homework.parse_args()
+    assert '--digest-window' in capsys.readouterr().err
+
+    monkeypatch.setattr(sys, 'argv', ['homework.py', '--tenants', 't.json',
+                                      '--digest-window', '60'])
+    assert homework.parse_args().digest_window == 60
+
+
+def test_digest_keeps_going_after_failing_on_sent():
+    sent = []
+    done = []
+
+    def fail(index):
+        raise RuntimeError('database is locked')
+
+    first = DeliveryJob(1, ['a'], done.append, fail)
+    second = DeliveryJob(1, ['b'], done.append, sent.append)
+    digest = Digest([first, second])
+
+    digest.on_sent(0)
+    digest.on_done(False)
+
+    assert sent == [0]
+    assert done == [True, True]
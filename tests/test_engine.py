@@ -0,0 +1,116 @@
+import asyncio
+
+import telebot
+
+import engine
+import homework
+from delivery import DeliveryQueue
+from tests.check_utils import RecordingBot
+
+
+def test_engine_polls_every_tenant(monkeypatch, random_timestamp):
+    requested = []
+
+    def fake_request(timestamp, headers):
+        requested.append(headers['Authorization'])
+        return {
+            'homeworks': [{'homework_name': 'hw.zip', 'status': 'approved'}],
+            'current_date': random_timestamp
+        }
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    bot = RecordingBot()
+    tenants = [engine.Tenant(f'token{number}', number, timestamp=0)
+               for number in range(5)]
+    asyncio.run(engine.PollingEngine(bot, tenants, 2).run(cycles=1))
+
+    assert sorted(requested) == [f'OAuth token{number}' for number in range(5)]
+    assert sorted(chat_id for chat_id, _ in bot.sent) == list(range(5))
+    assert all(tenant.timestamp == random_timestamp for tenant in tenants)
+
+
+def test_engine_reports_error_once(monkeypatch):
+    def failing_request(timestamp, headers):
+        raise homework.RequestError('timeout')
+
+    monkeypatch.setattr(homework, 'request_homework_statuses',
+                        failing_request)
+    bot = RecordingBot()
+    tenant = engine.Tenant('token', 1, timestamp=0)
+    polling_engine = engine.PollingEngine(bot, [tenant], retry_period=0)
+    asyncio.run(polling_engine.run(cycles=2))
+
+    assert len(bot.sent) == 1
+    assert tenant.timestamp == 0
+
+
+def test_engine_delivers_whole_batch(monkeypatch, random_timestamp):
+    homeworks = [{'homework_name': f'hw{number}.zip', 'status': 'approved'}
+                 for number in range(3)]
+
+    def fake_request(timestamp, headers):
+        return {'homeworks': homeworks, 'current_date': random_timestamp}
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    bot = RecordingBot()
+    tenant = engine.Tenant('token', 1, timestamp=0)
+    asyncio.run(engine.PollingEngine(bot, [tenant]).run(cycles=1))
+
+    assert [text for _, text in bot.sent] == [
+        homework.parse_status(item) for item in homeworks
+    ]
+    assert tenant.timestamp == random_timestamp
+
+
+def test_engine_keeps_cursor_when_batch_not_delivered(monkeypatch):
+    def fake_request(timestamp, headers):
+        return {
+            'homeworks': [{'homework_name': 'hw.zip', 'status': 'approved'}],
+            'current_date': 100
+        }
+
+    class FailingBot(RecordingBot):
+        def send_message(self, chat_id=None, text=None, **kwargs):
+            raise telebot.apihelper.ApiException('Ошибка', 'send_message',
+                                                 None)
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    bot = FailingBot()
+    delivery = DeliveryQueue(bot, max_attempts=1)
+    tenant = engine.Tenant('token', 1, timestamp=0)
+    asyncio.run(
+        engine.PollingEngine(bot, [tenant], delivery=delivery).run(cycles=1)
+    )
+
+    assert tenant.timestamp == 0
+    assert not tenant.in_flight
+
+
+def test_engine_skips_tenant_with_batch_in_flight(monkeypatch):
+    requested = []
+    monkeypatch.setattr(homework, 'request_homework_statuses',
+                        lambda timestamp, headers: requested.append(1))
+    tenant = engine.Tenant('token', 1, timestamp=0)
+    tenant.in_flight = True
+    asyncio.run(engine.PollingEngine(RecordingBot(), [tenant]).run_cycle())
+
+    assert requested == []
+
+
+def test_tenant_state_is_compact():
+    tenant = engine.Tenant('token', 1, timestamp=0)
+
+    assert not hasattr(tenant, '__dict__')
+    assert tenant.headers == {'Authorization': 'OAuth token'}
+
+
+def test_same_error_is_shared_between_tenants(monkeypatch):
+    def fake_request(timestamp, headers):
+        raise ConnectionError('нет связи')
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    tenants = [engine.Tenant(f'token{number}', number, timestamp=0)
+               for number in range(3)]
+    asyncio.run(engine.PollingEngine(RecordingBot(), tenants).run(cycles=1))
+
+    assert tenants[0].last_message is tenants[2].last_message
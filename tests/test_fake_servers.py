@@ -0,0 +1,37 @@
+import pytest
+
+import homework
+from tests.check_utils import run_main
+from tests.fake_servers import FakePracticum, FakeTelegram
+
+
+def test_main_runs_end_to_end_against_fake_servers(monkeypatch):
+    with FakePracticum() as practicum, FakeTelegram() as telegram:
+        run_main(monkeypatch, practicum, telegram, iterations=4)
+
+    assert practicum.requests == 4
+    texts = [text for _, text in telegram.messages]
+    assert texts[0] == 'Бот начал работу!'
+    assert [text.split('". ', 1)[-1] for text in texts[1:]] == [
+        homework.HOMEWORK_VERDICTS[status]
+        for status in ('reviewing', 'rejected', 'reviewing', 'approved')
+    ]
+    assert {chat_id for chat_id, _ in telegram.messages} == {
+        homework.TELEGRAM_CHAT_ID
+    }
+
+
+@pytest.mark.parametrize('kind', ['status', 'malformed', 'no_homeworks',
+                                  'no_current_date'])
+def test_practicum_errors_are_reported_once(monkeypatch, kind):
+    with FakePracticum(error_rate=1, errors=[kind]) as practicum, \
+            FakeTelegram() as telegram:
+        run_main(monkeypatch, practicum, telegram, iterations=3)
+
+    assert practicum.errors == 3
+    errors = [text for _, text in telegram.messages
+              if text.startswith('Возникла ошибка!')]
+    # Одна и та же ошибка подряд отправляется в чат только один раз.
+    assert errors
+    assert all(previous != current
+               for previous, current in zip(errors, errors[1:]))
@@ -0,0 +1,31 @@
+import requests
+
+import http_session
+
+
+def test_get_without_session_uses_requests_with_timeout(monkeypatch):
+    calls = []
+
+    def mock_get(url, **kwargs):
+        calls.append((url, kwargs))
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    http_session.close()
+    http_session.get('https://example.com', params={'from_date': 0})
+
+    assert calls == [(
+        'https://example.com',
+        {'params': {'from_date': 0},
+         'timeout': (http_session.CONNECT_TIMEOUT, http_session.READ_TIMEOUT)}
+    )]
+
+
+def test_configure_mounts_pooled_adapter():
+    session = http_session.configure(pool_size=3, connect_timeout=1,
+                                     read_timeout=2)
+    try:
+        adapter = session.get_adapter('https://practicum.yandex.ru/')
+        assert adapter._pool_maxsize == 3
+        assert http_session._timeout == (1, 2)
+    finally:
+        http_session.close()
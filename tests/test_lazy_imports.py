@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import homework
+import lazy_imports
+from exceptions import InvalidConfig, TokenMissing
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOMEWORK_PATH = os.path.join(BASE_DIR, 'homework.py')
+HEAVY_MODULES = ('requests', 'urllib3', 'telebot', 'http.client')
+TOKENS = {'PRACTICUM_TOKEN': 'token', 'TELEGRAM_TOKEN': '1234:token',
+          'TELEGRAM_CHAT_ID': '1'}
+
+
+def run_python(*args, env=None, cwd=BASE_DIR):
+    return subprocess.run([sys.executable, *args], cwd=cwd,
+                          env={**os.environ, **(env or {})},
+                          capture_output=True, text=True, timeout=10)
+
+
+def test_lazy_module_imports_on_first_access():
+    module = lazy_imports.LazyModule('colorsys')
+    assert 'не загружен' in repr(module)
+    assert module.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+    assert 'не загружен' not in repr(module)
+
+
+def test_lazy_module_sees_patched_attributes(monkeypatch):
+    module = lazy_imports.LazyModule('requests')
+
+    def patched_get(*args, **kwargs):
+        return 'patched'
+
+    monkeypatch.setattr(requests, 'get', patched_get)
+    assert module.get() == 'patched'
+
+
+def test_lazy_import_returns_loaded_module():
+    assert lazy_imports.lazy_import('os') is os
+
+
+def test_import_does_not_load_network_libraries():
+    script = ('import sys, homework; '
+              f'print([m for m in {HEAVY_MODULES!r} if m in sys.modules])')
+    result = run_python('-c', script)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
+
+
+def test_check_mode_exit_codes(tmp_path):
+    # Лог бота пишется в текущий каталог.
+    env = {**TOKENS, 'STATE_DB': str(tmp_path / 'state.db')}
+    result = run_python(HOMEWORK_PATH, '--check', env=env, cwd=tmp_path)
+    assert result.returncode == 0, result.stderr
+
+    env['TELEGRAM_TOKEN'] = ''
+    result = run_python(HOMEWORK_PATH, '--check', env=env, cwd=tmp_path)
+    assert result.returncode == 1
+    assert 'TELEGRAM_TOKEN' in result.stderr
+
+
+def test_check_config_validates_tenants_file(monkeypatch, tmp_path):
+    tenants = tmp_path / 'tenants.json'
+    tenants.write_text('[{"practicum_token": "a", "chat_id": 1}]')
+    homework.check_config(SimpleNamespace(tenants=str(tenants)))
+
+    tenants.write_text('[{"chat_id": 1}]')
+    with pytest.raises(InvalidConfig):
+        homework.check_config(SimpleNamespace(tenants=str(tenants)))
+
+    tenants.write_text('[{"practicum_token": "a", "chat_id": 1}]')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', None)
+    with pytest.raises(TokenMissing):
+        homework.check_config(SimpleNamespace(tenants=str(tenants)))
+
+
+def test_check_config_requires_tokens(monkeypatch):
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', None)
+    with pytest.raises(TokenMissing):
+        homework.check_config(SimpleNamespace(tenants=None))
+
+
+def test_bench_cycle_stand_ins_cover_lazy_telebot(monkeypatch):
+    # main() импортирует TeleBot при запуске: заглушка бенчмарка
+    # должна подменять telebot.TeleBot, а не атрибут модуля homework.
+    import importlib.util
+
+    import telebot
+
+    from tests import check_utils
+
+    path = os.path.join(BASE_DIR, 'benchmarks', 'bench_cycle.py')
+    spec = importlib.util.spec_from_file_location('bench_cycle', path)
+    bench_cycle = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench_cycle)
+    for name in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID',
+                 'STATE_DB'):
+        monkeypatch.setattr(homework, name, getattr(homework, name))
+    monkeypatch.setattr(requests, 'get', requests.get)
+    monkeypatch.setattr(telebot, 'TeleBot', telebot.TeleBot)
+
+    bench_cycle.install_stand_ins(bench_cycle.make_response_data(1))
+    assert telebot.TeleBot is check_utils.MockTelegramBot
+    bench_cycle.run_main_once()
@@ -0,0 +1,28 @@
+import json
+import logging
+import queue
+
+from log_setup import DeferredQueueHandler, JsonLinesFormatter
+
+
+def test_deferred_handler_does_not_format_record():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    record = logging.makeLogRecord({'msg': 'Статус %s', 'args': ('approved',)})
+    handler.emit(record)
+
+    queued = log_queue.get_nowait()
+    assert queued is record
+    assert queued.args == ('approved',)
+
+
+def test_json_lines_formatter_keeps_extra_fields():
+    record = logging.makeLogRecord({
+        'name': 'homework', 'levelname': 'ERROR',
+        'msg': 'Ошибка опроса для %s', 'args': ('чата',), 'chat_id': 42
+    })
+    data = json.loads(JsonLinesFormatter().format(record))
+
+    assert data['message'] == 'Ошибка опроса для чата'
+    assert data['level'] == 'ERROR'
+    assert data['chat_id'] == 42
@@ -0,0 +1,44 @@
+import urllib.request
+
+import metrics
+
+
+def test_render_counter_and_histogram():
+    registry = metrics.Registry()
+    errors = metrics.Counter('bot_errors', 'Ошибки.', ('exception',),
+                             registry=registry)
+    latency = metrics.Histogram('bot_latency_seconds', 'Задержка.',
+                                buckets=(0.1, 1), registry=registry)
+    errors.labels('ApiError').inc()
+    errors.labels('ApiError').inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert '# TYPE bot_errors counter' in text
+    assert 'bot_errors_total{exception="ApiError"} 2.0' in text
+    assert 'bot_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'bot_latency_seconds_bucket{le="1"} 2' in text
+    assert 'bot_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'bot_latency_seconds_count 3' in text
+
+
+def test_label_values_are_escaped():
+    assert metrics.format_labels(('name',), ('a"b\n',)) == (
+        '{name="a\\"b\\n"}'
+    )
+
+
+def test_http_server_serves_registry():
+    registry = metrics.Registry()
+    metrics.Gauge('bot_up', 'Бот работает.', registry=registry).set(1)
+    server = metrics.start_http_server(0, registry=registry)
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/metrics'
+        with urllib.request.urlopen(url, timeout=1) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'bot_up 1' in body
@@ -0,0 +1,156 @@
+import sqlite3
+from functools import partial
+
+import homework
+from dedup import DeliveredIndex, delivered_key
+from outbox import Outbox
+from state_store import StateStore
+from tests.check_utils import FakeClock, run_main
+from tests.fake_servers import FakePracticum, FakeTelegram
+
+HOMEWORKS = [{'id': number, 'homework_name': f'hw{number}.zip',
+              'status': 'approved', 'date_updated': '2024-01-01T00:00:00Z'}
+             for number in range(3)]
+MESSAGES = [f'Статус {number}' for number in range(3)]
+
+
+class FlakySender:
+    def __init__(self, failures):
+        self.failures = set(failures)
+        self.calls = []
+        self.sent = []
+
+    def __call__(self, message):
+        self.calls.append(message)
+        if message in self.failures:
+            self.failures.discard(message)
+            return False
+        self.sent.append(message)
+        return True
+
+
+def make_outbox(store=None):
+    store = store or StateStore()
+    clock = FakeClock(1000.0)
+    return Outbox(store, DeliveredIndex(store), backoff=10, clock=clock), clock
+
+
+def test_cursor_advances_before_delivery():
+    outbox, _ = make_outbox()
+    outbox.put('chat', HOMEWORKS, MESSAGES, 500)
+
+    assert outbox.store.load('chat', 0) == (500, MESSAGES[-1], None)
+    assert len(outbox.store.load_outbox('chat')) == 3
+
+
+def test_only_undelivered_rows_are_retried_with_backoff():
+    outbox, clock = make_outbox()
+    outbox.put('chat', HOMEWORKS, MESSAGES, 500)
+    send = FlakySender(failures=[MESSAGES[1]])
+
+    assert outbox.flush('chat', send) == 1
+    assert send.calls == MESSAGES[:2]
+    clock.now += 5
+    assert outbox.flush('chat', send) == 0
+    assert send.calls == MESSAGES[:2]
+    clock.now += 5
+    assert outbox.flush('chat', send) == 2
+
+    assert send.sent == MESSAGES
+    assert outbox.store.load_outbox('chat') == []
+    assert all(outbox.delivered.seen('chat', delivered_key(item))
+               for item in HOMEWORKS)
+
+
+def test_backoff_is_exponential_and_capped():
+    outbox, _ = make_outbox()
+    outbox.max_backoff = 35
+    assert [outbox.delay(attempts) for attempts in range(1, 6)] == [
+        10, 20, 35, 35, 35
+    ]
+
+
+def test_delivered_and_queued_transitions_are_not_duplicated():
+    outbox, _ = make_outbox()
+    outbox.delivered.remember('chat', delivered_key(HOMEWORKS[0]))
+    assert outbox.put('chat', HOMEWORKS, MESSAGES, 500) == 2
+    outbox.put('chat', HOMEWORKS, MESSAGES, 600)
+
+    assert [row[2] for row in outbox.store.load_outbox('chat')] == (
+        MESSAGES[1:]
+    )
+
+
+def test_outbox_survives_restart(tmp_path):
+    path = str(tmp_path / 'state.db')
+    outbox, _ = make_outbox(StateStore(path))
+    outbox.put('chat', HOMEWORKS, MESSAGES, 500)
+
+    restored, _ = make_outbox(StateStore(path))
+    send = FlakySender(failures=[])
+    assert restored.flush('chat', send) == 3
+    assert send.sent == MESSAGES
+
+
+def test_main_retries_failed_notification_without_repolling(monkeypatch):
+    failures = {'reviewing'}
+    sent = []
+
+    def flaky_send_message(bot, message):
+        status = next((status for status, verdict
+                       in homework.HOMEWORK_VERDICTS.items()
+                       if message.endswith(verdict)), None)
+        if status in failures:
+            failures.discard(status)
+            return False
+        sent.append(status)
+        return True
+
+    monkeypatch.setattr(homework, 'send_message', flaky_send_message)
+    monkeypatch.setattr(homework, 'Outbox', partial(Outbox, backoff=0))
+    with FakePracticum() as practicum, FakeTelegram() as telegram:
+        run_main(monkeypatch, practicum, telegram, iterations=4)
+
+    assert practicum.requests == 4
+    assert sent == [None, 'reviewing', 'rejected', 'reviewing', 'approved']
+
+
+def test_failed_outbox_write_keeps_cursor(monkeypatch):
+    polled = []
+    save_outbox = StateStore.save_outbox
+
+    def record_poll(timestamp):
+        polled.append(timestamp)
+        return get_api_answer(timestamp)
+
+    def fail_once(self, *args):
+        monkeypatch.setattr(StateStore, 'save_outbox', save_outbox)
+        raise sqlite3.OperationalError('database or disk is full')
+
+    get_api_answer = homework.get_api_answer
+    monkeypatch.setattr(homework, 'get_api_answer', record_poll)
+    monkeypatch.setattr(StateStore, 'save_outbox', fail_once)
+    with FakePracticum() as practicum, FakeTelegram() as telegram:
+        run_main(monkeypatch, practicum, telegram, iterations=2)
+
+    # Уведомления не записаны: тот же период опрашивается повторно.
+    assert polled[0] == polled[1]
+    assert 'disk is full' in telegram.messages[1][1]
+
+
+def test_state_errors_do_not_stop_main(monkeypatch):
+    def locked(self, *args):
+        raise sqlite3.OperationalError('database is locked')
+
+    def fail_poll(timestamp):
+        raise homework.RequestError('timeout')
+
+    monkeypatch.setattr(StateStore, 'load_outbox', locked)
+    monkeypatch.setattr(StateStore, 'save_error', locked)
+    monkeypatch.setattr(homework, 'get_api_answer', fail_poll)
+    with FakePracticum() as practicum, FakeTelegram() as telegram:
+        run_main(monkeypatch, practicum, telegram, iterations=3)
+
+    assert [text for _, text in telegram.messages][1:] == [
+        'Возникла ошибка! При запросе возникла ошибка timeout'
+    ]
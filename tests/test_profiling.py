@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import homework
+import profiling
+from exceptions import InvalidConfig
+from tests.check_utils import run_main
+from tests.fake_servers import FakePracticum, FakeTelegram
+
+
+def busy():
+    return sum(range(1000))
+
+
+@pytest.fixture
+def make_profiler(tmp_path):
+    profilers = []
+
+    def make(**kwargs):
+        profiler = profiling.CycleProfiler(str(tmp_path), **kwargs)
+        profilers.append(profiler)
+        return profiler
+
+    yield make
+    # tracemalloc замедляет всё, что выполняется после него.
+    for profiler in profilers:
+        profiler.close()
+
+
+def test_null_profiler_does_nothing(tmp_path):
+    profiler = profiling.make_profiler(None)
+    assert not profiler.enabled
+    profiler.start()
+    profiler.stop()
+    assert not os.listdir(tmp_path)
+
+
+def test_cycle_profiler_writes_profile_and_summary(tmp_path, make_profiler):
+    profiler = make_profiler()
+    assert profiler.enabled
+    for _ in range(2):
+        profiler.start()
+        busy()
+        profiler.stop()
+
+    names = sorted(os.listdir(tmp_path))
+    assert [name.rsplit('-', 1)[-1] for name in names] == [
+        'cycle000001.prof', 'cycle000001.txt',
+        'cycle000002.prof', 'cycle000002.txt',
+    ]
+    summary = (tmp_path / names[-1]).read_text(encoding='utf-8')
+    assert 'Цикл 2' in summary
+    assert 'busy' in summary
+    assert 'Рост памяти с прошлого цикла' in summary
+
+
+def test_cycle_profiler_keeps_last_cycles(tmp_path, make_profiler):
+    profiler = make_profiler(keep=2)
+    for _ in range(4):
+        profiler.start()
+        profiler.stop()
+
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 4
+    assert all('cycle000003' in name or 'cycle000004' in name
+               for name in names)
+
+
+def test_stop_without_start_is_ignored(tmp_path, make_profiler):
+    profiler = make_profiler()
+    profiler.stop()
+    assert not os.listdir(tmp_path)
+
+
+def test_main_profiles_each_cycle(monkeypatch, tmp_path, make_profiler):
+    profiler = make_profiler()
+    monkeypatch.setattr(homework, 'make_cycle_profiler', lambda: profiler)
+    with FakePracticum() as practicum, FakeTelegram() as telegram:
+        run_main(monkeypatch, practicum, telegram, iterations=2)
+
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 4
+    assert 'get_api_answer' in (tmp_path / names[-1]).read_text(
+        encoding='utf-8'
+    )
+
+
+def test_import_does_not_start_profiling(tmp_path):
+    directory = tmp_path / 'profiles'
+    script = 'import tracemalloc, homework; print(tracemalloc.is_tracing())'
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, 'PROFILE_DIR': str(directory)},
+        capture_output=True, text=True, timeout=10
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'False'
+    assert not directory.exists()
+
+
+@pytest.mark.parametrize('keep', ['many', '0'])
+def test_bad_profile_keep_is_config_error(monkeypatch, tmp_path, keep):
+    monkeypatch.setattr(homework, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(homework, 'PROFILE_KEEP', keep)
+    with pytest.raises(InvalidConfig, match='PROFILE_KEEP'):
+        homework.make_cycle_profiler()
+    assert not os.listdir(tmp_path)
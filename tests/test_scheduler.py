@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import engine
+import homework
+from scheduler import TimingWheel
+from tests.check_utils import RecordingBot
+
+
+def fired_items(wheel, now):
+    return [timer.item for timer in wheel.advance(now)]
+
+
+def test_timers_fire_in_deadline_order():
+    wheel = TimingWheel(tick=1, slots=4, levels=3)
+    for item, deadline in (('c', 3), ('a', 1), ('b', 2)):
+        wheel.schedule(item, deadline)
+
+    assert fired_items(wheel, 0.5) == []
+    assert fired_items(wheel, 3) == ['a', 'b', 'c']
+    assert len(wheel) == 0
+
+
+def test_far_deadlines_cascade_to_lower_levels():
+    wheel = TimingWheel(tick=1, slots=4, levels=3)
+    deadlines = [5, 17, 40, 63]
+    for deadline in deadlines:
+        wheel.schedule(deadline, deadline)
+
+    fired = {}
+    for now in range(70):
+        for item in fired_items(wheel, now):
+            fired[item] = now
+    assert fired == {deadline: deadline for deadline in deadlines}
+
+
+def test_deadline_beyond_wheel_range_waits():
+    wheel = TimingWheel(tick=1, slots=2, levels=2)
+    wheel.schedule('far', 100)
+
+    assert fired_items(wheel, 99) == []
+    assert fired_items(wheel, 100) == ['far']
+
+
+def test_cancel_and_past_deadlines():
+    wheel = TimingWheel(tick=1, slots=4, levels=2, start=10)
+    timer = wheel.schedule('cancelled', 12)
+    wheel.schedule('late', 5)
+
+    assert wheel.cancel(timer)
+    assert not wheel.cancel(timer)
+    assert not timer.active
+    assert fired_items(wheel, 10) == ['late']
+    assert fired_items(wheel, 20) == []
+
+
+def test_spread_engine_polls_each_tenant_at_its_own_time(monkeypatch):
+    polled = {}
+
+    def fake_request(timestamp, headers):
+        polled.setdefault(headers['Authorization'], []).append(
+            time.monotonic()
+        )
+        return {'homeworks': [], 'current_date': timestamp}
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    tenants = [engine.Tenant(f'token{number}', number, timestamp=0)
+               for number in range(6)]
+    polling_engine = engine.PollingEngine(RecordingBot(), tenants,
+                                          retry_period=0.3, spread=True,
+                                          tick=0.01)
+    asyncio.run(polling_engine.run(cycles=2))
+
+    assert sorted(polled) == [f'OAuth token{number}' for number in range(6)]
+    assert all(len(times) == 2 for times in polled.values())
+    first_polls = sorted(times[0] for times in polled.values())
+    assert first_polls[-1] - first_polls[0] > 0.15
+    assert all(abs(times[1] - times[0] - 0.3) < 0.1
+               for times in polled.values())
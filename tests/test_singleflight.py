@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import engine
+import homework
+from singleflight import SingleFlight
+from tests.check_utils import RecordingBot
+
+
+def test_concurrent_calls_with_same_key_share_one_flight():
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f'ответ {key}'
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *(flights.do(key, lambda key=key: fetch(key))
+              for key in ('a', 'a', 'a', 'b'))
+        )
+        assert len(flights) == 0
+        # Ключ забыт: следующий вызов снова идёт к источнику.
+        await flights.do('a', lambda: fetch('a'))
+        return results
+
+    results = asyncio.run(scenario())
+    assert results == ['ответ a'] * 3 + ['ответ b']
+    assert calls == ['a', 'b', 'a']
+
+
+def test_error_is_delivered_to_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise homework.RequestError('timeout')
+
+    async def scenario():
+        flights = SingleFlight()
+        return await asyncio.gather(
+            *(flights.do('key', fail) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    errors = asyncio.run(scenario())
+    assert len(errors) == 3
+    assert all(isinstance(error, homework.RequestError) for error in errors)
+    assert len({id(error) for error in errors}) == 1
+
+
+@pytest.mark.parametrize('spread', [False, True])
+def test_engine_coalesces_polls_of_one_account(monkeypatch, random_timestamp,
+                                               spread):
+    requested = []
+    lock = threading.Lock()
+
+    def fake_request(timestamp, headers):
+        with lock:
+            requested.append(headers['Authorization'])
+        time.sleep(0.05)
+        return {
+            'homeworks': [{'homework_name': 'hw.zip', 'status': 'approved'}],
+            'current_date': random_timestamp
+        }
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    bot = RecordingBot()
+    tenants = [engine.Tenant('shared', chat_id, timestamp=0)
+               for chat_id in (1, 2, 3)]
+    tenants.append(engine.Tenant('own', 4, timestamp=0))
+    polling_engine = engine.PollingEngine(bot, tenants, retry_period=0.2,
+                                          spread=spread, tick=0.01)
+    asyncio.run(polling_engine.run(cycles=1))
+
+    assert sorted(requested) == ['OAuth own', 'OAuth shared']
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2, 3, 4]
+    assert all(tenant.timestamp == random_timestamp for tenant in tenants)
@@ -0,0 +1,67 @@
+import engine
+from state_store import StateStore
+from tests.check_utils import RecordingBot
+
+
+def test_state_survives_reopen(tmp_path):
+    path = str(tmp_path / 'state.db')
+    store = StateStore(path)
+    store.save_cursor(12345, 1000, 'Изменился статус')
+    store.save_error(777, 50, 'Возникла ошибка!')
+    store.close()
+
+    store = StateStore(path)
+    assert store.load(12345, 0) == (1000, 'Изменился статус', None)
+    assert store.load(777, 0) == (50, None, 'Возникла ошибка!')
+    assert store.load('unknown', 42) == (42, None, None)
+
+
+def test_cursor_resets_error():
+    store = StateStore()
+    store.save_error('1', 10, 'Возникла ошибка!')
+    store.save_cursor('1', 20, 'Изменился статус')
+    assert store.load_all() == {'1': (20, 'Изменился статус', None)}
+
+
+def test_engine_warm_start_restores_tenants():
+    store = StateStore()
+    store.save_cursor('1', 500, 'Изменился статус')
+    store.save_error('2', 0, 'Возникла ошибка!')
+    tenants = [engine.Tenant('token', chat_id, timestamp=0)
+               for chat_id in (1, 2, 3)]
+    polling_engine = engine.PollingEngine(RecordingBot(), tenants,
+                                          store=store)
+    polling_engine.warm_start()
+
+    assert [tenant.timestamp for tenant in tenants] == [500, 0, 0]
+    assert [tenant.last_message for tenant in tenants] == [
+        None, 'Возникла ошибка!', None
+    ]
+
+
+def test_subscriptions_of_one_chat_keep_own_cursors():
+    store = StateStore()
+    first = engine.Tenant('first', 1, timestamp=100)
+    second = engine.Tenant('second', 1, timestamp=100)
+    polling_engine = engine.PollingEngine(RecordingBot(), [first, second],
+                                          store=store)
+    polling_engine._batch_done(first, 5000, 'Изменился статус', True)
+
+    restarted = [engine.Tenant('first', 1, timestamp=0),
+                 engine.Tenant('second', 1, timestamp=0)]
+    engine.PollingEngine(RecordingBot(), restarted, store=store).warm_start()
+
+    assert [tenant.timestamp for tenant in restarted] == [5000, 0]
+    assert 'first' not in first.state_key
+
+
+def test_warm_start_reads_cursor_saved_per_chat():
+    store = StateStore()
+    # Так курсор хранили прежние версии движка.
+    store.save_cursor('1', 500, 'Изменился статус')
+    shared = [engine.Tenant(token, 2, timestamp=0) for token in ('a', 'b')]
+    store.save_cursor('2', 700, 'Изменился статус')
+    tenants = [engine.Tenant('token', 1, timestamp=0), *shared]
+    engine.PollingEngine(RecordingBot(), tenants, store=store).warm_start()
+
+    assert [tenant.timestamp for tenant in tenants] == [500, 0, 0]
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from exceptions import ExpectedKeyNotFound
+from streaming import HomeworkStream
+
+
+def chunked(payload, size):
+    data = payload.encode('utf-8')
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_stream_yields_homeworks_one_by_one(chunk_size):
+    response = {
+        'current_date': 1234567890,
+        'homeworks': [{'id': number, 'homework_name': f'Проект {number}',
+                       'status': 'approved'} for number in range(20)],
+        'extra': {'nested': [1, 2, 3]}
+    }
+    stream = HomeworkStream(chunked(json.dumps(response, indent=1),
+                                    chunk_size))
+
+    assert list(stream) == response['homeworks']
+    assert stream.current_date == 1234567890
+    assert stream.fields['extra'] == {'nested': [1, 2, 3]}
+
+
+@pytest.mark.parametrize('payload, error', [
+    ('{"current_date": 1}', ExpectedKeyNotFound),
+    ('{"homeworks": []}', ExpectedKeyNotFound),
+    ('{"homeworks": {}, "current_date": 1}', TypeError),
+    ('{"homeworks": [], "current_date": "1"}', TypeError),
+    ('[{"homeworks": [], "current_date": 1}]', TypeError),
+    ('{"homeworks": [{"id": 1}', json.JSONDecodeError),
+    ('{"homeworks": [], "current_date": 1} {}', json.JSONDecodeError),
+])
+def test_stream_rejects_invalid_responses(payload, error):
+    with pytest.raises(error):
+        list(HomeworkStream(chunked(payload, 3)))
+
+
+def test_stream_homework_statuses_requests_stream(monkeypatch):
+    import requests
+
+    import homework
+    import http_session
+
+    class StreamedResponse:
+        status_code = 200
+        closed = False
+
+        def iter_content(self, chunk_size):
+            return chunked('{"homeworks": [{"id": 1}], "current_date": 5}', 4)
+
+        def close(self):
+            self.closed = True
+
+    calls = []
+    response = StreamedResponse()
+
+    def mock_get(url, **kwargs):
+        calls.append(kwargs)
+        return response
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    http_session.close()
+    stream = homework.stream_homework_statuses(0, {'Authorization': 'OAuth x'})
+
+    assert list(stream) == [{'id': 1}]
+    assert stream.current_date == 5
+    assert response.closed
+    assert calls[0]['stream'] is True
+    assert calls[0]['params'] == {'from_date': 0}
+
+
+def test_abandoned_stream_is_closed_by_with():
+    closed = []
+    payload = json.dumps({'homeworks': [{'id': 1}, {'id': 2}],
+                          'current_date': 5})
+
+    with HomeworkStream(chunked(payload, 3),
+                        on_close=lambda: closed.append(True)) as stream:
+        for item in stream:
+            break
+    assert closed == [True]
+    stream.close()
+    assert closed == [True]
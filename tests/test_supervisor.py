@@ -0,0 +1,86 @@
+import multiprocessing
+import time
+from argparse import Namespace
+
+import pytest
+
+from engine import Tenant
+from sharding import HashRing, shard_tenants
+from supervisor import Supervisor
+
+FORK = multiprocessing.get_context('fork')
+
+
+def exit_immediately(args, worker_id, workers):
+    pass
+
+
+def sleep_forever(args, worker_id, workers):
+    time.sleep(60)
+
+
+def test_every_tenant_has_exactly_one_worker():
+    tenants = [Tenant(f'token{number}', number) for number in range(1000)]
+    shards = [shard_tenants(tenants, worker_id, 4) for worker_id in range(4)]
+
+    assert sorted(tenant.chat_id for shard in shards
+                  for tenant in shard) == list(range(1000))
+    assert all(150 < len(shard) < 350 for shard in shards)
+
+
+def test_subscribers_of_one_account_share_a_worker():
+    tenants = [Tenant(f'token{number % 50}', number)
+               for number in range(200)]
+    for worker_id in range(4):
+        shard = shard_tenants(tenants, worker_id, 4)
+        tokens = {tenant.practicum_token for tenant in shard}
+        assert len(shard) == 4 * len(tokens)
+
+
+def test_adding_worker_moves_few_tenants():
+    keys = [str(number) for number in range(2000)]
+    before = HashRing(range(4))
+    after = HashRing(range(5))
+
+    moved = [key for key in keys
+             if before.node_for(key) != after.node_for(key)]
+
+    assert all(after.node_for(key) == 4 for key in moved)
+    assert len(moved) < len(keys) * 0.3
+
+
+def test_ring_needs_nodes():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_supervisor_restarts_dead_worker():
+    supervisor = Supervisor(Namespace(), 2, target=exit_immediately,
+                            context=FORK, restart_delay=0)
+    supervisor.start()
+    first_pids = {worker_id: process.pid
+                  for worker_id, process in supervisor.processes.items()}
+    for process in supervisor.processes.values():
+        process.join(1)
+
+    assert supervisor.restart_dead() == []
+    assert sorted(supervisor.restart_dead()) == [0, 1]
+    assert all(supervisor.processes[worker_id].pid != pid
+               for worker_id, pid in first_pids.items())
+    supervisor.stop()
+
+
+def test_resize_stops_old_workers_before_starting_new():
+    supervisor = Supervisor(Namespace(), 2, target=sleep_forever,
+                            context=FORK, stop_timeout=1)
+    supervisor.start()
+    old_processes = list(supervisor.processes.values())
+
+    supervisor.resize(3)
+
+    assert all(not process.is_alive() for process in old_processes)
+    assert sorted(supervisor.processes) == [0, 1, 2]
+    assert all(process.is_alive()
+               for process in supervisor.processes.values())
+    supervisor.stop()
+    assert supervisor.processes == {}
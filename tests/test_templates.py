@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import engine
+import homework
+from exceptions import UnexpectedHomeworkStatus
+from templates import MessageCatalog, split_template
+from tests.check_utils import RecordingBot
+
+HOMEWORK = {
+    'id': 123,
+    'homework_name': 'hw_python_oop.zip',
+    'reviewer_comment': 'Всё нравится',
+    'lesson_name': 'Итоговый проект',
+}
+
+
+@pytest.mark.parametrize('status', homework.HOMEWORK_VERDICTS)
+def test_default_locale_matches_previous_message(status):
+    item = {**HOMEWORK, 'status': status}
+
+    assert homework.parse_status(item) == (
+        'Изменился статус проверки работы "hw_python_oop.zip". '
+        f'{homework.HOMEWORK_VERDICTS[status]}'
+    )
+
+
+def test_locale_and_extra_fields():
+    catalog = MessageCatalog(homework.HOMEWORK_VERDICTS)
+    item = {**HOMEWORK, 'status': 'approved'}
+
+    assert catalog.render(item, 'en').startswith(
+        'The review status of "hw_python_oop.zip" has changed.')
+    assert catalog.render(item, 'de') == catalog.render(item)
+    message = catalog.render(item, 'ru', ('lesson_name', 'reviewer_comment'))
+    assert message.splitlines()[1:] == ['Урок: Итоговый проект',
+                                        'Комментарий ревьюера: Всё нравится']
+    assert '\n' not in catalog.render({**item, 'reviewer_comment': ''},
+                                      'ru', ('reviewer_comment',))
+
+
+def test_unknown_status_and_broken_template():
+    catalog = MessageCatalog(homework.HOMEWORK_VERDICTS)
+    with pytest.raises(UnexpectedHomeworkStatus):
+        catalog.render({**HOMEWORK, 'status': 'unknown'}, 'en')
+    with pytest.raises(ValueError):
+        split_template('Работа проверена', 'homework_name')
+
+
+def test_engine_renders_in_tenant_locale(monkeypatch, random_timestamp):
+    def fake_request(timestamp, headers):
+        return {'homeworks': [{**HOMEWORK, 'status': 'rejected'}],
+                'current_date': random_timestamp}
+
+    monkeypatch.setattr(homework, 'request_homework_statuses', fake_request)
+    bot = RecordingBot()
+    tenants = [engine.Tenant('token', 1, 0, 'en', ['lesson_name'])]
+    asyncio.run(engine.PollingEngine(bot, tenants).run(cycles=1))
+
+    assert bot.sent == [(1, 'The review status of "hw_python_oop.zip" has '
+                            'changed. The work has been reviewed: the '
+                            'reviewer left comments.\nLesson: Итоговый '
+                            'проект')]
+
+
+def test_tenant_rejects_unknown_extra_field():
+    with pytest.raises(ValueError):
+        engine.Tenant('token', 1, extras=['password'])
@@ -0,0 +1,21 @@
+import pytest
+
+from exceptions import ExpectedKeyNotFound
+from validators import compile_validator
+
+validate = compile_validator({'homeworks': list, 'current_date': int},
+                             'Ответ API', 'homeworks')
+
+
+def test_returns_value_of_return_key():
+    assert validate({'homeworks': [1], 'current_date': 0}) == [1]
+
+
+@pytest.mark.parametrize('response, error', [
+    ([], TypeError),
+    ({'current_date': 0}, ExpectedKeyNotFound),
+    ({'homeworks': {}, 'current_date': 0}, TypeError),
+])
+def test_invalid_responses(response, error):
+    with pytest.raises(error):
+        validate(response)
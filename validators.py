@@ -0,0 +1,43 @@
+"""
+Предварительно скомпилированные проверки структуры ответов API.
+Схема (словарь «ключ - ожидаемый тип») превращается в функцию
+один раз при загрузке модуля. При проверке не создаются словари
+и строки: сообщения об ошибках собираются только при ошибке.
+"""
+from exceptions import ExpectedKeyNotFound
+
+
+def compile_validator(schema, element_name, return_key=None):
+    """
+    Компилирует схему в функцию проверки.
+    Функция проверки выбрасывает TypeError, если элемент не словарь
+    или значение ключа не того типа, и ExpectedKeyNotFound, если
+    ключа нет. Если задан return_key, возвращает значение этого ключа.
+    В качестве параметров функция принимает:
+    schema - словарь, где ключам сопоставлены ожидаемые типы значений
+    element_name - название проверяемого элемента для сообщений об ошибках
+    return_key - ключ, значение которого нужно вернуть
+    """
+    fields = tuple(schema.items())
+    if return_key is not None and return_key not in schema:
+        raise ValueError(f'Ключ {return_key} отсутствует в схеме')
+
+    def validate(item):
+        if not isinstance(item, dict):
+            raise TypeError(f'''Некорректный {element_name}.
+                            Ожидался dict, получен {type(item).__name__}.''')
+        for key, expected_type in fields:
+            try:
+                value = item[key]
+            except KeyError:
+                raise ExpectedKeyNotFound(key, element_name) from None
+            if not isinstance(value, expected_type):
+                raise TypeError(f'''Некорректный {element_name}.
+                            Ожидался тип значения {key} равный
+                            {expected_type}, получен {type(value)}''')
+        if return_key is not None:
+            return item[return_key]
+        return None
+
+    validate.__name__ = f'validate_{element_name}'
+    return validate